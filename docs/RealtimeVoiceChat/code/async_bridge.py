@@ -0,0 +1,267 @@
+"""
+Primitives for handing signals from worker threads to asyncio consumers.
+
+The speech pipeline runs its LLM and TTS work in plain threads while the
+WebSocket senders are asyncio tasks. Instead of the tasks polling shared state
+with short sleeps, threads notify them through `loop.call_soon_threadsafe`:
+
+- `AsyncWakeup`: a coalescing "something changed" signal.
+- `ThreadToAsyncChannel`: a bounded item channel with producer backpressure
+  and an explicit end of stream.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from queue import Empty, Full
+from typing import Any, Callable, Deque, Optional, Tuple
+
+
+class AsyncWakeup:
+    """
+    Thread-safe wakeup signal for a single asyncio consumer.
+
+    Any thread may call `notify`; the consumer awaits `wait`. Notifications
+    that arrive while the consumer is busy are coalesced into one wakeup, and
+    a notification sent between the consumer's state check and its `wait` is
+    never lost because the underlying event stays set until consumed.
+
+    Counts how often the consumer actually woke up so idle cost can be measured.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the AsyncWakeup. Must be created on the consumer's event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._event = asyncio.Event()
+        self._scheduled = False
+        self.created = time.monotonic()
+        self.notifications: int = 0
+        self.wakeups: int = 0
+
+    def _fire(self) -> None:
+        self._scheduled = False
+        self._event.set()
+
+    def notify(self) -> None:
+        """Wakes the consumer. Safe to call from any thread, including the loop's own."""
+        self.notifications += 1
+        if threading.get_ident() == self._loop_thread_id:
+            self._event.set()
+            return
+        if self._scheduled:
+            return # A wakeup is already on its way
+        self._scheduled = True
+        try:
+            self._loop.call_soon_threadsafe(self._fire)
+        except RuntimeError:
+            pass # Loop already closed (connection shutting down)
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits for the next notification (or the timeout) and consumes it.
+
+        Args:
+            timeout: Maximum time to wait in seconds; None waits indefinitely.
+
+        Returns:
+            True if woken by a notification, False on timeout.
+        """
+        try:
+            if timeout is None:
+                await self._event.wait()
+            else:
+                await asyncio.wait_for(self._event.wait(), timeout=max(0.0, timeout))
+            notified = True
+        except asyncio.TimeoutError:
+            notified = False
+        self._event.clear()
+        self.wakeups += 1
+        return notified
+
+    def wakeups_per_second(self) -> float:
+        """Returns the average consumer wakeup rate since creation."""
+        elapsed = time.monotonic() - self.created
+        return self.wakeups / elapsed if elapsed > 0 else 0.0
+
+
+class ChannelClosed(Exception):
+    """Raised to the consumer of a `ThreadToAsyncChannel` that is closed and fully drained."""
+
+
+class ThreadToAsyncChannel:
+    """
+    Bounded FIFO handing items from producer threads to one asyncio consumer.
+
+    - Producers call `put` from any thread. When the channel is full, `put`
+      blocks the producer (backpressure) until the consumer makes room or the
+      channel is closed.
+    - The consumer awaits `get` (or calls `get_nowait`) on its event loop. A
+      waiting consumer is woken with `loop.call_soon_threadsafe`; puts that
+      happen while nobody waits cost no loop wakeup at all.
+    - `close` marks the end of the stream. Remaining items can still be read;
+      after that the consumer gets `ChannelClosed` instead of waiting, so "the
+      producer is done" never has to be guessed from an empty queue.
+
+    An optional `on_change` callback runs after every put and on close, for
+    consumers that wait on several sources through one `AsyncWakeup`.
+    """
+
+    def __init__(self, maxsize: int = 0, on_change: Optional[Callable[[], None]] = None) -> None:
+        """
+        Initializes the ThreadToAsyncChannel.
+
+        Args:
+            maxsize: Maximum number of buffered items; 0 means unbounded.
+            on_change: Optional callback invoked (in the producer's thread) after
+                       each put and on close.
+        """
+        self.maxsize = maxsize
+        self._on_change = on_change
+        self._items: Deque[Any] = deque()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._closed = False
+        self._waiter: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = None
+
+        # Statistics
+        self.put_count: int = 0
+        self.max_depth: int = 0
+        self.producer_wait_s: float = 0.0 # Time producers spent blocked on a full channel
+
+    # --- Producer side (any thread) ---
+
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Appends an item, blocking while the channel is full.
+
+        Args:
+            item: The item to hand over.
+            block: If False, raise `queue.Full` instead of blocking.
+            timeout: Maximum time to block in seconds; None blocks until there is room.
+
+        Returns:
+            True if the item was queued, False if the channel is (or got) closed.
+
+        Raises:
+            queue.Full: If the channel stayed full (non-blocking call or timeout).
+        """
+        with self._not_full:
+            if self._closed:
+                return False
+            if self.maxsize > 0 and len(self._items) >= self.maxsize:
+                if not block:
+                    raise Full
+                start = time.monotonic()
+                deadline = None if timeout is None else start + timeout
+                try:
+                    while len(self._items) >= self.maxsize and not self._closed:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            raise Full
+                        self._not_full.wait(remaining)
+                finally:
+                    self.producer_wait_s += time.monotonic() - start
+                if self._closed:
+                    return False
+            self._items.append(item)
+            self.put_count += 1
+            if len(self._items) > self.max_depth:
+                self.max_depth = len(self._items)
+            waiter, self._waiter = self._waiter, None
+        self._wake(waiter)
+        if self._on_change:
+            self._on_change()
+        return True
+
+    def put_nowait(self, item: Any) -> bool:
+        """Non-blocking `put`; raises `queue.Full` if the channel is full."""
+        return self.put(item, block=False)
+
+    def close(self) -> None:
+        """Marks the end of the stream and releases blocked producers and the waiting consumer."""
+        with self._not_full:
+            if self._closed:
+                return
+            self._closed = True
+            self._not_full.notify_all()
+            waiter, self._waiter = self._waiter, None
+        self._wake(waiter)
+        if self._on_change:
+            self._on_change()
+
+    @staticmethod
+    def _wake(waiter: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]) -> None:
+        if waiter is None:
+            return
+        loop, future = waiter
+        try:
+            loop.call_soon_threadsafe(_resolve_waiter, future)
+        except RuntimeError:
+            pass # Consumer loop already closed
+
+    # --- Consumer side (event loop) ---
+
+    def get_nowait(self) -> Any:
+        """
+        Removes and returns the next item without waiting.
+
+        Raises:
+            queue.Empty: If no item is available but producers may still add some.
+            ChannelClosed: If the channel is closed and drained.
+        """
+        with self._not_full:
+            if self._items:
+                item = self._items.popleft()
+                self._not_full.notify()
+                return item
+            if self._closed:
+                raise ChannelClosed
+            raise Empty
+
+    async def get(self) -> Any:
+        """
+        Waits for and returns the next item.
+
+        Raises:
+            ChannelClosed: If the channel is closed and drained.
+        """
+        while True:
+            with self._not_full:
+                if self._items:
+                    item = self._items.popleft()
+                    self._not_full.notify()
+                    return item
+                if self._closed:
+                    raise ChannelClosed
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+                self._waiter = (loop, future)
+            try:
+                await future
+            finally:
+                with self._lock:
+                    if self._waiter is not None and self._waiter[1] is future:
+                        self._waiter = None
+
+    def qsize(self) -> int:
+        """Returns the number of buffered items."""
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    @property
+    def closed(self) -> bool:
+        """True once `close` was called (items may remain)."""
+        return self._closed
+
+    @property
+    def drained(self) -> bool:
+        """True if the channel is closed and all items were consumed."""
+        return self._closed and not self._items
+
+
+def _resolve_waiter(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,231 @@
+"""
+Outbound encoder stage for TTS audio.
+
+Sits between a generation's `audio_chunks` queue and the WebSocket sender and
+turns raw 16-bit PCM chunks into the payload of binary TTS frames (see
+`ws_protocol`). Encoders are pluggable:
+
+- ``pcm``:  passthrough, payload is the raw PCM chunk.
+- ``opus``: 20 ms Opus packets at 24 kHz mono (needs the optional `opuslib`
+            package and the system libopus). A payload is a sequence of
+            packets, each prefixed with its length as a big-endian uint16.
+            Speech at the default 24 kbit/s is ~16x smaller than 384 kbit/s PCM.
+
+Encoding runs in a small thread pool shared by all connections, so the event
+loop only schedules work and ships bytes.
+"""
+import asyncio
+import logging
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from ws_protocol import CODEC_OPUS, CODEC_PCM16
+
+logger = logging.getLogger(__name__)
+
+try:
+    import opuslib
+    OPUSLIB_AVAILABLE = True
+except Exception: # ImportError, or OSError when libopus itself is missing
+    opuslib = None
+    OPUSLIB_AVAILABLE = False
+
+TTS_SAMPLE_RATE = 24000 # Rate of the PCM produced by AudioProcessor.synthesize
+OPUS_PACKET_LENGTH = struct.Struct("!H")
+
+
+class OutboundEncoder:
+    """Base class of the pluggable outbound encoders."""
+    name: str = ""
+    codec_id: int = CODEC_PCM16
+
+    def encode(self, pcm: bytes) -> bytes:
+        """Encodes one chunk of 16-bit mono PCM and returns the frame payload."""
+        raise NotImplementedError
+
+    def flush(self) -> bytes:
+        """Encodes any buffered samples (end of a generation) and returns the payload."""
+        return b""
+
+    def reset(self) -> None:
+        """Drops buffered samples, e.g. when a generation is interrupted."""
+
+
+class PCMPassthroughEncoder(OutboundEncoder):
+    """Sends the PCM chunks unchanged."""
+    name = "pcm"
+    codec_id = CODEC_PCM16
+
+    def encode(self, pcm: bytes) -> bytes:
+        return pcm
+
+
+class OpusEncoder(OutboundEncoder):
+    """
+    Encodes PCM into fixed-length Opus packets.
+
+    TTS chunks are not multiples of the Opus frame size, so samples that do not
+    fill a whole frame are carried over to the next chunk and padded with
+    silence on `flush`.
+    """
+    name = "opus"
+    codec_id = CODEC_OPUS
+
+    def __init__(self, sample_rate: int = TTS_SAMPLE_RATE, bitrate: int = 24000, frame_ms: int = 20) -> None:
+        """
+        Initializes the OpusEncoder.
+
+        Args:
+            sample_rate: PCM sample rate; must be one Opus supports (8/12/16/24/48 kHz).
+            bitrate: Target bitrate in bits per second.
+            frame_ms: Packet duration in milliseconds (2.5, 5, 10, 20, 40 or 60).
+        """
+        if not OPUSLIB_AVAILABLE:
+            raise RuntimeError("Opus encoding requires the 'opuslib' package and libopus")
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self._frame_bytes = self.frame_samples * 2
+        self._encoder = opuslib.Encoder(sample_rate, 1, opuslib.APPLICATION_VOIP)
+        self._encoder.bitrate = bitrate
+        self._pending = bytearray()
+
+    def _encode_frames(self, data: bytes) -> bytes:
+        packets: List[bytes] = []
+        for offset in range(0, len(data), self._frame_bytes):
+            packet = self._encoder.encode(data[offset:offset + self._frame_bytes], self.frame_samples)
+            packets.append(OPUS_PACKET_LENGTH.pack(len(packet)))
+            packets.append(packet)
+        return b"".join(packets)
+
+    def encode(self, pcm: bytes) -> bytes:
+        self._pending += pcm
+        usable = len(self._pending) - len(self._pending) % self._frame_bytes
+        if not usable:
+            return b""
+        payload = self._encode_frames(bytes(self._pending[:usable]))
+        del self._pending[:usable]
+        return payload
+
+    def flush(self) -> bytes:
+        if not self._pending:
+            return b""
+        self._pending += bytes(self._frame_bytes - len(self._pending))
+        payload = self._encode_frames(bytes(self._pending))
+        self._pending.clear()
+        return payload
+
+    def reset(self) -> None:
+        self._pending.clear()
+
+
+ENCODERS: Dict[str, Callable[[], OutboundEncoder]] = {
+    PCMPassthroughEncoder.name: PCMPassthroughEncoder,
+    OpusEncoder.name: OpusEncoder,
+}
+
+
+def available_encoders() -> List[str]:
+    """Returns the names of the encoders usable in this environment."""
+    return [name for name in ENCODERS if name != OpusEncoder.name or OPUSLIB_AVAILABLE]
+
+
+def create_encoder(name: str) -> OutboundEncoder:
+    """
+    Creates an encoder by name, falling back to PCM passthrough if it is unavailable.
+
+    Args:
+        name: One of the keys of `ENCODERS`.
+    """
+    if name not in available_encoders():
+        if name != PCMPassthroughEncoder.name:
+            logger.warning(f"🔊⚠️ Outbound encoder '{name}' not available, falling back to PCM passthrough.")
+        return PCMPassthroughEncoder()
+    return ENCODERS[name]()
+
+
+_pool_lock = threading.Lock()
+_encoder_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_encoder_pool(max_workers: int = 2) -> ThreadPoolExecutor:
+    """Returns the thread pool shared by all connections' encoder stages, creating it on first use."""
+    global _encoder_pool
+    with _pool_lock:
+        if _encoder_pool is None:
+            _encoder_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="AudioEncode")
+        return _encoder_pool
+
+
+def shutdown_encoder_pool() -> None:
+    """Shuts down the shared encoder thread pool."""
+    global _encoder_pool
+    with _pool_lock:
+        if _encoder_pool is not None:
+            _encoder_pool.shutdown(wait=False, cancel_futures=True)
+            _encoder_pool = None
+
+
+class EncoderStage:
+    """
+    Per-connection encoder stage.
+
+    Runs the connection's encoder in the shared pool and keeps it aligned with
+    generations: buffered samples of an interrupted generation are dropped
+    rather than leaking into the next one. Calls must not overlap; the TTS
+    sender awaits each one.
+    """
+
+    def __init__(self, encoder: OutboundEncoder) -> None:
+        self.encoder = encoder
+        self._generation_id: Optional[int] = None
+        self.bytes_in: int = 0
+        self.bytes_out: int = 0
+
+    @property
+    def codec_id(self) -> int:
+        return self.encoder.codec_id
+
+    async def encode(self, generation_id: int, pcm: bytes) -> bytes:
+        """
+        Encodes one PCM chunk of a generation off the event loop.
+
+        Args:
+            generation_id: Id of the generation the chunk belongs to.
+            pcm: Raw 16-bit mono PCM.
+
+        Returns:
+            The frame payload; may be empty while the encoder buffers a partial frame.
+        """
+        if generation_id != self._generation_id:
+            self._generation_id = generation_id
+            self.encoder.reset()
+        self.bytes_in += len(pcm)
+        if isinstance(self.encoder, PCMPassthroughEncoder):
+            payload = pcm # Nothing to offload
+        else:
+            loop = asyncio.get_running_loop()
+            payload = await loop.run_in_executor(get_encoder_pool(), self.encoder.encode, pcm)
+        self.bytes_out += len(payload)
+        return payload
+
+    def finish(self, generation_id: int) -> bytes:
+        """
+        Flushes the encoder at the end of a generation and returns the remaining payload.
+
+        Runs inline: at most one partial frame is buffered, so this is cheaper
+        than a round trip through the pool.
+        """
+        if generation_id != self._generation_id:
+            return b""
+        self._generation_id = None
+        payload = self.encoder.flush()
+        self.bytes_out += len(payload)
+        return payload
+
+    def summary(self) -> str:
+        """Returns egress statistics (PCM in vs. encoded out) as a one-line string."""
+        ratio = self.bytes_in / self.bytes_out if self.bytes_out else 0.0
+        return (f"{self.encoder.name}: {self.bytes_in / 1024:.1f} KiB PCM -> "
+                f"{self.bytes_out / 1024:.1f} KiB sent ({ratio:.1f}x)")
@@ -0,0 +1,360 @@
+"""
+Off-loop execution of the incoming audio decode/resample stage.
+
+`AudioInputProcessor` can resample in one of three executor modes:
+
+- ``inline``:  on the asyncio event loop itself (the original behaviour).
+- ``thread``:  in a small thread pool shared by all connections. NumPy releases
+               the GIL inside the filter matmul, so the loop stays responsive.
+               This is the default (`DEFAULT_EXECUTOR_MODE`), both for
+               `AudioInputProcessor` and the server's AUDIO_EXECUTOR_MODE.
+- ``process``: in a shared process pool. Each connection owns a shared-memory
+               segment holding its filter history, input and output buffers, so
+               only a few integers cross the process boundary per chunk.
+
+The module also provides the latency counters used to compare the modes:
+`StageLatency` (per connection, per stage: wall time vs. time the event loop
+was blocked) and `EventLoopLagMonitor` (process-wide loop stall time).
+"""
+import asyncio
+import logging
+import multiprocessing
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+from resampler import design_decimation_taps, polyphase_decimate
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES: Tuple[str, ...] = ("inline", "thread", "process")
+DEFAULT_EXECUTOR_MODE: str = "thread"
+
+
+class StageLatency:
+    """
+    Latency counters for one processing stage of one connection.
+
+    Tracks both the stage's wall time and the part of it during which the event
+    loop thread was busy (blocked). Inline stages block for their whole
+    duration; offloaded stages only block for the submit/collect overhead.
+    """
+    __slots__ = ("count", "total_ms", "max_ms", "blocked_ms", "max_blocked_ms")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.total_ms: float = 0.0
+        self.max_ms: float = 0.0
+        self.blocked_ms: float = 0.0
+        self.max_blocked_ms: float = 0.0
+
+    def record(self, total_ms: float, blocked_ms: float) -> None:
+        """Adds one stage execution."""
+        self.count += 1
+        self.total_ms += total_ms
+        self.blocked_ms += blocked_ms
+        if total_ms > self.max_ms:
+            self.max_ms = total_ms
+        if blocked_ms > self.max_blocked_ms:
+            self.max_blocked_ms = blocked_ms
+
+    def snapshot(self) -> Dict[str, float]:
+        """Returns the counters with per-call means as a plain dictionary."""
+        count = self.count or 1
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / count,
+            "max_ms": self.max_ms,
+            "mean_blocked_ms": self.blocked_ms / count,
+            "max_blocked_ms": self.max_blocked_ms,
+            "total_blocked_ms": self.blocked_ms,
+        }
+
+    def __str__(self) -> str:
+        s = self.snapshot()
+        return (f"n={s['count']} mean={s['mean_ms']:.3f}ms max={s['max_ms']:.3f}ms "
+                f"loop-blocked mean={s['mean_blocked_ms']:.3f}ms max={s['max_blocked_ms']:.3f}ms")
+
+
+class EventLoopLagMonitor:
+    """
+    Measures event-loop stall time with a periodic probe task.
+
+    The probe sleeps for `interval` seconds and records how much later than
+    requested it woke up. That lag is time during which some callback held the
+    loop, i.e. how long every other connection's I/O had to wait.
+    """
+
+    def __init__(self, interval: float = 0.1, report_interval: float = 30.0, history: int = 3000) -> None:
+        """
+        Initializes the EventLoopLagMonitor.
+
+        Args:
+            interval: Probe period in seconds.
+            report_interval: How often a summary is logged, in seconds (0 disables logging).
+            history: Number of most recent lag samples kept for percentiles.
+        """
+        self.interval = interval
+        self.report_interval = report_interval
+        self._lags_ms: Deque[float] = deque(maxlen=history)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Starts the probe task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._probe_loop(), name="EventLoopLagMonitor")
+
+    async def stop(self) -> None:
+        """Cancels the probe task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _probe_loop(self) -> None:
+        last_report = time.perf_counter()
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self._lags_ms.append(max(0.0, (now - start - self.interval) * 1000))
+            if self.report_interval and now - last_report >= self.report_interval:
+                last_report = now
+                logger.info(f"🔁⏱️ Event loop lag: {self.summary()}")
+
+    def snapshot(self) -> Dict[str, float]:
+        """Returns mean / p95 / max loop lag in milliseconds over the kept samples."""
+        lags = list(self._lags_ms)
+        if not lags:
+            return {"count": 0}
+        return {
+            "count": len(lags),
+            "mean_ms": statistics.mean(lags),
+            "p95_ms": statistics.quantiles(lags, n=20)[18] if len(lags) >= 20 else max(lags),
+            "max_ms": max(lags),
+        }
+
+    def summary(self) -> str:
+        s = self.snapshot()
+        if not s["count"]:
+            return "no samples"
+        return f"n={s['count']} mean={s['mean_ms']:.2f}ms p95={s['p95_ms']:.2f}ms max={s['max_ms']:.2f}ms"
+
+
+# --------------------------------------------------------------------
+# Shared executors
+# --------------------------------------------------------------------
+_pools_lock = threading.Lock()
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_audio_executor(mode: str, max_workers: int = 2) -> Optional[Executor]:
+    """
+    Returns the process-wide executor for an executor mode, creating it on first use.
+
+    Args:
+        mode: One of `EXECUTOR_MODES`.
+        max_workers: Pool size used when the pool is created.
+
+    Returns:
+        The shared executor, or None for ``inline``.
+    """
+    global _thread_pool, _process_pool
+    if mode not in EXECUTOR_MODES:
+        raise ValueError(f"Unknown audio executor mode '{mode}', expected one of {EXECUTOR_MODES}")
+    if mode == "inline":
+        return None
+    with _pools_lock:
+        if mode == "thread":
+            if _thread_pool is None:
+                _thread_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="AudioResample")
+                logger.info(f"👂🧵 Audio resample thread pool started ({max_workers} workers)")
+            return _thread_pool
+        if _process_pool is None:
+            # Spawn, not fork: the server process already runs model and I/O threads
+            _process_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"👂🧩 Audio resample process pool started ({max_workers} workers)")
+        return _process_pool
+
+
+def shutdown_audio_executors() -> None:
+    """Shuts down the shared executors created by `get_audio_executor`."""
+    global _thread_pool, _process_pool
+    with _pools_lock:
+        if _thread_pool is not None:
+            _thread_pool.shutdown(wait=False, cancel_futures=True)
+            _thread_pool = None
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+
+
+# --------------------------------------------------------------------
+# Process mode: per-connection shared-memory resampler
+# --------------------------------------------------------------------
+def _free_segment(shm: shared_memory.SharedMemory) -> None:
+    shm.close()
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _segment_layout(down: int, capacity: int) -> Tuple[int, int, int, int]:
+    """Returns (history_len, input_offset, output_offset, total_bytes) of a segment."""
+    history_len = 20 * down # len(design_decimation_taps(down)) - 1
+    work_bytes = (history_len + capacity) * 4
+    input_bytes = capacity * 2
+    output_bytes = -(-capacity // down) * 2
+    return history_len, work_bytes, work_bytes + input_bytes, work_bytes + input_bytes + output_bytes
+
+
+# Worker-side state: attached segments (bounded, oldest closed first) and taps per factor
+_WORKER_MAX_SEGMENTS = 256
+_worker_segments: "OrderedDict[str, shared_memory.SharedMemory]" = OrderedDict()
+_worker_taps: Dict[int, np.ndarray] = {}
+
+
+def _attach_segment(name: str) -> shared_memory.SharedMemory:
+    shm = _worker_segments.get(name)
+    if shm is not None:
+        _worker_segments.move_to_end(name)
+        return shm
+    # Spawned workers share the server's resource tracker, so the owner's unlink
+    # also clears this attachment's registration
+    shm = shared_memory.SharedMemory(name=name)
+    _worker_segments[name] = shm
+    while len(_worker_segments) > _WORKER_MAX_SEGMENTS:
+        _, old = _worker_segments.popitem(last=False)
+        old.close()
+    return shm
+
+
+def _resample_in_worker(name: str, n: int, phase: int, down: int, capacity: int) -> int:
+    """
+    Worker-process entry point: resamples the `n` input samples in segment `name`.
+
+    Reads the chunk from the segment's input region, filters it together with the
+    carried history, writes the output samples and the new history back in place.
+
+    Returns:
+        Number of output samples written.
+    """
+    taps_rev = _worker_taps.get(down)
+    if taps_rev is None:
+        taps_rev = np.ascontiguousarray(design_decimation_taps(down)[::-1])
+        _worker_taps[down] = taps_rev
+
+    hist, in_off, out_off, _ = _segment_layout(down, capacity)
+    buf = _attach_segment(name).buf
+    work = np.ndarray(hist + n, dtype=np.float32, buffer=buf)
+    work[hist:] = np.ndarray(n, dtype=np.int16, buffer=buf, offset=in_off)
+
+    n_out = 0 if n <= phase else (n - phase - 1) // down + 1
+    if n_out:
+        out_int16 = np.ndarray(n_out, dtype=np.int16, buffer=buf, offset=out_off)
+        polyphase_decimate(work, taps_rev, phase, down, np.empty(n_out, dtype=np.float32), out_int16)
+    work[:hist] = work[n:]
+    return n_out
+
+
+class SharedMemoryResampler:
+    """
+    Connection-side handle of a streaming resampler that runs in a process pool.
+
+    Owns a shared-memory segment with the carried filter history, an input and an
+    output region. Per chunk only the segment name and a few integers are pickled;
+    audio is copied once into the segment and read back from it without pickling.
+    Calls for one connection must not overlap (the audio queue loop awaits each one).
+    A segment is only released once no worker call is using it: a queued call is
+    cancelled, a running one releases the segment when it finishes.
+    """
+
+    def __init__(self, down: int = 3, max_chunk_samples: int = 4096) -> None:
+        """
+        Initializes the SharedMemoryResampler.
+
+        Args:
+            down: Integer downsampling factor.
+            max_chunk_samples: Largest expected input chunk; the segment grows on demand.
+        """
+        self.down = down
+        self._phase: int = 0
+        self._capacity: int = 0
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._in_flight: Optional[Future] = None # Worker call using the current segment
+        self._allocate(max_chunk_samples)
+
+    def _allocate(self, capacity: int) -> None:
+        """(Re)creates the segment for `capacity` input samples, keeping the filter history."""
+        hist, _, _, size = _segment_layout(self.down, capacity)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        history = np.ndarray(hist, dtype=np.float32, buffer=shm.buf)
+        if self._shm is not None:
+            history[:] = np.ndarray(hist, dtype=np.float32, buffer=self._shm.buf)
+            self._release_segment()
+        else:
+            history.fill(0.0)
+        del history # No exported views may outlive the segment
+        self._shm = shm
+        self._capacity = capacity
+
+    def _release_segment(self) -> None:
+        """Detaches the current segment; frees it now, or when the worker call using it ends."""
+        shm, self._shm = self._shm, None
+        if shm is None:
+            return
+        in_flight, self._in_flight = self._in_flight, None
+        if in_flight is not None and not in_flight.cancel() and not in_flight.done():
+            in_flight.add_done_callback(lambda _: _free_segment(shm)) # Running: the worker still maps it
+            return
+        _free_segment(shm)
+
+    def submit(self, chunk: np.ndarray, executor: Executor) -> "asyncio.Future[int]":
+        """
+        Copies one int16 chunk into the segment and schedules resampling in `executor`.
+
+        Args:
+            chunk: 1-D int16 array of input samples.
+            executor: The shared process pool.
+
+        Returns:
+            An asyncio future resolving to the number of output samples; pass it
+            to `collect` to read them.
+        """
+        n = len(chunk)
+        if n > self._capacity:
+            self._allocate(n)
+        _, in_off, _, _ = _segment_layout(self.down, self._capacity)
+        np.ndarray(n, dtype=np.int16, buffer=self._shm.buf, offset=in_off)[:] = chunk
+
+        phase = self._phase
+        self._phase = (phase - n) % self.down
+        self._in_flight = executor.submit(
+            _resample_in_worker, self._shm.name, n, phase, self.down, self._capacity
+        )
+        return asyncio.wrap_future(self._in_flight)
+
+    def collect(self, n_out: int) -> np.ndarray:
+        """Returns a copy of the `n_out` output samples written by the last `submit`."""
+        if self._shm is None or n_out == 0:
+            return np.zeros(0, dtype=np.int16)
+        _, _, out_off, _ = _segment_layout(self.down, self._capacity)
+        return np.ndarray(n_out, dtype=np.int16, buffer=self._shm.buf, offset=out_off).copy()
+
+    def close(self) -> None:
+        """Releases the shared-memory segment."""
+        self._release_segment()
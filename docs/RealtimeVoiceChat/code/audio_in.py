@@ -1,8 +1,12 @@
 import asyncio
 import logging
-from typing import Optional, Callable, Any
+import time
+from typing import Optional, Callable, Any, Awaitable, Tuple
 import numpy as np
-from scipy.signal import resample_poly
+from audio_ingest import AudioIngestRing
+from audio_executor import DEFAULT_EXECUTOR_MODE, SharedMemoryResampler, StageLatency, get_audio_executor
+from resampler import BatchResampler, StreamingResampler
+from silence_gate import SilenceGate
 from transcribe import TranscriptionProcessor
 
 logger = logging.getLogger(__name__)
@@ -12,8 +16,8 @@ class AudioInputProcessor:
     """
     Manages audio input, processes it for transcription, and handles related callbacks.
 
-    This class receives raw audio chunks, resamples them to the required format (16kHz),
-    feeds them to an underlying `TranscriptionProcessor`, and manages callbacks for
+    This class receives raw audio chunks, resamples them to the required format (16kHz)
+    with a per-connection streaming resampler, feeds them to an underlying `TranscriptionProcessor`, and manages callbacks for
     real-time transcription updates, recording start events, and silence detection.
     It also runs the transcription process in a background task.
     """
@@ -27,6 +31,9 @@ class AudioInputProcessor:
             silence_active_callback: Optional[Callable[[bool], None]] = None,
             pipeline_latency: float = 0.5,
             shared_recorder: Optional[Any] = None, # NEW: Accept shared recorder
+            batch_resampler: Optional[BatchResampler] = None,
+            executor_mode: str = DEFAULT_EXECUTOR_MODE,
+            silence_gate: Optional[SilenceGate] = None,
         ) -> None:
         """
         Initializes the AudioInputProcessor.
@@ -38,8 +45,29 @@ class AudioInputProcessor:
                                      It receives a boolean argument (True if silence is active).
             pipeline_latency: Estimated latency of the processing pipeline in seconds.
             shared_recorder: Optional shared recorder instance to use across connections.
+            batch_resampler: Optional central resampling stage shared by all connections.
+                             If given (and running), chunks are resampled there in
+                             vectorized batches instead of by this instance.
+            executor_mode: Where this connection's own resampling runs: "inline" (on the
+                           event loop), "thread" (shared thread pool) or "process"
+                           (shared process pool, audio passed through shared memory).
+                           Defaults to `audio_executor.DEFAULT_EXECUTOR_MODE` ("thread").
+            silence_gate: Optional energy/ZCR pre-gate. Clearly silent chunks are
+                          dropped before resampling and transcription; the gate is
+                          held open while the recorder is inside an utterance.
         """
         self.last_partial_text: Optional[str] = None
+        # Per-connection resampler: filter taps designed once, history carried across chunks
+        self.resampler = StreamingResampler(down=self._RESAMPLE_RATIO)
+        self.batch_resampler = batch_resampler
+        self._batch_stream_id: Optional[int] = batch_resampler.register() if batch_resampler else None
+        self.executor_mode = executor_mode
+        self._executor = get_audio_executor(executor_mode)
+        self._shm_resampler: Optional[SharedMemoryResampler] = (
+            SharedMemoryResampler(down=self._RESAMPLE_RATIO) if executor_mode == "process" else None
+        )
+        # Per-stage wall time vs. time the event loop was blocked by the stage
+        self.stage_latency = {"resample": StageLatency(), "feed": StageLatency()}
         self.transcriber = TranscriptionProcessor(
             language,
             on_recording_start_callback=self._on_recording_start,
@@ -48,6 +76,9 @@ class AudioInputProcessor:
             pipeline_latency=pipeline_latency,
             shared_recorder=shared_recorder, # NEW: Pass shared recorder
         )
+        self.silence_gate = silence_gate
+        if silence_gate is not None:
+            silence_gate.hold_open = self.transcriber.is_recording
         # Flag to indicate if the transcription loop has failed fatally
         self._transcription_failed = False
         self.transcription_task = asyncio.create_task(self._run_transcription_loop())
@@ -124,51 +155,100 @@ class AudioInputProcessor:
         """
         Converts raw audio bytes (int16) to a 16kHz 16-bit PCM numpy array.
 
-        The audio is converted to float32 for accurate resampling and then
-        converted back to int16, clipping values outside the valid range.
+        Resampling runs through this connection's `StreamingResampler`, which keeps
+        the filter history from the previous chunk so chunk edges are filtered
+        seamlessly. Values outside the int16 range are clipped.
 
         Args:
             raw_bytes: Raw audio data assumed to be in int16 format.
 
         Returns:
             A numpy array containing the resampled audio in int16 format at 16kHz.
-            Returns an array of zeros if the input is silent.
+            The array is a view into the resampler's output buffer and is only
+            valid until the next call.
         """
         raw_audio = np.frombuffer(raw_bytes, dtype=np.int16)
+        return self.resampler.process(raw_audio)
 
-        if np.max(np.abs(raw_audio)) == 0:
-            # Calculate expected length after resampling for silence
-            expected_len = int(np.ceil(len(raw_audio) / self._RESAMPLE_RATIO))
-            return np.zeros(expected_len, dtype=np.int16)
-
-        # Convert to float32 for resampling precision
-        audio_float32 = raw_audio.astype(np.float32)
-
-        # Resample using float32 data
-        resampled_float = resample_poly(
-            audio_float32, 
-            1, 
-            self._RESAMPLE_RATIO,
-            window=('kaiser', 5.0)  # Better anti-aliasing filter
-        )
+    def _submit_resample(self, raw_bytes: bytes) -> Tuple[Optional[Awaitable], Optional[Callable[[Any], np.ndarray]]]:
+        """
+        Hands a chunk to the off-loop resampling path, if any.
 
-        # Convert back to int16, clipping to ensure validity
-        resampled_int16 = np.clip(resampled_float, -32768, 32767).astype(np.int16)
+        Returns:
+            `(awaitable, collect)`: the pending result and an optional function that
+            turns it into the output array, or `(None, None)` for inline mode.
+        """
+        if self._batch_stream_id is not None and self.batch_resampler.is_running:
+            raw_audio = np.frombuffer(raw_bytes, dtype=np.int16)
+            return self.batch_resampler.resample(self._batch_stream_id, raw_audio), None
+        if self.executor_mode == "thread":
+            # The returned view stays valid: the queue loop consumes it before the next chunk
+            loop = asyncio.get_running_loop()
+            return loop.run_in_executor(self._executor, self.process_audio_chunk, raw_bytes), None
+        if self._shm_resampler is not None:
+            raw_audio = np.frombuffer(raw_bytes, dtype=np.int16)
+            return self._shm_resampler.submit(raw_audio, self._executor), self._shm_resampler.collect
+        return None, None
+
+    async def resample_chunk(self, raw_bytes: bytes) -> np.ndarray:
+        """
+        Resamples a chunk through the shared `BatchResampler` if one is running,
+        otherwise through this connection's own resampler in its executor mode.
 
-        return resampled_int16
+        Records the stage in `stage_latency["resample"]`: inline resampling blocks
+        the event loop for its whole duration, offloaded resampling only for the
+        submit and collect steps.
 
+        Args:
+            raw_bytes: Raw int16 audio; bytes or a zero-copy view of the received message.
 
-    async def process_chunk_queue(self, audio_queue: asyncio.Queue) -> None:
+        Returns:
+            A numpy array containing the resampled audio in int16 format at 16kHz.
         """
-        Continuously processes audio chunks received from an asyncio Queue.
+        start = time.perf_counter()
+        pending, collect = self._submit_resample(raw_bytes)
+        if pending is None:
+            processed = self.process_audio_chunk(raw_bytes)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.stage_latency["resample"].record(elapsed_ms, elapsed_ms)
+            return processed
+
+        submitted = time.perf_counter()
+        result = await pending
+        resumed = time.perf_counter()
+        processed = collect(result) if collect else result
+        end = time.perf_counter()
+        self.stage_latency["resample"].record((end - start) * 1000, ((submitted - start) + (end - resumed)) * 1000)
+        return processed
+
+    def stage_latency_summary(self) -> str:
+        """Returns a one-line summary of the per-stage latency counters (and the silence gate's, if used)."""
+        summary = " | ".join(f"{name}: {stats}" for name, stats in self.stage_latency.items())
+        if self.silence_gate:
+            summary += f" | silence gate: {self.silence_gate.summary()}"
+        return summary
+
+    def release_resampler(self) -> None:
+        """Unregisters from the shared `BatchResampler` and frees the shared-memory segment, if used."""
+        if self._batch_stream_id is not None:
+            self.batch_resampler.unregister(self._batch_stream_id)
+            self._batch_stream_id = None
+        if self._shm_resampler is not None:
+            self._shm_resampler.close()
+            self._shm_resampler = None
+
+
+    async def process_chunk_queue(self, audio_queue: AudioIngestRing) -> None:
+        """
+        Continuously processes audio chunks received from the connection's ingest ring.
 
         Retrieves audio data, processes it using `process_audio_chunk`, and
         feeds the result to the transcriber unless interrupted or the transcription
-        task has failed. Stops when `None` is received from the queue or upon error.
+        task has failed. Stops when the ring is closed and drained or upon error.
 
         Args:
-            audio_queue: An asyncio queue expected to yield dictionaries containing
-                         'pcm' (raw audio bytes) or None to terminate.
+            audio_queue: The connection's `AudioIngestRing`, yielding `AudioPacketMeta`
+                         records whose `pcm` is a view of the received message.
         """
         logger.info("👂▶️ Starting audio chunk processing loop.")
         while True:
@@ -198,20 +278,25 @@ class AudioInputProcessor:
                     logger.info("👂🔌 Received termination signal for audio processing.")
                     break  # Termination signal
 
-                pcm_data = audio_data.pop("pcm")
-
-                # Process audio chunk (resampling happens consistently via float32)
-                processed = self.process_audio_chunk(pcm_data)
-                if processed.size == 0:
-                    continue # Skip empty chunks
-
-                # Feed audio only if not interrupted and transcriber should be running
-                if not self.interrupted:
-                    # Check failure flag again, as it might have been set between queue.get and here
-                     if not self._transcription_failed:
-                        # Feed audio to the underlying processor
-                        self.transcriber.feed_audio(processed.tobytes(), audio_data)
-                     # No 'else' needed here because the checks at the start of the loop handle termination
+                # Drop clearly silent chunks before any resampling or STT work
+                pcm_chunks = self.silence_gate.process(audio_data.pcm) if self.silence_gate else (audio_data.pcm,)
+
+                for pcm in pcm_chunks:
+                    # Process audio chunk (streaming resample, state carried across chunks)
+                    processed = await self.resample_chunk(pcm)
+                    if processed.size == 0:
+                        continue # Skip empty chunks
+
+                    # Feed audio only if not interrupted and transcriber should be running
+                    if not self.interrupted:
+                        # Check failure flag again, as it might have been set between queue.get and here
+                         if not self._transcription_failed:
+                            # Feed audio to the underlying processor
+                            feed_start = time.perf_counter()
+                            self.transcriber.feed_audio(processed.tobytes(), audio_data)
+                            feed_ms = (time.perf_counter() - feed_start) * 1000
+                            self.stage_latency["feed"].record(feed_ms, feed_ms)
+                         # No 'else' needed here because the checks at the start of the loop handle termination
 
             except asyncio.CancelledError:
                 logger.info("👂🚫 Audio processing task cancelled.")
@@ -232,6 +317,7 @@ class AudioInputProcessor:
         transcription task.
         """
         logger.info("👂🛑 Shutting down AudioInputProcessor...")
+        self.release_resampler()
         # Ensure transcriber shutdown is called first to signal the loop
         if hasattr(self.transcriber, 'shutdown'):
              logger.info("👂🛑 Signaling TranscriptionProcessor to shut down.")
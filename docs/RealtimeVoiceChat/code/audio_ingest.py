@@ -0,0 +1,197 @@
+"""
+Ingest path for microphone audio packets received over the WebSocket.
+
+Each binary message from the client is an 8-byte big-endian header
+(uint32 client timestamp in ms, uint32 flags) followed by raw 16-bit PCM.
+The hot path does no per-packet allocation beyond what the WebSocket layer
+already did:
+
+- The PCM payload is a `memoryview` slice of the received message (no copy);
+  `np.frombuffer` in the resampler reads straight from it.
+- Metadata lives in `AudioPacketMeta` records with `__slots__`. The human
+  readable timestamps are only formatted when somebody asks for them.
+- Each connection owns an `AudioIngestRing`: a fixed ring of preallocated
+  records that doubles as the queue between the receiver and the audio
+  processing task, so packets are neither wrapped in dicts nor queue nodes.
+"""
+import asyncio
+import struct
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+AUDIO_PACKET_HEADER = struct.Struct("!II") # timestamp_ms, flags
+AUDIO_PACKET_HEADER_SIZE = AUDIO_PACKET_HEADER.size
+FLAG_TTS_PLAYING = 0x0001
+_EMPTY_VIEW = memoryview(b"")
+
+
+def format_timestamp_ns(timestamp_ns: int) -> str:
+    """
+    Formats a nanosecond timestamp into a human-readable HH:MM:SS.fff string.
+
+    Args:
+        timestamp_ns: The timestamp in nanoseconds since the epoch.
+
+    Returns:
+        A string formatted as hours:minutes:seconds.milliseconds.
+    """
+    # Split into whole seconds and the nanosecond remainder
+    seconds = timestamp_ns // 1_000_000_000
+    remainder_ns = timestamp_ns % 1_000_000_000
+
+    # Convert seconds part into a datetime object (local time)
+    dt = datetime.fromtimestamp(seconds)
+
+    # Format the main time as HH:MM:SS
+    time_str = dt.strftime("%H:%M:%S")
+
+    # For instance, if you want milliseconds, divide the remainder by 1e6 and format as 3-digit
+    milliseconds = remainder_ns // 1_000_000
+    formatted_timestamp = f"{time_str}.{milliseconds:03d}"
+
+    return formatted_timestamp
+
+
+class AudioPacketMeta:
+    """
+    Metadata and PCM payload of one received audio packet.
+
+    Instances are owned and reused by an `AudioIngestRing`; a record handed out
+    by `AudioIngestRing.get` stays valid until the next `get` call.
+    """
+    __slots__ = ("client_sent_ms", "flags", "server_received", "pcm")
+
+    def __init__(self) -> None:
+        self.client_sent_ms: int = 0
+        self.flags: int = 0
+        self.server_received: int = 0 # time.time_ns() at receipt
+        self.pcm: memoryview = _EMPTY_VIEW
+
+    def fill(self, raw: bytes, server_received_ns: int) -> None:
+        """
+        Parses a packet into this record without copying its payload.
+
+        Args:
+            raw: The complete binary message (header and PCM).
+            server_received_ns: Receive time in nanoseconds since the epoch.
+        """
+        self.client_sent_ms, self.flags = AUDIO_PACKET_HEADER.unpack_from(raw)
+        self.server_received = server_received_ns
+        self.pcm = memoryview(raw)[AUDIO_PACKET_HEADER_SIZE:]
+
+    @property
+    def client_sent(self) -> int:
+        """Client send time in nanoseconds (millisecond resolution, wraps like the header field)."""
+        return self.client_sent_ms * 1_000_000
+
+    @property
+    def is_tts_playing(self) -> bool:
+        """True if the client was playing TTS audio when it recorded the packet."""
+        return bool(self.flags & FLAG_TTS_PLAYING)
+
+    @property
+    def client_sent_formatted(self) -> str:
+        return format_timestamp_ns(self.client_sent)
+
+    @property
+    def server_received_formatted(self) -> str:
+        return format_timestamp_ns(self.server_received)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns the metadata (without PCM) in the dictionary form used for logging."""
+        return {
+            "client_sent_ms": self.client_sent_ms,
+            "client_sent": self.client_sent,
+            "client_sent_formatted": self.client_sent_formatted,
+            "isTTSPlaying": self.is_tts_playing,
+            "server_received": self.server_received,
+            "server_received_formatted": self.server_received_formatted,
+        }
+
+
+class AudioIngestRing:
+    """
+    Per-connection single-producer/single-consumer ring of audio packets.
+
+    Both sides run on the event loop: the WebSocket receiver `push`es packets,
+    the audio processing task awaits `get`. The ring holds at most `capacity`
+    packets; when it is full new packets are dropped (the consumer is lagging)
+    rather than growing memory. The record returned by `get` is released on
+    the following `get`, so it must not be kept beyond one processing step.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Initializes the AudioIngestRing.
+
+        Args:
+            capacity: Maximum number of buffered packets (including the one
+                      currently being processed).
+        """
+        if capacity < 2:
+            raise ValueError("AudioIngestRing capacity must be at least 2")
+        self.capacity = capacity
+        self._slots: List[AudioPacketMeta] = [AudioPacketMeta() for _ in range(capacity)]
+        self._head: int = 0 # Index of the oldest occupied slot
+        self._count: int = 0 # Occupied slots, including one held by the consumer
+        self._held: bool = False # Consumer still holds the slot at _head
+        self._closed: bool = False
+        self._ready = asyncio.Event()
+
+        # Statistics
+        self.pushed: int = 0
+        self.dropped: int = 0
+
+    def push(self, raw: bytes, server_received_ns: Optional[int] = None) -> bool:
+        """
+        Stores one received packet.
+
+        Args:
+            raw: The complete binary message; must hold at least the header.
+            server_received_ns: Receive time; defaults to `time.time_ns()`.
+
+        Returns:
+            True if queued, False if the ring was full or closed and the packet was dropped.
+        """
+        if self._closed or self._count == self.capacity:
+            self.dropped += 1
+            return False
+        slot = self._slots[(self._head + self._count) % self.capacity]
+        slot.fill(raw, time.time_ns() if server_received_ns is None else server_received_ns)
+        self._count += 1
+        self.pushed += 1
+        self._ready.set()
+        return True
+
+    def _release_held(self) -> None:
+        if self._held:
+            self._slots[self._head].pcm = _EMPTY_VIEW # Let the message buffer go
+            self._head = (self._head + 1) % self.capacity
+            self._count -= 1
+            self._held = False
+
+    async def get(self) -> Optional[AudioPacketMeta]:
+        """
+        Waits for the next packet, releasing the previously returned one.
+
+        Returns:
+            The packet record, or None once the ring is closed and drained.
+        """
+        self._release_held()
+        while self._count == 0:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        self._held = True
+        return self._slots[self._head]
+
+    def close(self) -> None:
+        """Stops accepting packets; `get` returns None after the remaining ones."""
+        self._closed = True
+        self._ready.set()
+
+    def qsize(self) -> int:
+        """Returns the number of packets waiting (excluding one held by the consumer)."""
+        return self._count - int(self._held)
@@ -1,19 +1,20 @@
-import asyncio
 import logging
 import os
-import struct
 import threading
 import time
 from collections import namedtuple
-from queue import Queue
 from typing import Callable, Generator, Optional, Any
 
-import numpy as np
 from huggingface_hub import hf_hub_download
 # Assuming RealtimeTTS is installed and available
 from RealtimeTTS import (CoquiEngine, KokoroEngine, OrpheusEngine,
                          OrpheusVoice, TextToAudioStream)
 
+from async_bridge import ThreadToAsyncChannel
+from pcm_analysis import trim_leading_silence
+from tts_cache import get_tts_cache, iter_pcm_chunks, tts_cache_key
+from tts_pacing import MIN_STREAM_CHUNK_SIZE, StreamPacingController, pcm_duration
+
 logger = logging.getLogger(__name__)
 
 # Default configuration constants
@@ -24,9 +25,21 @@ ENGINE_SILENCES = {
     "kokoro":  Silence(comma=0.12, sentence=0.25, default=0.12),
     "orpheus": Silence(comma=0.3, sentence=0.6, default=0.3),
 }
-# Stream chunk sizes influence latency vs. throughput trade-offs
-QUICK_ANSWER_STREAM_CHUNK_SIZE = 8
-FINAL_ANSWER_STREAM_CHUNK_SIZE = 30
+# Mean absolute amplitude below which leading audio counts as silence and is trimmed
+# (Orpheus starts with audible low-level noise, hence the higher thresholds)
+SilenceTrim = namedtuple("SilenceTrim", ("quick", "final"))
+ENGINE_SILENCE_TRIM = {
+    "coqui":   SilenceTrim(quick=50, final=50),
+    "kokoro":  SilenceTrim(quick=50, final=50),
+    "orpheus": SilenceTrim(quick=200, final=100),
+}
+# Voice and speed per engine (also part of the TTS audio cache key)
+EngineVoice = namedtuple("EngineVoice", ("voice", "speed"))
+ENGINE_VOICES = {
+    "coqui":   EngineVoice(voice="reference_audio.wav", speed=1.1),
+    "kokoro":  EngineVoice(voice="af_heart", speed=1.15),
+    "orpheus": EngineVoice(voice="tara", speed=1.0),
+}
 
 # Coqui model download helper functions
 def create_directory(path: str) -> None:
@@ -83,6 +96,7 @@ class AudioProcessor:
             skip_prewarm: bool = False,
             shared_engine: Optional[Any] = None, # NEW: Accept shared TTS engine
             shared_stream: Optional[Any] = None, # NEW: Accept shared TTS stream
+            pacing: Optional[StreamPacingController] = None,
         ) -> None:
         """
         Initializes the AudioProcessor with a specific TTS engine.
@@ -97,15 +111,18 @@ class AudioProcessor:
             skip_prewarm: If True, skips prewarming and uses default latency estimates.
             shared_engine: Optional pre-initialized TTS engine to share across connections.
             shared_stream: Optional pre-initialized TextToAudioStream to share across connections.
+            pacing: The session's chunk size / initial buffer controller (a new one if None).
         """
         self.engine_name = engine
         self.stop_event = threading.Event()
         self.finished_event = threading.Event()
-        self.audio_chunks = asyncio.Queue() # Queue for synthesized audio output
         self.orpheus_model = orpheus_model
 
         self.silence = ENGINE_SILENCES.get(engine, ENGINE_SILENCES[self.engine_name])
-        self.current_stream_chunk_size = QUICK_ANSWER_STREAM_CHUNK_SIZE # Initial chunk size
+        self.voice = ENGINE_VOICES.get(engine, ENGINE_VOICES[START_ENGINE])
+        self.silence_trim = ENGINE_SILENCE_TRIM.get(engine, ENGINE_SILENCE_TRIM[START_ENGINE])
+        self.current_stream_chunk_size = MIN_STREAM_CHUNK_SIZE # Initial chunk size
+        self.pacing = pacing or StreamPacingController()
 
         # NEW: Use shared engine and stream if provided
         if shared_engine is not None and shared_stream is not None:
@@ -126,8 +143,8 @@ class AudioProcessor:
             self.engine = CoquiEngine(
                 specific_model="Lasinya",
                 local_models_path="./models",
-                voice="reference_audio.wav",
-                speed=1.1,
+                voice=self.voice.voice,
+                speed=self.voice.speed,
                 use_deepspeed=True,
                 thread_count=6,
                 stream_chunk_size=self.current_stream_chunk_size,
@@ -140,8 +157,8 @@ class AudioProcessor:
         elif engine == "kokoro":
             # Tuning for smoother yet snappier playback (reduce gaps between sentences)
             self.engine = KokoroEngine(
-                voice="af_heart",
-                default_speed=1.15,
+                voice=self.voice.voice,
+                default_speed=self.voice.speed,
                 trim_silence=False,
                 silence_threshold=0.005,
                 extra_start_ms=40,
@@ -157,7 +174,7 @@ class AudioProcessor:
                 repetition_penalty=1.1,
                 max_tokens=1200,
             )
-            voice = OrpheusVoice("tara")
+            voice = OrpheusVoice(self.voice.voice)
             self.engine.set_voice(voice)
         else:
             raise ValueError(f"Unsupported engine: {engine}")
@@ -173,11 +190,8 @@ class AudioProcessor:
             on_audio_stream_stop=self.on_audio_stream_stop,
         )
 
-        # Ensure Coqui engine starts with the quick chunk size
-        if self.engine_name == "coqui" and hasattr(self.engine, 'set_stream_chunk_size') and self.current_stream_chunk_size != QUICK_ANSWER_STREAM_CHUNK_SIZE:
-            logger.info(f"👄⚙️ Setting Coqui stream chunk size to {QUICK_ANSWER_STREAM_CHUNK_SIZE} for initial setup.")
-            self.engine.set_stream_chunk_size(QUICK_ANSWER_STREAM_CHUNK_SIZE)
-            self.current_stream_chunk_size = QUICK_ANSWER_STREAM_CHUNK_SIZE
+        # Ensure Coqui engine starts with the lowest-latency chunk size
+        self._set_stream_chunk_size(MIN_STREAM_CHUNK_SIZE, "initial setup")
 
         if not skip_prewarm:
             # Prewarm the engine
@@ -246,6 +260,13 @@ class AudioProcessor:
         # Callbacks to be set externally if needed
         self.on_first_audio_chunk_synthesize: Optional[Callable[[], None]] = None
 
+    def _set_stream_chunk_size(self, size: int, reason: str) -> None:
+        """Applies an engine stream chunk size (Coqui only; other engines stream at a fixed size)."""
+        if self.engine_name == "coqui" and hasattr(self.engine, 'set_stream_chunk_size') and self.current_stream_chunk_size != size:
+            logger.info(f"👄⚙️ Setting Coqui stream chunk size to {size} for {reason}.")
+            self.engine.set_stream_chunk_size(size)
+            self.current_stream_chunk_size = size
+
     def on_audio_stream_stop(self) -> None:
         """
         Callback executed when the RealtimeTTS audio stream stops processing.
@@ -258,7 +279,7 @@ class AudioProcessor:
     def synthesize(
             self,
             text: str,
-            audio_chunks: Queue, 
+            audio_chunks: ThreadToAsyncChannel,
             stop_event: threading.Event,
             generation_string: str = "",
         ) -> bool:
@@ -268,13 +289,14 @@ class AudioProcessor:
         Feeds the entire text string to the TTS engine. As audio chunks are generated,
         they are potentially buffered initially for smoother streaming and then put
         into the provided queue. Synthesis can be interrupted via the stop_event.
-        Skips initial silent chunks if using the Orpheus engine. Triggers the
+        Trims leading silence at sample resolution (see `ENGINE_SILENCE_TRIM`). Triggers the
         `on_first_audio_chunk_synthesize` callback when the first valid audio chunk is queued.
 
         Args:
             text: The text string to synthesize.
-            audio_chunks: The queue to put the resulting audio chunks (bytes) into.
-                          This should typically be the instance's `self.audio_chunks`.
+            audio_chunks: The channel to put the resulting audio chunks (bytes) into.
+                          Puts block while the channel is full; once it is
+                          closed (generation aborted) remaining audio is dropped.
             stop_event: A threading.Event to signal interruption of the synthesis.
                         This should typically be the instance's `self.stop_event`.
             generation_string: An optional identifier string for logging purposes.
@@ -283,18 +305,24 @@ class AudioProcessor:
             True if synthesis completed fully, False if interrupted by stop_event.
         """
         logger.debug(f"👄 synthesize QUICK start text_len={len(text)}")
+        self.pacing.begin_response()
 
-        if self.engine_name == "coqui" and hasattr(self.engine, 'set_stream_chunk_size') and self.current_stream_chunk_size != QUICK_ANSWER_STREAM_CHUNK_SIZE:
-            logger.info(f"👄⚙️ {generation_string} Setting Coqui stream chunk size to {QUICK_ANSWER_STREAM_CHUNK_SIZE} for quick synthesis.")
-            self.engine.set_stream_chunk_size(QUICK_ANSWER_STREAM_CHUNK_SIZE)
-            self.current_stream_chunk_size = QUICK_ANSWER_STREAM_CHUNK_SIZE
+        cache = get_tts_cache()
+        cache_key = tts_cache_key(self.engine_name, self.voice.voice, self.voice.speed, text) if cache else ""
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return self._play_cached(cached, text, audio_chunks, stop_event, generation_string)
+        synthesized: list[bytes] = [] # Every chunk that was queued, stored in the cache on completion
+
+        self._set_stream_chunk_size(self.pacing.stream_chunk_size(first=True), f"{generation_string} quick synthesis")
 
         self.stream.feed(text)
         self.finished_event.clear() # Reset finished event before starting
 
-        # Buffering state variables
+        # Buffering state variables: hold audio until the controller's initial buffer is filled
         buffer: list[bytes] = []
-        good_streak: int = 0
+        buffer_target: float = self.pacing.initial_buffer_s()
         buffering: bool = True
         buf_dur: float = 0.0
         SR, BPS = 24000, 2 # Assumed Sample Rate and Bytes Per Sample (16-bit)
@@ -302,7 +330,7 @@ class AudioProcessor:
         self._quick_prev_chunk_time: float = 0.0 # Track time of previous chunk
 
         def on_audio_chunk(chunk: bytes):
-            nonlocal buffer, good_streak, buffering, buf_dur, start
+            nonlocal buffer, buffering, buf_dur, start
             # Check for interruption signal
             if stop_event.is_set():
                 logger.info(f"👄🛑 {generation_string} Quick audio stream interrupted by stop_event. Text: {text[:50]}...")
@@ -313,32 +341,17 @@ class AudioProcessor:
             samples = len(chunk) // BPS
             play_duration = samples / SR # Duration of the current chunk
 
-            # --- Orpheus specific: Skip initial silence ---
-            if on_audio_chunk.first_call and self.engine_name == "orpheus":
-                if not hasattr(on_audio_chunk, "silent_chunks_count"):
-                    # Initialize silence detection state
-                    on_audio_chunk.silent_chunks_count = 0
-                    on_audio_chunk.silent_chunks_time = 0.0
-                    on_audio_chunk.silence_threshold = 200 # Amplitude threshold for silence
-
-                try:
-                    # Analyze chunk for silence
-                    fmt = f"{samples}h" # Format for 16-bit signed integers
-                    pcm_data = struct.unpack(fmt, chunk)
-                    avg_amplitude = np.abs(np.array(pcm_data)).mean()
-
-                    if avg_amplitude < on_audio_chunk.silence_threshold:
-                        on_audio_chunk.silent_chunks_count += 1
-                        on_audio_chunk.silent_chunks_time += play_duration
-                        logger.debug(f"👄⏭️ {generation_string} Quick Skipping silent chunk {on_audio_chunk.silent_chunks_count} (avg_amp: {avg_amplitude:.2f})")
-                        return # Skip this chunk
-                    elif on_audio_chunk.silent_chunks_count > 0:
-                        # First non-silent chunk after silence
-                        logger.info(f"👄⏭️ {generation_string} Quick Skipped {on_audio_chunk.silent_chunks_count} silent chunks, saved {on_audio_chunk.silent_chunks_time*1000:.2f}ms")
-                        # Proceed to process this non-silent chunk
-                except Exception as e:
-                    logger.warning(f"👄⚠️ {generation_string} Quick Error analyzing audio chunk for silence: {e}")
-                    # Proceed assuming not silent on error
+            # --- Skip leading silence (sample-accurate: the chunk where speech starts is trimmed) ---
+            if on_audio_chunk.first_call:
+                chunk, removed = trim_leading_silence(chunk, self.silence_trim.quick)
+                on_audio_chunk.silent_samples += removed
+                if not chunk:
+                    logger.debug(f"👄⏭️ {generation_string} Quick Skipping silent chunk ({removed} samples)")
+                    return # Skip
+                if on_audio_chunk.silent_samples:
+                    logger.info(f"👄⏭️ {generation_string} Quick Trimmed leading silence, saved {on_audio_chunk.silent_samples / SR * 1000:.2f}ms")
+                samples = len(chunk) // BPS
+                play_duration = samples / SR
 
             # --- Timing and Logging ---
             if on_audio_chunk.first_call:
@@ -350,44 +363,44 @@ class AudioProcessor:
             else:
                 gap = now - self._quick_prev_chunk_time
                 self._quick_prev_chunk_time = now
-                if gap <= play_duration * 1.1: # Allow small tolerance
-                    # logger.debug(f"👄✅ {generation_string} Quick chunk ok (gap={gap:.3f}s ≤ {play_duration:.3f}s). Text: {text[:50]}...")
-                    good_streak += 1
-                else:
+                self.pacing.record_chunk(gap, play_duration)
+                if gap > play_duration * 1.1: # Allow small tolerance
                     logger.warning(f"👄❌ {generation_string} Quick chunk slow (gap={gap:.3f}s > {play_duration:.3f}s). Text: {text[:50]}...")
-                    good_streak = 0 # Reset streak on slow chunk
 
             put_occurred_this_call = False # Track if put happened in this specific call
 
             # --- Buffering Logic ---
             buffer.append(chunk) # Always append the received chunk first
             buf_dur += play_duration # Update buffer duration
+            if cache is not None:
+                synthesized.append(chunk)
 
             if buffering:
                 # Check conditions to flush buffer and stop buffering
-                if good_streak >= 2 or buf_dur >= 0.5: # Flush if stable or buffer > 0.5s
-                    logger.info(f"👄➡️ {generation_string} Quick Flushing buffer (streak={good_streak}, dur={buf_dur:.2f}s).")
+                if buf_dur >= buffer_target: # Flush once the initial buffer is filled
+                    logger.info(f"👄➡️ {generation_string} Quick Flushing buffer (dur={buf_dur:.2f}s, target={buffer_target:.2f}s).")
                     for c in buffer:
-                        try:
-                            audio_chunks.put_nowait(c)
-                            logger.debug(f"👄 QUICK put chunk bytes={len(c)} qsize={audio_chunks.qsize()}")
-                            put_occurred_this_call = True
-                        except asyncio.QueueFull:
-                            logger.warning(f"👄⚠️ {generation_string} Quick audio queue full, dropping chunk.")
+                        if not audio_chunks.put(c): # Blocks while the sender is behind; False once closed
+                            logger.info(f"👄🛑 {generation_string} Quick audio channel closed, dropping remaining chunks.")
+                            break
+                        logger.debug(f"👄 QUICK put chunk bytes={len(c)} qsize={audio_chunks.qsize()}")
+                        self.pacing.record_release(pcm_duration(c))
+                        put_occurred_this_call = True
                     buffer.clear()
                     buf_dur = 0.0 # Reset buffer duration
                     buffering = False # Stop buffering mode
             else: # Not buffering, put chunk directly
-                try:
-                    audio_chunks.put_nowait(chunk)
+                if audio_chunks.put(chunk):
                     logger.debug(f"👄 QUICK put chunk bytes={len(chunk)} qsize={audio_chunks.qsize()}")
+                    self.pacing.record_release(play_duration)
                     put_occurred_this_call = True
-                except asyncio.QueueFull:
-                    logger.warning(f"👄⚠️ {generation_string} Quick audio queue full, dropping chunk.")
+                else:
+                    logger.debug(f"👄🛑 {generation_string} Quick audio channel closed, dropping chunk.")
 
 
             # --- First Chunk Callback ---
             if put_occurred_this_call and not on_audio_chunk.callback_fired:
+                self.pacing.record_ttfa(time.time() - start)
                 if self.on_first_audio_chunk_synthesize:
                     try:
                         logger.info(f"👄🚀 {generation_string} Quick Firing on_first_audio_chunk_synthesize.")
@@ -400,6 +413,7 @@ class AudioProcessor:
         # Initialize callback state for this run
         on_audio_chunk.first_call = True
         on_audio_chunk.callback_fired = False
+        on_audio_chunk.silent_samples = 0
 
         play_kwargs = dict(
             log_synthesized_text=True, # Log the text being synthesized
@@ -430,21 +444,67 @@ class AudioProcessor:
         # # If loop exited normally, check if buffer still has content (stream finished before flush)
         if buffering and buffer and not stop_event.is_set():
             logger.info(f"👄➡️ {generation_string} Quick Flushing remaining buffer after stream finished.")
+            if not on_audio_chunk.callback_fired:
+                self.pacing.record_ttfa(time.time() - start)
             for c in buffer:
-                 try:
-                    audio_chunks.put_nowait(c)
-                 except asyncio.QueueFull:
-                    logger.warning(f"👄⚠️ {generation_string} Quick audio queue full on final flush, dropping chunk.")
+                if not audio_chunks.put(c):
+                    break # Channel closed (generation aborted)
+                self.pacing.record_release(pcm_duration(c))
             buffer.clear()
 
+        if cache is not None and not stop_event.is_set():
+            cache.put(cache_key, b"".join(synthesized))
+
         logger.debug(f"👄 synthesize QUICK finished completed={not stop_event.is_set()}")
         logger.info(f"👄✅ {generation_string} Quick answer synthesis complete. Text: {text[:50]}...")
         return True # Indicate successful completion
 
+    def _play_cached(
+            self,
+            pcm: Any,
+            text: str,
+            audio_chunks: ThreadToAsyncChannel,
+            stop_event: threading.Event,
+            generation_string: str = "",
+        ) -> bool:
+        """
+        Streams cached audio of a sentence instead of synthesizing it.
+
+        Args:
+            pcm: Cached 24 kHz 16-bit PCM (see `tts_cache.TTSAudioCache.get`).
+            text: The sentence (for logging).
+            audio_chunks: The channel to put the audio slices into.
+            stop_event: Interrupts streaming when set.
+            generation_string: An optional identifier string for logging purposes.
+
+        Returns:
+            True if all audio was queued, False if interrupted by stop_event.
+        """
+        start = time.time()
+        first = True
+        for chunk in iter_pcm_chunks(pcm):
+            if stop_event.is_set():
+                logger.info(f"👄🛑 {generation_string} Cached audio interrupted by stop_event. Text: {text[:50]}...")
+                return False
+            if not audio_chunks.put(chunk):
+                logger.info(f"👄🛑 {generation_string} Audio channel closed, dropping remaining cached audio.")
+                break
+            self.pacing.record_release(pcm_duration(chunk))
+            if first:
+                first = False
+                self.pacing.record_ttfa(time.time() - start)
+                logger.info(f"👄🚀 {generation_string} Cached audio start. TTFA: {(time.time() - start) * 1000:.1f}ms. Text: {text[:50]}...")
+                if self.on_first_audio_chunk_synthesize:
+                    try:
+                        self.on_first_audio_chunk_synthesize()
+                    except Exception as e:
+                        logger.error(f"👄💥 {generation_string} Error in on_first_audio_chunk_synthesize callback: {e}", exc_info=True)
+        return True
+
     def synthesize_generator(
             self,
             generator: Generator[str, None, None],
-            audio_chunks: Queue, # Should match self.audio_chunks type
+            audio_chunks: ThreadToAsyncChannel,
             stop_event: threading.Event,
             generation_string: str = "",
         ) -> bool:
@@ -454,15 +514,16 @@ class AudioProcessor:
         Feeds text chunks yielded by the generator to the TTS engine. As audio chunks
         are generated, they are potentially buffered initially and then put into the
         provided queue. Synthesis can be interrupted via the stop_event.
-        Skips initial silent chunks if using the Orpheus engine. Sets specific playback
+        Trims leading silence at sample resolution. Sets specific playback
         parameters when using the Orpheus engine. Triggers the
        `on_first_audio_chunk_synthesize` callback when the first valid audio chunk is queued.
 
 
         Args:
             generator: A generator yielding text chunks (strings) to synthesize.
-            audio_chunks: The queue to put the resulting audio chunks (bytes) into.
-                          This should typically be the instance's `self.audio_chunks`.
+            audio_chunks: The channel to put the resulting audio chunks (bytes) into.
+                          Puts block while the channel is full; once it is
+                          closed (generation aborted) remaining audio is dropped.
             stop_event: A threading.Event to signal interruption of the synthesis.
                         This should typically be the instance's `self.stop_event`.
             generation_string: An optional identifier string for logging purposes.
@@ -472,18 +533,16 @@ class AudioProcessor:
         """
         logger.info(f"👄 synthesize FINAL start stop_set={stop_event.is_set()}")
 
-        if self.engine_name == "coqui" and hasattr(self.engine, 'set_stream_chunk_size') and self.current_stream_chunk_size != FINAL_ANSWER_STREAM_CHUNK_SIZE:
-            logger.info(f"👄⚙️ {generation_string} Setting Coqui stream chunk size to {FINAL_ANSWER_STREAM_CHUNK_SIZE} for generator synthesis.")
-            self.engine.set_stream_chunk_size(FINAL_ANSWER_STREAM_CHUNK_SIZE)
-            self.current_stream_chunk_size = FINAL_ANSWER_STREAM_CHUNK_SIZE
+        # Larger chunks synthesize more efficiently; the lead built by the quick answer hides their latency
+        self._set_stream_chunk_size(self.pacing.stream_chunk_size(first=False), f"{generation_string} generator synthesis")
 
         # Feed the generator to the stream
         self.stream.feed(generator)
         self.finished_event.clear() # Reset finished event
 
-        # Buffering state variables
+        # Buffering state variables; audio the client has not played yet counts towards the buffer
         buffer: list[bytes] = []
-        good_streak: int = 0
+        buffer_target: float = self.pacing.initial_buffer_s()
         buffering: bool = True
         buf_dur: float = 0.0
         SR, BPS = 24000, 2 # Assumed Sample Rate and Bytes Per Sample
@@ -491,7 +550,7 @@ class AudioProcessor:
         self._final_prev_chunk_time: float = 0.0 # Separate timer for generator synthesis
 
         def on_audio_chunk(chunk: bytes):
-            nonlocal buffer, good_streak, buffering, buf_dur, start
+            nonlocal buffer, buffering, buf_dur, start
             if stop_event.is_set():
                 logger.info(f"👄🛑 {generation_string} Final audio stream interrupted by stop_event.")
                 return
@@ -500,28 +559,17 @@ class AudioProcessor:
             samples = len(chunk) // BPS
             play_duration = samples / SR
 
-            # --- Orpheus specific: Skip initial silence ---
-            if on_audio_chunk.first_call and self.engine_name == "orpheus":
-                if not hasattr(on_audio_chunk, "silent_chunks_count"):
-                    on_audio_chunk.silent_chunks_count = 0
-                    on_audio_chunk.silent_chunks_time = 0.0
-                    # Lower threshold potentially for final answers? Or keep consistent? Using 100 as in original code.
-                    on_audio_chunk.silence_threshold = 100
-
-                try:
-                    fmt = f"{samples}h"
-                    pcm_data = struct.unpack(fmt, chunk)
-                    avg_amplitude = np.abs(np.array(pcm_data)).mean()
-
-                    if avg_amplitude < on_audio_chunk.silence_threshold:
-                        on_audio_chunk.silent_chunks_count += 1
-                        on_audio_chunk.silent_chunks_time += play_duration
-                        logger.debug(f"👄⏭️ {generation_string} Final Skipping silent chunk {on_audio_chunk.silent_chunks_count} (avg_amp: {avg_amplitude:.2f})")
-                        return # Skip
-                    elif on_audio_chunk.silent_chunks_count > 0:
-                        logger.info(f"👄⏭️ {generation_string} Final Skipped {on_audio_chunk.silent_chunks_count} silent chunks, saved {on_audio_chunk.silent_chunks_time*1000:.2f}ms")
-                except Exception as e:
-                    logger.warning(f"👄⚠️ {generation_string} Final Error analyzing audio chunk for silence: {e}")
+            # --- Skip leading silence (sample-accurate: the chunk where speech starts is trimmed) ---
+            if on_audio_chunk.first_call:
+                chunk, removed = trim_leading_silence(chunk, self.silence_trim.final)
+                on_audio_chunk.silent_samples += removed
+                if not chunk:
+                    logger.debug(f"👄⏭️ {generation_string} Final Skipping silent chunk ({removed} samples)")
+                    return # Skip
+                if on_audio_chunk.silent_samples:
+                    logger.info(f"👄⏭️ {generation_string} Final Trimmed leading silence, saved {on_audio_chunk.silent_samples / SR * 1000:.2f}ms")
+                samples = len(chunk) // BPS
+                play_duration = samples / SR
 
             # --- Timing and Logging ---
             if on_audio_chunk.first_call:
@@ -533,12 +581,9 @@ class AudioProcessor:
             else:
                 gap = now - self._final_prev_chunk_time
                 self._final_prev_chunk_time = now
-                if gap <= play_duration * 1.1:
-                    # logger.debug(f"👄✅ {generation_string} Final chunk ok (gap={gap:.3f}s ≤ {play_duration:.3f}s).")
-                    good_streak += 1
-                else:
+                self.pacing.record_chunk(gap, play_duration)
+                if gap > play_duration * 1.1:
                     logger.warning(f"👄❌ {generation_string} Final chunk slow (gap={gap:.3f}s > {play_duration:.3f}s).")
-                    good_streak = 0
 
             put_occurred_this_call = False
 
@@ -546,25 +591,25 @@ class AudioProcessor:
             buffer.append(chunk)
             buf_dur += play_duration
             if buffering:
-                if good_streak >= 2 or buf_dur >= 0.5: # Same flush logic as synthesize
-                    logger.info(f"👄➡️ {generation_string} Final Flushing buffer (streak={good_streak}, dur={buf_dur:.2f}s).")
+                if buf_dur >= buffer_target: # Same flush logic as synthesize
+                    logger.info(f"👄➡️ {generation_string} Final Flushing buffer (dur={buf_dur:.2f}s, target={buffer_target:.2f}s).")
                     for c in buffer:
-                        try:
-                           audio_chunks.put_nowait(c)
-                           logger.debug(f"👄 FINAL put chunk bytes={len(c)} qsize={audio_chunks.qsize()}")
-                           put_occurred_this_call = True
-                        except asyncio.QueueFull:
-                            logger.warning(f"👄⚠️ {generation_string} Final audio queue full, dropping chunk.")
+                        if not audio_chunks.put(c): # Blocks while the sender is behind; False once closed
+                            logger.info(f"👄🛑 {generation_string} Final audio channel closed, dropping remaining chunks.")
+                            break
+                        logger.debug(f"👄 FINAL put chunk bytes={len(c)} qsize={audio_chunks.qsize()}")
+                        self.pacing.record_release(pcm_duration(c))
+                        put_occurred_this_call = True
                     buffer.clear()
                     buf_dur = 0.0
                     buffering = False
             else: # Not buffering
-                try:
-                    audio_chunks.put_nowait(chunk)
+                if audio_chunks.put(chunk):
                     logger.debug(f"👄 FINAL put chunk bytes={len(chunk)} qsize={audio_chunks.qsize()}")
+                    self.pacing.record_release(play_duration)
                     put_occurred_this_call = True
-                except asyncio.QueueFull:
-                    logger.warning(f"👄⚠️ {generation_string} Final audio queue full, dropping chunk.")
+                else:
+                    logger.debug(f"👄🛑 {generation_string} Final audio channel closed, dropping chunk.")
 
 
             # --- First Chunk Callback --- (Using the same callback as synthesize)
@@ -580,6 +625,7 @@ class AudioProcessor:
         # Initialize callback state
         on_audio_chunk.first_call = True
         on_audio_chunk.callback_fired = False
+        on_audio_chunk.silent_samples = 0
 
         play_kwargs = dict(
             log_synthesized_text=True, # Log text from generator
@@ -615,10 +661,9 @@ class AudioProcessor:
         if buffering and buffer and not stop_event.is_set():
             logger.info(f"👄➡️ {generation_string} Final Flushing remaining buffer after stream finished.")
             for c in buffer:
-                try:
-                   audio_chunks.put_nowait(c)
-                except asyncio.QueueFull:
-                   logger.warning(f"👄⚠️ {generation_string} Final audio queue full on final flush, dropping chunk.")
+                if not audio_chunks.put(c):
+                    break # Channel closed (generation aborted)
+                self.pacing.record_release(pcm_duration(c))
             buffer.clear()
 
         logger.info(f"👄 synthesize FINAL finished completed={not stop_event.is_set()}")
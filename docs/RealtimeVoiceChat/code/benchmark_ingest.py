@@ -0,0 +1,109 @@
+"""
+Benchmark: per-packet overhead of the WebSocket audio ingest path
+
+Pushes the same client packets (8-byte header + 2048 int16 samples) through
+
+- legacy: the previous path in `process_incoming_data` / `process_chunk_queue`
+          (`raw[8:]` copy, metadata dict with two `format_timestamp_ns` calls,
+          `asyncio.Queue` put/get, `np.frombuffer`)
+- ring:   `AudioIngestRing` (memoryview payload, reused `__slots__` records,
+          `np.frombuffer` on the view)
+
+and reports the CPU cost per packet, plus the projected event-loop load at
+50 packets/s for N connections.
+
+Run from the code directory:
+    python benchmark_ingest.py --connections 10 20 50 100
+"""
+import argparse
+import asyncio
+import struct
+import time
+
+import numpy as np
+
+from audio_ingest import AudioIngestRing, format_timestamp_ns
+
+PACKET_SAMPLES = 2048 # Matches BATCH_SAMPLES in static/app.js
+PACKETS_PER_SECOND = 50
+
+
+def make_packets(count: int) -> list:
+    rng = np.random.default_rng(0)
+    pcm = rng.integers(-3000, 3000, PACKET_SAMPLES, dtype=np.int16).tobytes()
+    return [struct.pack("!II", i * 20, i & 1) + pcm for i in range(count)]
+
+
+async def legacy_path(packets: list) -> int:
+    queue: asyncio.Queue = asyncio.Queue()
+    total = 0
+    for raw in packets:
+        timestamp_ms, flags = struct.unpack("!II", raw[:8])
+        client_sent_ns = timestamp_ms * 1_000_000
+        metadata = {
+            "client_sent_ms":           timestamp_ms,
+            "client_sent":              client_sent_ns,
+            "client_sent_formatted":    format_timestamp_ns(client_sent_ns),
+            "isTTSPlaying":             bool(flags & 1),
+        }
+        server_ns = time.time_ns()
+        metadata["server_received"] = server_ns
+        metadata["server_received_formatted"] = format_timestamp_ns(server_ns)
+        metadata["pcm"] = raw[8:]
+        if queue.qsize() < 50:
+            await queue.put(metadata)
+
+        audio_data = await queue.get()
+        samples = np.frombuffer(audio_data.pop("pcm"), dtype=np.int16)
+        total += samples.size
+    return total
+
+
+async def ring_path(packets: list) -> int:
+    ring = AudioIngestRing(51)
+    total = 0
+    for raw in packets:
+        ring.push(raw)
+
+        audio_data = await ring.get()
+        samples = np.frombuffer(audio_data.pcm, dtype=np.int16)
+        total += samples.size
+    return total
+
+
+def measure(path, packets: list, repeats: int) -> float:
+    """Returns the best time per packet in microseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        asyncio.run(path(packets))
+        best = min(best, time.perf_counter() - start)
+    return best / len(packets) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--packets", type=int, default=20000, help="Packets per measurement")
+    parser.add_argument("--repeats", type=int, default=5, help="Repetitions; the best run is reported")
+    parser.add_argument("--connections", type=int, nargs="+", default=[10, 20, 50, 100], help="Connection counts to project")
+    args = parser.parse_args()
+
+    packets = make_packets(args.packets)
+    results = {name: measure(path, packets, args.repeats) for name, path in (("legacy", legacy_path), ("ring", ring_path))}
+
+    print(f"{args.packets} packets of {PACKET_SAMPLES} samples, best of {args.repeats}")
+    print()
+    print(f"{'path':<7} {'us/packet':>10}")
+    for name, us in results.items():
+        print(f"{name:<7} {us:>10.2f}")
+    print()
+    header = "".join(f"{n:>10}" for n in args.connections)
+    print(f"event-loop load at {PACKETS_PER_SECOND} packets/s per connection (% of one core)")
+    print(f"{'path':<7}{header}")
+    for name, us in results.items():
+        row = "".join(f"{us * PACKETS_PER_SECOND * n / 1e4:>9.2f}%" for n in args.connections)
+        print(f"{name:<7}{row}")
+
+
+if __name__ == "__main__":
+    main()
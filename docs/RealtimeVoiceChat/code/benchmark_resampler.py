@@ -0,0 +1,112 @@
+"""
+Benchmark: streaming resampler vs. the per-chunk resample_poly path
+
+Compares throughput (input samples/sec) and output equivalence of
+`StreamingResampler` against the stateless per-chunk path that
+`AudioInputProcessor.process_audio_chunk` used before, using the browser's
+48kHz / 2048-sample packet size.
+
+Run from the code directory:
+    python benchmark_resampler.py
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy.signal import resample_poly
+
+from resampler import StreamingResampler
+
+RESAMPLE_RATIO = 3
+INPUT_RATE = 48000
+CHUNK_SAMPLES = 2048 # Matches BATCH_SAMPLES in static/app.js
+
+
+def legacy_process_audio_chunk(raw_audio: np.ndarray) -> np.ndarray:
+    """The previous stateless per-chunk path, kept here as the baseline."""
+    if np.max(np.abs(raw_audio)) == 0:
+        expected_len = int(np.ceil(len(raw_audio) / RESAMPLE_RATIO))
+        return np.zeros(expected_len, dtype=np.int16)
+    audio_float32 = raw_audio.astype(np.float32)
+    resampled_float = resample_poly(audio_float32, 1, RESAMPLE_RATIO, window=('kaiser', 5.0))
+    return np.clip(resampled_float, -32768, 32767).astype(np.int16)
+
+
+def make_test_signal(seconds: float, seed: int = 0) -> np.ndarray:
+    """Speech-like test signal: a few harmonics with a slow envelope plus noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * INPUT_RATE)) / INPUT_RATE
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+    voiced = sum(np.sin(2 * np.pi * f * t) / k for k, f in enumerate((180, 360, 720, 2400, 7000), start=1))
+    signal = 6000 * envelope * voiced + rng.normal(0, 300, len(t))
+    return np.clip(signal, -32768, 32767).astype(np.int16)
+
+
+def chunks_of(signal: np.ndarray, size: int):
+    return [signal[i:i + size] for i in range(0, len(signal), size)]
+
+
+def run_legacy(chunks) -> np.ndarray:
+    return np.concatenate([legacy_process_audio_chunk(c) for c in chunks])
+
+
+def run_streaming(chunks) -> np.ndarray:
+    resampler = StreamingResampler(down=RESAMPLE_RATIO, max_chunk_samples=CHUNK_SAMPLES)
+    return np.concatenate([resampler.process(c).copy() for c in chunks])
+
+
+def time_path(fn, chunks, repeats: int) -> float:
+    """Returns the best-of-`repeats` throughput in input samples per second."""
+    n_samples = sum(len(c) for c in chunks)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(chunks)
+        best = min(best, time.perf_counter() - start)
+    return n_samples / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=30.0, help="Length of the test signal")
+    parser.add_argument("--repeats", type=int, default=5, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    signal = make_test_signal(args.seconds)
+    chunks = chunks_of(signal, CHUNK_SAMPLES)
+
+    # Reference: the whole signal resampled in one piece (no chunk edges at all)
+    reference = np.clip(
+        resample_poly(signal.astype(np.float32), 1, RESAMPLE_RATIO, window=('kaiser', 5.0)),
+        -32768, 32767,
+    ).astype(np.int16)
+
+    legacy_out = run_legacy(chunks)
+    streaming_out = run_streaming(chunks)
+    delay = StreamingResampler(down=RESAMPLE_RATIO).delay
+
+    # Streaming output is causal: align it with the zero-phase reference by its delay
+    aligned = streaming_out[delay:]
+    n = min(len(aligned), len(reference))
+    margin = delay # skip the start-up transient of the very first chunk
+    streaming_err = np.abs(aligned[margin:n].astype(np.int32) - reference[margin:n].astype(np.int32))
+    n_legacy = min(len(legacy_out), len(reference))
+    legacy_err = np.abs(legacy_out[margin:n_legacy].astype(np.int32) - reference[margin:n_legacy].astype(np.int32))
+
+    legacy_rate = time_path(run_legacy, chunks, args.repeats)
+    streaming_rate = time_path(run_streaming, chunks, args.repeats)
+
+    print(f"Signal: {args.seconds:.1f}s @ {INPUT_RATE}Hz, {len(chunks)} chunks of {CHUNK_SAMPLES} samples")
+    print()
+    print(f"{'path':<12} {'samples/sec':>14} {'x realtime':>11} {'out len':>9} {'max |err|':>10} {'mean |err|':>11}")
+    print(f"{'reference':<12} {'':>14} {'':>11} {len(reference):>9d}")
+    print(f"{'legacy':<12} {legacy_rate:>14,.0f} {legacy_rate / INPUT_RATE:>11.0f} {len(legacy_out):>9d} {legacy_err.max():>10d} {legacy_err.mean():>11.3f}")
+    print(f"{'streaming':<12} {streaming_rate:>14,.0f} {streaming_rate / INPUT_RATE:>11.0f} {len(streaming_out):>9d} {streaming_err.max():>10d} {streaming_err.mean():>11.3f}")
+    print()
+    print(f"Speedup: {streaming_rate / legacy_rate:.2f}x (errors vs. whole-signal resample_poly, streaming aligned by {delay} samples)")
+    print("Note: the legacy path rounds every chunk up to ceil(len/3) samples, so when the chunk")
+    print("size is not a multiple of 3 it also drifts out of alignment with the true 16kHz timeline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: CPU cost and deadline jitter of the silence monitor
+
+Simulates N connections that each go through repeated silence periods with
+three deadlines per period (potential sentence end, TTS allowance, hot) and
+compares
+
+- polling:   the previous design, one thread per connection re-evaluating the
+             thresholds and sleeping 1 ms in a loop
+- scheduler: one `TimerScheduler` thread firing the precomputed deadlines
+
+Reports process CPU time as % of one core and the lateness of each deadline
+(time it was noticed minus the time it was due).
+
+Run from the code directory:
+    python benchmark_silence_monitor.py --connections 10 50 100 --seconds 5
+"""
+import argparse
+import random
+import threading
+import time
+from typing import List
+
+import numpy as np
+
+from timer_scheduler import TimerScheduler
+
+SILENCE_OFFSETS = (0.08, 0.45, 0.35) # Potential end, TTS allowance, hot (s after silence start)
+SILENCE_PERIOD_S = 1.0 # A new silence starts every second per connection
+
+
+def polling(connections: int, seconds: float) -> List[float]:
+    lateness: List[float] = []
+    lock = threading.Lock()
+    stop = time.monotonic() + seconds
+
+    def monitor(phase: float) -> None:
+        silence_start = time.monotonic() + phase
+        fired = [False] * len(SILENCE_OFFSETS)
+        while time.monotonic() < stop:
+            now = time.monotonic()
+            if now - silence_start >= SILENCE_PERIOD_S:
+                silence_start += SILENCE_PERIOD_S
+                fired = [False] * len(SILENCE_OFFSETS)
+            elapsed = now - silence_start
+            for i, offset in enumerate(SILENCE_OFFSETS):
+                if elapsed > offset and not fired[i]:
+                    fired[i] = True
+                    with lock:
+                        lateness.append(elapsed - offset)
+            time.sleep(0.001)
+
+    rng = random.Random(0)
+    threads = [threading.Thread(target=monitor, args=(rng.random() * SILENCE_PERIOD_S,), daemon=True) for _ in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return lateness
+
+
+def scheduled(connections: int, seconds: float) -> List[float]:
+    scheduler = TimerScheduler()
+    lateness: List[float] = []
+    start = time.monotonic()
+    stop = start + seconds
+
+    def fire(due: float) -> None:
+        lateness.append(time.monotonic() - due)
+
+    def silence_starts(silence_start: float) -> None:
+        # What _reschedule_silence_deadlines does when the recorder reports silence
+        for offset in SILENCE_OFFSETS:
+            scheduler.call_at(silence_start + offset, fire, silence_start + offset)
+        if silence_start + SILENCE_PERIOD_S < stop:
+            scheduler.call_at(silence_start + SILENCE_PERIOD_S, silence_starts, silence_start + SILENCE_PERIOD_S)
+
+    rng = random.Random(0)
+    for _ in range(connections):
+        silence_starts(start + rng.random() * SILENCE_PERIOD_S)
+    time.sleep(max(0.0, stop - time.monotonic()) + max(SILENCE_OFFSETS))
+    scheduler.stop()
+    return lateness
+
+
+def measure(mode, connections: int, seconds: float):
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    lateness = np.array(mode(connections, seconds)) * 1000
+    cpu_percent = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start) * 100
+    return cpu_percent, lateness
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, nargs="+", default=[10, 50, 100], help="Connection counts")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Simulated time per measurement")
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'conns':>6}{'cpu %':>8}{'deadlines':>11}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for connections in args.connections:
+        for name, mode in (("polling", polling), ("scheduler", scheduled)):
+            cpu_percent, lateness = measure(mode, connections, args.seconds)
+            p50, p99, worst = (np.percentile(lateness, [50, 99]).tolist() + [lateness.max()]) if lateness.size else (0.0, 0.0, 0.0)
+            print(f"{name:<10}{connections:>6}{cpu_percent:>8.1f}{lateness.size:>11}{p50:>9.2f}{p99:>9.2f}{worst:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
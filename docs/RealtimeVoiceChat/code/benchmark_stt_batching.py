@@ -0,0 +1,75 @@
+"""
+Benchmark: cross-session batched Whisper decoding vs. one clip at a time
+
+Transcribes N clips of increasing length with `WhisperBatchTranscriber`
+
+- batched:    all clips in one `encode` + `model.model.generate` pass
+              (what `MultiplexedSTTService` / `STTWorkerPool` do)
+- one by one: one `transcribe([clip])` call per clip
+
+and reports the wall time of both, after checking that every batched text is
+identical to the text of the same clip transcribed alone (greedy decoding is
+batch invariant, so any difference points at padding or prompt handling).
+
+Clips are white noise unless --wav files are given; noise makes a real model
+decode few tokens and a randomly initialized one run to `max_length`, the
+worst case for the decoder.
+
+Run from the code directory (CPU-only numbers: CUDA_VISIBLE_DEVICES=""):
+    python benchmark_stt_batching.py --model tiny.en --clips 1 2 4 8
+"""
+import argparse
+import time
+import wave
+
+import numpy as np
+
+from stt_service import SAMPLE_RATE, WhisperBatchTranscriber
+
+
+def load_wav(path: str) -> np.ndarray:
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != SAMPLE_RATE or wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise ValueError(f"{path}: expected 16 kHz 16-bit mono")
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="tiny.en", help="faster-whisper model name or path")
+    parser.add_argument("--device", default="cpu", help="cpu, cuda or auto")
+    parser.add_argument("--compute-type", default="int8", help="CTranslate2 compute type")
+    parser.add_argument("--clips", type=int, nargs="+", default=[1, 2, 4, 8], help="Batch sizes")
+    parser.add_argument("--wav", nargs="*", default=[], help="16 kHz mono clips to use instead of noise")
+    parser.add_argument("--prompt", default=None, help="Initial prompt for every clip")
+    args = parser.parse_args()
+
+    transcriber = WhisperBatchTranscriber(args.model, language="en", device=args.device, compute_type=args.compute_type)
+    largest = max(args.clips)
+    if args.wav:
+        clips = [load_wav(args.wav[i % len(args.wav)]) for i in range(largest)]
+    else:
+        rng = np.random.default_rng(0)
+        clips = [(0.1 * rng.standard_normal(int(SAMPLE_RATE * seconds))).astype(np.float32)
+                 for seconds in np.linspace(1.0, 6.0, largest)]
+
+    batched = transcriber.transcribe(clips, initial_prompt=args.prompt)
+    single = [transcriber.transcribe([clip], initial_prompt=args.prompt)[0] for clip in clips]
+    identical = sum(a == b for a, b in zip(batched, single))
+    print(f"{identical}/{largest} batched texts identical to single-clip texts")
+
+    print()
+    print(f"{'clips':>5}{'batched ms':>12}{'one by one ms':>15}{'speedup':>9}")
+    for size in args.clips:
+        start = time.perf_counter()
+        transcriber.transcribe(clips[:size], initial_prompt=args.prompt)
+        batched_s = time.perf_counter() - start
+        start = time.perf_counter()
+        for clip in clips[:size]:
+            transcriber.transcribe([clip], initial_prompt=args.prompt)
+        sequential_s = time.perf_counter() - start
+        print(f"{size:>5}{batched_s * 1000:>12.0f}{sequential_s * 1000:>15.0f}{sequential_s / batched_s:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
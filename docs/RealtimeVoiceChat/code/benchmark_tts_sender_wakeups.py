@@ -0,0 +1,110 @@
+"""
+Benchmark: event-loop wakeups of idle TTS senders, polling vs. event-driven
+
+Runs N simulated idle connections for a few seconds with two sender loops:
+
+- polling: the previous `send_tts_chunks` idle path (`await asyncio.sleep(0.001)`
+  followed by a `get_nowait` check of the thread queue)
+- event:   the `AsyncWakeup`-driven path, woken via `call_soon_threadsafe` by a
+           producer thread that emits a short burst of chunks once per second
+
+Reports loop wakeups per second per connection, process CPU time, and for the
+event-driven path the chunk handoff latency from the producer thread.
+
+Run from the code directory:
+    python benchmark_tts_sender_wakeups.py --connections 20 --seconds 5
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from queue import Empty, Queue
+
+from async_bridge import AsyncWakeup
+
+
+async def polling_sender(chunks: Queue, stop: asyncio.Event, counter: list) -> None:
+    while not stop.is_set():
+        counter[0] += 1
+        try:
+            chunks.get_nowait()
+        except Empty:
+            await asyncio.sleep(0.001)
+
+
+async def event_sender(chunks: Queue, wakeup: AsyncWakeup, latencies: list) -> None:
+    while True:
+        try:
+            put_time = chunks.get_nowait()
+            latencies.append((time.perf_counter() - put_time) * 1000)
+        except Empty:
+            await wakeup.wait()
+
+
+def producer(chunks: Queue, notify, stop: threading.Event, burst: int) -> None:
+    """Emits a burst of `burst` chunks once per second (a short spoken answer)."""
+    while not stop.wait(1.0):
+        for _ in range(burst):
+            chunks.put(time.perf_counter())
+            if notify:
+                notify()
+            time.sleep(0.01)
+
+
+async def run(mode: str, connections: int, seconds: float, burst: int):
+    stop = asyncio.Event()
+    thread_stop = threading.Event()
+    tasks, threads = [], []
+    counters = [[0] for _ in range(connections)]
+    wakeups = []
+    latencies: list = []
+
+    for i in range(connections):
+        chunks: Queue = Queue()
+        if mode == "polling":
+            tasks.append(asyncio.create_task(polling_sender(chunks, stop, counters[i])))
+            notify = None
+        else:
+            wakeup = AsyncWakeup()
+            wakeups.append(wakeup)
+            tasks.append(asyncio.create_task(event_sender(chunks, wakeup, latencies)))
+            notify = wakeup.notify
+        t = threading.Thread(target=producer, args=(chunks, notify, thread_stop, burst), daemon=True)
+        threads.append(t)
+        t.start()
+
+    cpu_start = time.process_time()
+    await asyncio.sleep(seconds)
+    cpu = time.process_time() - cpu_start
+    stop.set()
+    thread_stop.set()
+    for task in tasks:
+        task.cancel() # Event-driven senders only leave their wait when cancelled
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    if mode == "polling":
+        total_wakeups = sum(c[0] for c in counters)
+    else:
+        total_wakeups = sum(w.wakeups for w in wakeups)
+    return total_wakeups / connections / seconds, cpu, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=20, help="Simulated connections")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Measurement duration per mode")
+    parser.add_argument("--burst", type=int, default=5, help="Chunks per connection per second")
+    args = parser.parse_args()
+
+    print(f"{args.connections} connections, {args.seconds:.0f}s per mode, {args.burst} chunks/s each")
+    print()
+    print(f"{'mode':<9} {'wakeups/s/conn':>15} {'cpu s':>7} {'cpu %':>6} {'handoff p50/max ms':>19}")
+    for mode in ("polling", "event"):
+        rate, cpu, latencies = asyncio.run(run(mode, args.connections, args.seconds, args.burst))
+        handoff = f"{statistics.median(latencies):.3f}/{max(latencies):.3f}" if latencies else "-"
+        print(f"{mode:<9} {rate:>15.1f} {cpu:>7.2f} {cpu / args.seconds * 100:>6.1f} {handoff:>19}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: latency of the sentence completion classifier per backend
+
+Classifies single sentences of increasing length (one call at a time, like a
+lone partial transcript on the turn-end path) with
+
+- torch-max_length: the previous path (PyTorch fp32, always padded to 128 tokens)
+- torch:            PyTorch fp32, padded only to the sentence length
+- onnx:             ONNX Runtime fp32
+- onnx-int8:        ONNX Runtime with dynamically quantized int8 weights
+
+and reports the median latency per call in milliseconds, plus each backend's
+largest deviation from PyTorch on the parity sentences. Latency depends only
+on the architecture, but the deviation is only meaningful for the real
+checkpoint (not for a locally built, randomly initialized stand-in).
+
+Run from the code directory (CPU-only numbers: CUDA_VISIBLE_DEVICES=""):
+    python benchmark_turn_detection.py --words 2 5 10 20 40
+"""
+import argparse
+import statistics
+import time
+
+from completion_backends import (
+    ONNXRUNTIME_AVAILABLE,
+    OnnxCompletionBackend,
+    TorchCompletionBackend,
+    parity_error,
+)
+from turndetect import model_dir_local
+
+WORDS = "so I was thinking that we could maybe go to the lake this weekend if the weather is nice and then".split()
+
+
+def make_sentence(words: int) -> str:
+    return " ".join(WORDS[i % len(WORDS)] for i in range(words))
+
+
+def median_ms(classify, sentence: str, calls: int) -> float:
+    classify([sentence]) # Warm up shapes / allocator
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        classify([sentence])
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=model_dir_local, help="Classifier model id or path")
+    parser.add_argument("--words", type=int, nargs="+", default=[2, 5, 10, 20, 40], help="Sentence lengths in words")
+    parser.add_argument("--calls", type=int, default=50, help="Calls per measurement; the median is reported")
+    args = parser.parse_args()
+
+    reference = TorchCompletionBackend(args.model, device="cpu")
+    backends = {
+        "torch-max_length": lambda sentences: reference.classify(sentences, padding="max_length"),
+        "torch": reference.classify,
+    }
+    deviations = {"torch-max_length": 0.0, "torch": 0.0}
+    if ONNXRUNTIME_AVAILABLE:
+        for name, quantize in (("onnx", False), ("onnx-int8", True)):
+            backend = OnnxCompletionBackend(args.model, quantize=quantize, reference=reference)
+            backends[name] = backend.classify
+            deviations[name] = parity_error(backend, reference)
+    else:
+        print("onnxruntime not installed, skipping the ONNX backends")
+
+    sentences = {words: make_sentence(words) for words in args.words}
+    tokens = {words: len(reference.tokenizer(sentence)["input_ids"]) for words, sentence in sentences.items()}
+
+    print(f"median ms per call over {args.calls} calls (CPU)")
+    print()
+    header = "".join(f"{f'{w}w/{tokens[w]}t':>11}" for w in args.words)
+    print(f"{'backend':<17}{header}{'max diff':>10}")
+    for name, classify in backends.items():
+        row = "".join(f"{median_ms(classify, sentences[w], args.calls):>11.2f}" for w in args.words)
+        print(f"{name:<17}{row}{deviations[name]:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Inference backends for the sentence completion classifier.
+
+The classifier (DistilBERT, two labels: incomplete / complete) sits on the
+turn-end critical path, so it can run on one of several backends:
+
+- ``torch``:     PyTorch fp32, inputs padded only to the longest sentence of a batch.
+- ``onnx``:      ONNX Runtime (CPU), model exported once with dynamic batch and
+                 sequence axes and cached on disk.
+- ``onnx-int8``: the ONNX export with dynamically quantized int8 weights
+                 (`onnxruntime.quantization.quantize_dynamic`).
+
+All backends take a list of sentences and return P(complete) per sentence.
+ONNX backends are checked against the PyTorch model at load time (unless
+`verify=False`); if their outputs drift further than the backend's tolerance,
+`create_completion_backend` falls back to PyTorch. The PyTorch probabilities
+of `PARITY_SENTENCES` are computed once, when the ONNX graph is exported, and
+stored next to it (`reference.json`), so later starts check parity without
+loading PyTorch and keep the ONNX backends' memory and startup savings.
+"""
+import json
+import logging
+import os
+import re
+from typing import List, Optional, Sequence
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+import transformers
+
+logger = logging.getLogger(__name__)
+
+try:
+    import onnxruntime
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    onnxruntime = None
+    ONNXRUNTIME_AVAILABLE = False
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+PARITY_TOLERANCE = {"onnx": 1e-3, "onnx-int8": 0.05} # Max |P(complete) diff| vs. PyTorch
+PARITY_SENTENCES = [
+    "Hi",
+    "I think that",
+    "What time is it?",
+    "Can you tell me how the weather is going to be tomorrow in",
+    "I was wondering whether you could help me plan a trip to Italy next summer, because I have never been there.",
+    "So basically what I wanted to say is that",
+]
+DEFAULT_ONNX_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "realtimevoicechat", "onnx")
+
+
+class TorchCompletionBackend:
+    """PyTorch backend with dynamic (padded-to-longest) batching."""
+
+    name = "torch"
+
+    def __init__(self, model_dir: str, device: Optional[str] = None, max_length: int = 128) -> None:
+        """
+        Loads tokenizer and model.
+
+        Args:
+            model_dir: Hugging Face model id or local path of the classifier.
+            device: Torch device string; defaults to CUDA if available, else CPU.
+            max_length: Maximum sequence length in tokens (longer input is truncated).
+        """
+        self.device = torch.device(device or ("cuda" if torch.cuda.is_available() else "cpu"))
+        self.max_length = max_length
+        self.tokenizer = transformers.DistilBertTokenizerFast.from_pretrained(model_dir)
+        self.model = transformers.DistilBertForSequenceClassification.from_pretrained(model_dir)
+        self.model.to(self.device)
+        self.model.eval() # Set model to evaluation mode
+
+    def classify(self, sentences: Sequence[str], padding: str = "longest") -> List[float]:
+        """
+        Returns P(complete) for each sentence.
+
+        Args:
+            sentences: Sentences to classify in one forward pass.
+            padding: Tokenizer padding strategy; "max_length" reproduces the
+                     previous fixed 128-token inputs (used for benchmarking).
+        """
+        inputs = self.tokenizer(
+            list(sentences),
+            return_tensors="pt",
+            truncation=True,
+            padding=padding,
+            max_length=self.max_length
+        )
+        inputs = {key: value.to(self.device) for key, value in inputs.items()}
+        with torch.inference_mode():
+            logits = self.model(**inputs).logits
+        # Softmax over [prob_incomplete, prob_complete]; index 1 is 'complete'
+        return F.softmax(logits, dim=1)[:, 1].tolist()
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Wraps the classifier so the ONNX graph has a single `logits` output."""
+
+    def __init__(self, model: torch.nn.Module) -> None:
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+
+class OnnxCompletionBackend:
+    """ONNX Runtime CPU backend, optionally with int8-quantized weights."""
+
+    def __init__(
+            self,
+            model_dir: str,
+            max_length: int = 128,
+            quantize: bool = False,
+            cache_dir: Optional[str] = None,
+            reference: Optional[TorchCompletionBackend] = None,
+            intra_op_threads: int = 0,
+        ) -> None:
+        """
+        Exports the model to ONNX (once; reused from `cache_dir`) and opens a session.
+
+        Args:
+            model_dir: Hugging Face model id or local path of the classifier.
+            max_length: Maximum sequence length in tokens (longer input is truncated).
+            quantize: Use dynamically quantized int8 weights.
+            cache_dir: Where exported models are kept; defaults to ~/.cache/realtimevoicechat/onnx.
+            reference: Loaded PyTorch backend to export from; loaded on demand if
+                       an export is needed and none is given.
+            intra_op_threads: ONNX Runtime intra-op threads (0 = runtime default).
+        """
+        if not ONNXRUNTIME_AVAILABLE:
+            raise RuntimeError("onnxruntime is not installed; install it to use the ONNX completion backends")
+        self.name = "onnx-int8" if quantize else "onnx"
+        self.max_length = max_length
+        self.tokenizer = transformers.DistilBertTokenizerFast.from_pretrained(model_dir)
+
+        self.model_cache = os.path.join(cache_dir or DEFAULT_ONNX_CACHE_DIR, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_dir.strip("/")))
+        fp32_path = os.path.join(self.model_cache, "model.onnx")
+        if not os.path.exists(fp32_path):
+            reference = reference or TorchCompletionBackend(model_dir, device="cpu", max_length=max_length)
+            self._export(reference, fp32_path)
+            save_reference_probabilities(self.model_cache, reference)
+        model_path = fp32_path
+        if quantize:
+            model_path = os.path.join(self.model_cache, "model.int8.onnx")
+            if not os.path.exists(model_path):
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+                logger.info(f"🎤🔧 Quantizing completion classifier to int8: {model_path}")
+                quantize_dynamic(fp32_path, model_path, weight_type=QuantType.QInt8)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+
+    def _export(self, reference: TorchCompletionBackend, path: str) -> None:
+        logger.info(f"🎤🔧 Exporting completion classifier to ONNX: {path}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        sample = reference.tokenizer(["This is a warmup sentence."], return_tensors="pt")
+        model = _LogitsOnly(reference.model).to("cpu").eval()
+        tmp_path = path + ".tmp"
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (sample["input_ids"], sample["attention_mask"]),
+                tmp_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["logits"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "logits": {0: "batch"},
+                },
+                opset_version=14,
+            )
+        os.replace(tmp_path, path) # Never leave a half-written model behind
+
+    def classify(self, sentences: Sequence[str], padding: str = "longest") -> List[float]:
+        """Returns P(complete) for each sentence; see `TorchCompletionBackend.classify`."""
+        inputs = self.tokenizer(
+            list(sentences),
+            return_tensors="np",
+            truncation=True,
+            padding=padding,
+            max_length=self.max_length
+        )
+        logits = self.session.run(["logits"], {
+            "input_ids": inputs["input_ids"].astype(np.int64),
+            "attention_mask": inputs["attention_mask"].astype(np.int64),
+        })[0]
+        # Numerically stable two-class softmax, index 1 is 'complete'
+        shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return (shifted[:, 1] / shifted.sum(axis=1)).tolist()
+
+
+def parity_error(backend, reference: TorchCompletionBackend, sentences: Sequence[str] = PARITY_SENTENCES) -> float:
+    """Returns the largest |P(complete)| difference between `backend` and `reference`."""
+    expected = np.array(reference.classify(sentences))
+    actual = np.array(backend.classify(sentences))
+    return float(np.max(np.abs(expected - actual)))
+
+
+def save_reference_probabilities(model_cache: str, reference: TorchCompletionBackend) -> List[float]:
+    """Classifies `PARITY_SENTENCES` with PyTorch and stores the result in `model_cache`."""
+    probabilities = reference.classify(PARITY_SENTENCES)
+    path = os.path.join(model_cache, "reference.json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"sentences": PARITY_SENTENCES, "probabilities": probabilities}, f)
+    os.replace(tmp_path, path)
+    return probabilities
+
+
+def load_reference_probabilities(model_cache: str) -> Optional[List[float]]:
+    """Returns the stored PyTorch probabilities of `PARITY_SENTENCES`, or None if missing or stale."""
+    try:
+        with open(os.path.join(model_cache, "reference.json"), encoding="utf-8") as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if stored.get("sentences") != PARITY_SENTENCES:
+        return None # Probe set changed since the export
+    return stored.get("probabilities")
+
+
+def _as_fallback(
+        reference: Optional[TorchCompletionBackend],
+        model_dir: str,
+        device: Optional[str],
+        max_length: int,
+    ) -> TorchCompletionBackend:
+    """Moves the CPU reference model to the device the PyTorch backend would have used, loading it if needed."""
+    if reference is None:
+        return TorchCompletionBackend(model_dir, device=device, max_length=max_length)
+    target = torch.device(device or ("cuda" if torch.cuda.is_available() else "cpu"))
+    if target != reference.device:
+        reference.model.to(target)
+        reference.device = target
+    return reference
+
+
+def create_completion_backend(
+        name: str,
+        model_dir: str,
+        device: Optional[str] = None,
+        max_length: int = 128,
+        cache_dir: Optional[str] = None,
+        verify: bool = True,
+    ):
+    """
+    Creates the requested backend, verifying ONNX backends against PyTorch.
+
+    Args:
+        name: One of `BACKENDS`.
+        model_dir: Hugging Face model id or local path of the classifier.
+        device: Torch device for the PyTorch backend (ONNX backends run on CPU).
+        max_length: Maximum sequence length in tokens.
+        cache_dir: Cache directory for ONNX exports.
+        verify: Compare an ONNX backend's outputs on `PARITY_SENTENCES` with the
+                PyTorch probabilities stored at export time (PyTorch is only
+                loaded if they are missing, e.g. for an older export).
+
+    Returns:
+        The backend; the PyTorch backend if an ONNX backend is unavailable or
+        fails the parity check.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown completion backend '{name}', expected one of {BACKENDS}")
+    if name == "torch":
+        return TorchCompletionBackend(model_dir, device=device, max_length=max_length)
+
+    reference: Optional[TorchCompletionBackend] = None
+    try:
+        backend = OnnxCompletionBackend(
+            model_dir,
+            max_length=max_length,
+            quantize=(name == "onnx-int8"),
+            cache_dir=cache_dir,
+        )
+        error = None
+        if verify:
+            expected = load_reference_probabilities(backend.model_cache)
+            if expected is None:
+                reference = TorchCompletionBackend(model_dir, device="cpu", max_length=max_length)
+                expected = save_reference_probabilities(backend.model_cache, reference)
+            actual = backend.classify(PARITY_SENTENCES)
+            error = float(np.max(np.abs(np.array(expected) - np.array(actual))))
+    except Exception as e:
+        logger.error(f"🎤💥 Completion backend '{name}' unavailable, falling back to torch: {e}", exc_info=True)
+        return _as_fallback(reference, model_dir, device, max_length)
+
+    if error is None:
+        logger.warning(f"🎤⚠️ Completion backend '{name}' loaded without parity check")
+        return backend
+
+    tolerance = PARITY_TOLERANCE[name]
+    if error > tolerance:
+        logger.error(f"🎤💥 Completion backend '{name}' failed parity check (max diff {error:.4f} > {tolerance}), falling back to torch")
+        return _as_fallback(reference, model_dir, device, max_length)
+    logger.info(f"🎤✅ Completion backend '{name}' passed parity check (max diff {error:.4f} ≤ {tolerance})")
+    return backend
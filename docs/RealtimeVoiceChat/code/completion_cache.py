@@ -0,0 +1,94 @@
+"""
+Process-wide cache of sentence completion probabilities.
+
+Partial transcripts from all sessions are classified by the same model, and
+the same texts come back again and again: a partial is re-emitted with
+different punctuation or spacing, the final transcript repeats the last
+partial, and short openers ("Hi", "Okay so") recur across sessions. The cache
+is keyed on normalized text (whitespace collapsed, lowercased when the
+tokenizer lowercases anyway), so every one of these variants hits the same
+entry as long as the model would have seen identical input.
+"""
+import collections
+import threading
+from typing import Optional
+
+
+def normalize_sentence(sentence: str, lowercase: bool = False) -> str:
+    """
+    Returns the cache key (and model input) for a sentence.
+
+    Args:
+        sentence: Text as prepared for the classifier.
+        lowercase: Lowercase the text; only correct for uncased tokenizers.
+    """
+    key = " ".join(sentence.split())
+    return key.lower() if lowercase else key
+
+
+class CompletionProbabilityCache:
+    """Thread-safe, size-bounded LRU map from normalized sentence to P(complete)."""
+
+    def __init__(self, max_size: int = 4096) -> None:
+        """
+        Initializes the CompletionProbabilityCache.
+
+        Args:
+            max_size: Maximum number of entries; least recently used ones are evicted.
+                      0 disables caching.
+        """
+        self.max_size = max_size
+        self._entries: collections.OrderedDict[str, float] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.debounced: int = 0 # Lookups skipped by sessions' debounce (see TurnDetection)
+
+    def get(self, key: str) -> Optional[float]:
+        """Returns the cached probability for `key`, or None on a miss."""
+        with self._lock:
+            probability = self._entries.get(key)
+            if probability is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key) # Mark as recently used
+            self.hits += 1
+            return probability
+
+    def put(self, key: str, probability: float) -> None:
+        """Stores a probability, evicting the least recently used entry if full."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = probability
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record_debounced(self) -> None:
+        """Counts a lookup a session answered from its previous partial."""
+        with self._lock:
+            self.debounced += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered without running the model (debounced ones included)."""
+        answered = self.hits + self.debounced
+        total = answered + self.misses
+        return answered / total if total else 0.0
+
+    def summary(self) -> str:
+        """Returns the cache statistics as a one-line string."""
+        return (f"{self.hit_rate * 100:.0f}% hit rate ({self.hits} hits, {self.debounced} debounced, "
+                f"{self.misses} misses), {len(self)}/{self.max_size} entries, {self.evictions} evicted")
@@ -0,0 +1,236 @@
+"""
+Shared micro-batching inference server for the sentence completion classifier.
+
+`TurnDetection` asks "is this sentence finished?" for every partial
+transcript of every connection. Running the DistilBERT classifier once per
+sentence, padded to a fixed 128 tokens, with one model copy per connection
+wastes most of the CPU on padding and per-call overhead. This server loads the
+model once per process and answers all sessions from one worker thread:
+
+1. Requests from any thread are queued with a `concurrent.futures.Future`.
+2. The worker takes the first pending request, then keeps collecting for a
+   short window (`window_ms`) or until `max_batch` requests are pending.
+3. Identical sentences in a batch are classified once; the batch is padded
+   only to its longest sequence. Sentences seen before (by any session) are
+   answered from a shared `CompletionProbabilityCache` without queueing.
+4. One forward pass runs for the whole batch and every future is resolved
+   with its probability.
+
+The forward pass itself is delegated to a backend from `completion_backends`
+(PyTorch, ONNX Runtime or int8-quantized ONNX).
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from completion_backends import create_completion_backend
+from completion_cache import CompletionProbabilityCache, normalize_sentence
+
+logger = logging.getLogger(__name__)
+
+_STOP = object() # Sentinel that ends the worker loop
+
+
+class CompletionInferenceServer:
+    """
+    Process-wide batching front end for the DistilBERT completion classifier.
+
+    Thread-safe: `submit`/`predict` may be called from any thread. Results are
+    P(sentence complete) in [0.0, 1.0].
+    """
+
+    def __init__(
+            self,
+            model_dir: str,
+            device: Optional[str] = None,
+            max_length: int = 128,
+            max_batch: int = 32,
+            window_ms: float = 5.0,
+            backend: str = "torch",
+            cache_size: int = 4096,
+            debounce: bool = False,
+            verify_backend: bool = True,
+        ) -> None:
+        """
+        Loads the backend, warms the model up and starts the worker.
+
+        Args:
+            model_dir: Hugging Face model id or local path of the classifier.
+            device: Torch device for the PyTorch backend; defaults to CUDA if
+                    available, else CPU.
+            max_length: Maximum sequence length in tokens (longer input is truncated).
+            max_batch: Maximum number of requests per forward pass.
+            window_ms: How long to wait for more requests after the first one
+                       of a batch arrived.
+            backend: Inference backend: "torch", "onnx" or "onnx-int8"
+                     (see `completion_backends`).
+            cache_size: Entries in the shared probability cache (0 disables it).
+            debounce: Default for attached `TurnDetection` sessions: reuse the
+                      previous probability when a partial differs from the last
+                      one only by punctuation or whitespace.
+            verify_backend: Check an ONNX backend against the PyTorch probabilities
+                            stored at export time (see `create_completion_backend`).
+        """
+        self.max_length = max_length
+        self.max_batch = max_batch
+        self.window_s = window_ms / 1000.0
+        logger.info(f"🎤🔌 Loading completion classifier, {backend} backend (batch ≤{max_batch}, window {window_ms:.0f}ms)")
+        self.backend = create_completion_backend(backend, model_dir, device=device, max_length=max_length, verify=verify_backend)
+        self.lowercase = bool(getattr(self.backend.tokenizer, "do_lower_case", False))
+        self.cache = CompletionProbabilityCache(cache_size)
+        self.debounce = debounce
+
+        # Statistics
+        self.requests: int = 0
+        self.batches: int = 0
+        self.forwarded: int = 0 # Distinct sentences actually run through the model
+        self.max_batch_seen: int = 0
+        self.inference_s: float = 0.0
+
+        logger.info("🎤🔥 Warming up the classification model...")
+        self._classify(["This is a warmup sentence."])
+        logger.info("🎤✅ Classification model warmed up.")
+
+        self._requests: "queue.Queue[object]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="CompletionInference", daemon=True)
+        self._worker.start()
+
+    # --- Public API ---
+
+    def normalize(self, sentence: str) -> str:
+        """Returns the normalized form used as cache key and model input."""
+        return normalize_sentence(sentence, lowercase=self.lowercase)
+
+    def submit(self, sentence: str) -> "Future[float]":
+        """Returns a future resolving to P(complete); cached sentences resolve immediately."""
+        future: "Future[float]" = Future()
+        key = self.normalize(sentence)
+        cached = self.cache.get(key)
+        if cached is not None:
+            future.set_result(cached)
+            return future
+        self._requests.put((key, future))
+        return future
+
+    def predict(self, sentence: str, timeout: Optional[float] = None) -> float:
+        """Blocking convenience wrapper around `submit`."""
+        return self.submit(sentence).result(timeout=timeout)
+
+    def shutdown(self) -> None:
+        """Stops the worker; requests still pending are failed."""
+        self._requests.put(_STOP)
+        self._worker.join(timeout=2.0)
+
+    def summary(self) -> str:
+        """Returns batching statistics as a one-line string."""
+        avg = self.requests / self.batches if self.batches else 0.0
+        per_sentence_ms = self.inference_s / self.forwarded * 1000 if self.forwarded else 0.0
+        return (f"{self.backend.name}: {self.requests} requests in {self.batches} batches (avg {avg:.1f}, max {self.max_batch_seen}), "
+                f"{per_sentence_ms:.2f}ms model time per sentence")
+
+    # --- Worker ---
+
+    def _classify(self, sentences: List[str]) -> List[float]:
+        """Runs one padded-to-longest forward pass and returns P(complete) per sentence."""
+        return self.backend.classify(sentences)
+
+    def _collect(self, first: Tuple[str, Future]) -> Tuple[List[Tuple[str, Future]], bool]:
+        """Gathers a batch starting with `first`; returns it and whether shutdown was requested."""
+        batch = [first]
+        deadline = time.monotonic() + self.window_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._requests.get()
+            if item is _STOP:
+                break
+            batch, stopping = self._collect(item)
+            batch = [(sentence, future) for sentence, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            unique: Dict[str, int] = {}
+            for sentence, _ in batch:
+                unique.setdefault(sentence, len(unique))
+            start = time.perf_counter()
+            try:
+                probabilities = self._classify(list(unique))
+            except Exception as e:
+                logger.error(f"🎤💥 Completion classifier batch of {len(unique)} failed: {e}", exc_info=True)
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.inference_s += time.perf_counter() - start
+
+            for sentence, index in unique.items():
+                self.cache.put(sentence, probabilities[index])
+            for sentence, future in batch:
+                future.set_result(probabilities[unique[sentence]])
+            self.requests += len(batch)
+            self.batches += 1
+            self.forwarded += len(unique)
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+
+        # Fail whatever is still queued so callers don't hang
+        while True:
+            try:
+                item = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError("Completion inference server shut down"))
+
+
+_server_lock = threading.Lock()
+_servers: Dict[str, CompletionInferenceServer] = {}
+_server_defaults: Dict[str, object] = {}
+
+
+def configure_completion_servers(**kwargs) -> None:
+    """
+    Sets default `CompletionInferenceServer` arguments (e.g. `backend`) for
+    servers created later by `get_completion_server`.
+    """
+    with _server_lock:
+        _server_defaults.update(kwargs)
+
+
+def get_completion_server(model_dir: str, **kwargs) -> CompletionInferenceServer:
+    """
+    Returns the process-wide server for `model_dir`, creating it on first use.
+
+    Args:
+        model_dir: Hugging Face model id or local path of the classifier.
+        **kwargs: Passed to `CompletionInferenceServer` when it is created,
+                  overriding `configure_completion_servers` defaults.
+    """
+    with _server_lock:
+        server = _servers.get(model_dir)
+        if server is None:
+            server = CompletionInferenceServer(model_dir, **{**_server_defaults, **kwargs})
+            _servers[model_dir] = server
+        return server
+
+
+def shutdown_completion_servers() -> None:
+    """Stops all shared completion servers."""
+    with _server_lock:
+        for server in _servers.values():
+            logger.info(f"🎤📊 Completion classifier: {server.summary()}")
+            logger.info(f"🎤📊 Completion probability cache: {server.cache.summary()}")
+            server.shutdown()
+        _servers.clear()
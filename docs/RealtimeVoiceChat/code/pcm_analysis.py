@@ -0,0 +1,118 @@
+"""
+NumPy helpers for analysing 16-bit mono PCM without per-sample Python objects.
+
+All functions take `bytes`-like PCM or an int16 array. `pcm_view` wraps bytes
+with `np.frombuffer` (no copy); levels are computed on int32/float32 arrays so
+-32768 does not overflow. Silence detection works on short windows (mean
+absolute amplitude) and then resolves the boundary to the first/last loud
+sample, so a chunk can be trimmed exactly where speech starts or ends instead
+of being kept or dropped as a whole.
+"""
+from typing import Tuple, Union
+
+import numpy as np
+
+Pcm = Union[bytes, bytearray, memoryview, np.ndarray]
+
+SILENCE_WINDOW_SAMPLES: int = 120 # 5 ms at 24 kHz
+SILENCE_PAD_SAMPLES: int = 240 # 10 ms kept before/after speech so onsets are not clipped
+
+
+def pcm_view(pcm: Pcm) -> np.ndarray:
+    """Returns an int16 view of the PCM (a trailing odd byte is ignored)."""
+    if isinstance(pcm, np.ndarray):
+        return pcm
+    usable = len(pcm) - len(pcm) % 2
+    return np.frombuffer(pcm, dtype=np.int16, count=usable // 2)
+
+
+def _magnitudes(samples: np.ndarray) -> np.ndarray:
+    return np.abs(samples.astype(np.int32))
+
+
+def mean_abs(pcm: Pcm) -> float:
+    """Mean absolute amplitude (0 for empty input)."""
+    samples = pcm_view(pcm)
+    return float(_magnitudes(samples).mean()) if samples.size else 0.0
+
+
+def rms(pcm: Pcm) -> float:
+    """Root mean square amplitude (0 for empty input)."""
+    samples = pcm_view(pcm)
+    if not samples.size:
+        return 0.0
+    floats = samples.astype(np.float32)
+    return float(np.sqrt(np.dot(floats, floats) / samples.size))
+
+
+def peak(pcm: Pcm) -> int:
+    """Largest absolute sample value (0 for empty input)."""
+    samples = pcm_view(pcm)
+    return int(_magnitudes(samples).max()) if samples.size else 0
+
+
+def leading_silence(pcm: Pcm, threshold: float, window: int = SILENCE_WINDOW_SAMPLES) -> int:
+    """
+    Number of samples before speech starts.
+
+    Speech starts in the first window whose mean absolute amplitude reaches
+    `threshold`, at that window's first sample reaching it.
+
+    Args:
+        pcm: The audio.
+        threshold: Mean absolute amplitude separating silence from speech.
+        window: Window length in samples.
+
+    Returns:
+        The index of the first speech sample, or the length if all of it is silent.
+    """
+    samples = pcm_view(pcm)
+    size = samples.size
+    if not size:
+        return 0
+    magnitudes = _magnitudes(samples)
+    window = max(1, min(window, size))
+    sums = np.cumsum(magnitudes, dtype=np.int64)
+    window_sums = sums[window - 1:].copy()
+    window_sums[1:] -= sums[:-window]
+    loud = np.flatnonzero(window_sums >= threshold * window)
+    if not loud.size:
+        return size
+    start = int(loud[0])
+    onset = np.flatnonzero(magnitudes[start:start + window] >= threshold)
+    return start + (int(onset[0]) if onset.size else 0)
+
+
+def trailing_silence(pcm: Pcm, threshold: float, window: int = SILENCE_WINDOW_SAMPLES) -> int:
+    """Number of samples after speech ends (the length if all of it is silent); see `leading_silence`."""
+    return leading_silence(pcm_view(pcm)[::-1], threshold, window)
+
+
+def trim_leading_silence(pcm: bytes, threshold: float, pad: int = SILENCE_PAD_SAMPLES) -> Tuple[bytes, int]:
+    """
+    Cuts the silence before speech, keeping `pad` samples of it.
+
+    Returns:
+        The remaining audio (empty if all of it is silent) and the number of samples removed.
+    """
+    samples = pcm_view(pcm)
+    silent = leading_silence(samples, threshold)
+    if silent >= samples.size:
+        return b"", samples.size
+    cut = max(0, silent - pad)
+    return pcm[cut * 2:samples.size * 2], cut
+
+
+def trim_trailing_silence(pcm: bytes, threshold: float, pad: int = SILENCE_PAD_SAMPLES) -> Tuple[bytes, int]:
+    """
+    Cuts the silence after speech, keeping `pad` samples of it.
+
+    Returns:
+        The remaining audio (empty if all of it is silent) and the number of samples removed.
+    """
+    samples = pcm_view(pcm)
+    silent = trailing_silence(samples, threshold)
+    if silent >= samples.size:
+        return b"", samples.size
+    cut = max(0, silent - pad)
+    return pcm[:(samples.size - cut) * 2], cut
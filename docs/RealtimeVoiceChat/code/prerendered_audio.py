@@ -0,0 +1,118 @@
+"""
+Fixed utterances synthesized once at startup and kept as ready PCM.
+
+A few things the bot says do not depend on the conversation: the greeting,
+"one moment" while the LLM is still thinking, short acknowledgements. They are
+rendered with the active engine and voice when the server starts, so
+`SpeechPipelineManager.play_prerendered` can queue them without any synthesis
+latency. Rendering goes through `synthesize`, so with the TTS cache enabled the
+same sentences are also cache hits if the LLM produces them verbatim.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from pcm_analysis import trim_trailing_silence
+from tts_cache import iter_pcm_chunks
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE: int = 24000 # TTS output: 24 kHz, 16-bit mono
+TRAILING_SILENCE_THRESHOLD: float = 50.0 # Fillers end where speech ends, so the answer follows without a gap
+
+DEFAULT_UTTERANCES: Dict[str, str] = {
+    "greeting": "Hi, thanks for joining! Whenever you're ready, tell me a little about yourself.",
+    "one_moment": "One moment.",
+    "ack": "Okay.",
+}
+
+
+def parse_utterances(spec: str) -> Dict[str, str]:
+    """
+    Parses a "name=text|name=text" specification (e.g. from an environment variable).
+
+    Returns:
+        The utterances by name; entries without "=" are ignored.
+    """
+    utterances: Dict[str, str] = {}
+    for entry in spec.split("|"):
+        name, sep, text = entry.partition("=")
+        if sep and name.strip() and text.strip():
+            utterances[name.strip()] = text.strip()
+    return utterances
+
+
+@dataclass(frozen=True)
+class PrerenderedUtterance:
+    """One rendered utterance."""
+    name: str
+    text: str
+    pcm: bytes
+
+    @property
+    def duration_s(self) -> float:
+        return len(self.pcm) / 2 / SAMPLE_RATE
+
+    def chunks(self) -> Iterator[bytes]:
+        """Yields the audio in playback-sized slices."""
+        return iter_pcm_chunks(self.pcm)
+
+
+class _PcmCollector:
+    """Stands in for the audio channel of `synthesize` and keeps every chunk."""
+
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+
+    def put(self, chunk: bytes) -> bool:
+        self.chunks.append(chunk)
+        return True
+
+    def qsize(self) -> int:
+        return len(self.chunks)
+
+
+class PrerenderedUtterances:
+    """Named, ready-to-play utterances for one engine and voice."""
+
+    def __init__(self) -> None:
+        self._utterances: Dict[str, PrerenderedUtterance] = {}
+
+    def render(self, synthesizer, utterances: Dict[str, str]) -> None:
+        """
+        Synthesizes the utterances; failures are logged and skipped.
+
+        Args:
+            synthesizer: Anything with the `AudioProcessor.synthesize` signature
+                         (an `AudioProcessor` or a `tts_service.TTSSession`).
+            utterances: Texts by name.
+        """
+        for name, text in utterances.items():
+            collector = _PcmCollector()
+            start = time.perf_counter()
+            try:
+                completed = synthesizer.synthesize(text, collector, threading.Event(), generation_string=f"[prerender {name}]")
+            except Exception as e:
+                logger.error(f"👄💥 Pre-rendering '{name}' failed: {e}", exc_info=True)
+                continue
+            if not completed or not collector.chunks:
+                logger.warning(f"👄⚠️ Pre-rendering '{name}' produced no audio")
+                continue
+            pcm, _ = trim_trailing_silence(b"".join(collector.chunks), TRAILING_SILENCE_THRESHOLD)
+            if not pcm:
+                logger.warning(f"👄⚠️ Pre-rendering '{name}' produced only silence")
+                continue
+            utterance = PrerenderedUtterance(name, text, pcm)
+            self._utterances[name] = utterance
+            logger.info(f"👄📼 Pre-rendered '{name}' ({utterance.duration_s:.2f}s audio in {time.perf_counter() - start:.2f}s): {text}")
+
+    def get(self, name: str) -> Optional[PrerenderedUtterance]:
+        return self._utterances.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._utterances)
+
+    def __len__(self) -> int:
+        return len(self._utterances)
@@ -0,0 +1,376 @@
+import asyncio
+import itertools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.signal import firwin
+
+logger = logging.getLogger(__name__)
+
+INT16_MIN: int = -32768
+INT16_MAX: int = 32767
+
+
+def design_decimation_taps(down: int, window: Tuple[str, float] = ('kaiser', 5.0)) -> np.ndarray:
+    """
+    Designs the anti-aliasing FIR filter used for integer-factor downsampling.
+
+    Mirrors the filter that `scipy.signal.resample_poly(x, 1, down, window=window)`
+    builds internally (`10 * down` taps on each side of the centre, cutoff at
+    `1 / down` of Nyquist), so streaming output matches the stateless path.
+
+    Args:
+        down: Integer downsampling factor (e.g. 3 for 48kHz -> 16kHz).
+        window: Window specification passed to `scipy.signal.firwin`.
+
+    Returns:
+        A float32 array of `20 * down + 1` filter taps.
+    """
+    half_len = 10 * down
+    return firwin(2 * half_len + 1, 1.0 / down, window=window).astype(np.float32)
+
+
+def polyphase_decimate(
+        work: np.ndarray,
+        taps_rev: np.ndarray,
+        phase: int,
+        down: int,
+        out_float: np.ndarray,
+        out_int16: np.ndarray,
+    ) -> None:
+    """
+    Filters and decimates one chunk that has the filter history prepended.
+
+    Only the output samples that survive decimation are computed: each one is a
+    dot product of the reversed taps with the input window ending at it.
+
+    Args:
+        work: float32 array holding `len(taps_rev) - 1` history samples followed by the chunk.
+        taps_rev: Reversed filter taps.
+        phase: Offset into the chunk of the first sample to output.
+        down: Integer downsampling factor.
+        out_float: float32 scratch buffer of exactly the output length.
+        out_int16: int16 destination buffer of exactly the output length.
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(work, len(taps_rev))[phase::down]
+    np.matmul(windows, taps_rev, out=out_float)
+    np.clip(out_float, INT16_MIN, INT16_MAX, out=out_float)
+    np.copyto(out_int16, out_float, casting='unsafe')
+
+
+class StreamingResampler:
+    """
+    Stateful polyphase downsampler for a continuous stream of int16 PCM chunks.
+
+    Designs the filter taps once and carries the last `len(taps) - 1` input
+    samples (and the decimation phase) from one chunk to the next, so chunk
+    boundaries are filtered exactly as if the stream had been resampled in one
+    piece. Work and output buffers are preallocated and only grow when a larger
+    chunk arrives.
+
+    The filter is causal, so output lags the input by `delay` output samples
+    (10 samples, 0.625 ms, for 48kHz -> 16kHz).
+    """
+
+    def __init__(
+            self,
+            down: int = 3,
+            window: Tuple[str, float] = ('kaiser', 5.0),
+            max_chunk_samples: int = 4096,
+        ) -> None:
+        """
+        Initializes the StreamingResampler.
+
+        Args:
+            down: Integer downsampling factor.
+            window: Window specification for the anti-aliasing filter.
+            max_chunk_samples: Expected largest input chunk in samples. Buffers are
+                               sized for it up front and grown on demand.
+        """
+        if down < 1:
+            raise ValueError(f"Downsampling factor must be >= 1, got {down}")
+
+        self.down = down
+        self.taps: np.ndarray = design_decimation_taps(down, window)
+        # Reversed once so each output is a plain dot product with a window of input
+        self._taps_rev: np.ndarray = np.ascontiguousarray(self.taps[::-1])
+        self._history_len: int = len(self.taps) - 1
+        self.delay: int = (len(self.taps) // 2) // down
+
+        self._phase: int = 0 # Offset into the next chunk of the first sample to output
+        self._history_silent: bool = True
+
+        self._work: np.ndarray = np.zeros(0, dtype=np.float32)
+        self._out_float: np.ndarray = np.zeros(0, dtype=np.float32)
+        self._out_int16: np.ndarray = np.zeros(0, dtype=np.int16)
+        self._ensure_capacity(max_chunk_samples)
+
+    def _ensure_capacity(self, n_samples: int) -> None:
+        """Grows the preallocated work and output buffers to fit `n_samples` of input."""
+        if self._history_len + n_samples > len(self._work):
+            work = np.zeros(self._history_len + n_samples, dtype=np.float32)
+            carried = self._work[:self._history_len]
+            work[:len(carried)] = carried
+            self._work = work
+            n_out = -(-n_samples // self.down)
+            self._out_float = np.empty(n_out, dtype=np.float32)
+            self._out_int16 = np.empty(n_out, dtype=np.int16)
+
+    def output_length(self, n_samples: int) -> int:
+        """
+        Returns how many output samples the next `process` call yields for `n_samples` of input.
+
+        Args:
+            n_samples: Number of input samples in the next chunk.
+        """
+        if n_samples <= self._phase:
+            return 0
+        return (n_samples - self._phase - 1) // self.down + 1
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """
+        Resamples one chunk of int16 PCM, continuing from the previous chunk.
+
+        Args:
+            chunk: 1-D int16 array of input samples.
+
+        Returns:
+            A 1-D int16 array of resampled samples. This is a view into an internal
+            buffer that is overwritten by the next call; copy it (or call
+            `.tobytes()`) before processing the next chunk.
+        """
+        n = len(chunk)
+        if n == 0:
+            return self._out_int16[:0]
+        self._ensure_capacity(n)
+
+        hist = self._history_len
+        n_out = self.output_length(n)
+        out_int16 = self._out_int16[:n_out]
+        chunk_silent = not chunk.any()
+
+        if chunk_silent and self._history_silent:
+            # Silence in, silence out: skip the filter but keep the stream state aligned
+            out_int16.fill(0)
+            self._work[:hist] = 0.0
+        else:
+            work = self._work[:hist + n]
+            work[hist:] = chunk # int16 -> float32 cast into the preallocated buffer
+            if n_out:
+                polyphase_decimate(work, self._taps_rev, self._phase, self.down, self._out_float[:n_out], out_int16)
+            # Carry the tail forward as history for the next chunk
+            self._work[:hist] = work[n:]
+
+        self._history_silent = chunk_silent if n >= hist else (chunk_silent and self._history_silent)
+        self._phase = (self._phase - n) % self.down
+        return out_int16
+
+    def reset(self) -> None:
+        """Clears the carried filter history and decimation phase (e.g. on stream restart)."""
+        self._work[:self._history_len] = 0.0
+        self._phase = 0
+        self._history_silent = True
+
+
+class _BatchStream:
+    """Filter state of one connection registered with a `BatchResampler`."""
+    __slots__ = ("history", "phase")
+
+    def __init__(self, history_len: int) -> None:
+        self.history: np.ndarray = np.zeros(history_len, dtype=np.float32)
+        self.phase: int = 0
+
+
+class BatchResampler:
+    """
+    Central resampling stage shared by all live connections.
+
+    Instead of every connection's `process_chunk_queue` resampling its own
+    chunks on the event loop, connections submit chunks here. A collector task
+    waits for the first pending chunk, lets more arrive for `window_ms`, then
+    stacks all pending chunks into one 2-D array and filters them with a single
+    vectorized matmul per (chunk length, decimation phase) group in a worker
+    thread. Results are scattered back to each connection through the future
+    returned by `resample`.
+
+    Each connection keeps its own filter history and phase, so the output is
+    sample-identical to a per-connection `StreamingResampler`. A connection
+    awaits each chunk before submitting the next, so a batch holds at most one
+    row per connection and ordering is preserved.
+
+    `register`/`unregister` run on the event loop while batches run in a worker
+    thread, so the stream table is guarded by a lock; a batch resolves its
+    streams once up front and keeps the objects even if one is unregistered
+    meanwhile.
+    """
+
+    def __init__(
+            self,
+            down: int = 3,
+            window: Tuple[str, float] = ('kaiser', 5.0),
+            window_ms: float = 4.0,
+            max_workers: int = 1,
+        ) -> None:
+        """
+        Initializes the BatchResampler.
+
+        Args:
+            down: Integer downsampling factor.
+            window: Window specification for the anti-aliasing filter.
+            window_ms: How long to keep collecting chunks after the first one arrives.
+            max_workers: Number of threads used to run the batched filter.
+        """
+        self.down = down
+        self.taps: np.ndarray = design_decimation_taps(down, window)
+        self._taps_rev: np.ndarray = np.ascontiguousarray(self.taps[::-1])
+        self._history_len: int = len(self.taps) - 1
+        self.delay: int = (len(self.taps) // 2) // down
+        self.window_s: float = window_ms / 1000.0
+
+        self._streams: Dict[int, _BatchStream] = {}
+        self._streams_lock = threading.Lock()
+        self._stream_ids = itertools.count(1)
+        self._pending: List[Tuple[int, np.ndarray, asyncio.Future]] = []
+        self._pending_event: Optional[asyncio.Event] = None
+        self._in_flight: List[Tuple[int, np.ndarray, asyncio.Future]] = [] # Batch running in the worker
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="BatchResampler")
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters for monitoring batch efficiency
+        self.batches: int = 0
+        self.rows: int = 0
+
+    def start(self) -> None:
+        """Starts the collector task on the running event loop."""
+        if self._task is None or self._task.done():
+            self._pending_event = asyncio.Event()
+            self._task = asyncio.create_task(self._collector_loop(), name="BatchResampler")
+            logger.info(f"🎚️▶️ Batch resampler started (window {self.window_s * 1000:.1f}ms).")
+
+    async def stop(self) -> None:
+        """Stops the collector task, fails pending and in-flight chunks and shuts down the worker threads."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        error = RuntimeError("Batch resampler stopped")
+        for _, _, future in self._in_flight + self._pending:
+            if not future.done():
+                future.set_exception(error)
+        self._in_flight = []
+        self._pending.clear()
+        self._executor.shutdown(wait=False)
+        logger.info("🎚️⏹️ Batch resampler stopped.")
+
+    def register(self) -> int:
+        """
+        Registers a new connection stream.
+
+        Returns:
+            The stream id to pass to `resample` and `unregister`.
+        """
+        stream_id = next(self._stream_ids)
+        with self._streams_lock:
+            self._streams[stream_id] = _BatchStream(self._history_len)
+        return stream_id
+
+    def unregister(self, stream_id: int) -> None:
+        """Drops the filter state of a closed connection."""
+        with self._streams_lock:
+            self._streams.pop(stream_id, None)
+
+    @property
+    def is_running(self) -> bool:
+        """True while the collector task is alive."""
+        return self._task is not None and not self._task.done()
+
+    def resample(self, stream_id: int, chunk: np.ndarray) -> "asyncio.Future[np.ndarray]":
+        """
+        Queues one int16 chunk of a registered stream for the next batch.
+
+        Args:
+            stream_id: Id returned by `register`.
+            chunk: 1-D int16 array of input samples.
+
+        Returns:
+            A future resolving to the resampled int16 array (owned by the caller).
+        """
+        future = asyncio.get_running_loop().create_future()
+        if not self.is_running:
+            future.set_exception(RuntimeError("Batch resampler is not running"))
+            return future
+        self._pending.append((stream_id, chunk, future))
+        self._pending_event.set()
+        return future
+
+    async def _collector_loop(self) -> None:
+        """Waits for pending chunks, collects for `window_s`, then runs one batch off the loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._pending_event.wait()
+            if self.window_s > 0:
+                await asyncio.sleep(self.window_s)
+            self._pending_event.clear()
+            batch, self._pending = self._pending, []
+            if not batch:
+                continue
+            self._in_flight = batch
+            try:
+                results = await loop.run_in_executor(self._executor, self._process_batch, batch)
+            except Exception as e:
+                self._in_flight = []
+                logger.error(f"🎚️💥 Batch resampling failed for {len(batch)} chunks: {e}", exc_info=True)
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self._in_flight = []
+            for (_, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def _process_batch(self, batch: List[Tuple[int, np.ndarray, asyncio.Future]]) -> List[np.ndarray]:
+        """
+        Resamples a batch of chunks from different streams (runs in a worker thread).
+
+        Rows are grouped by chunk length and decimation phase so each group is
+        one 2-D array filtered with a single matmul.
+        """
+        hist = self._history_len
+        results: List[Optional[np.ndarray]] = [None] * len(batch)
+        groups: Dict[Tuple[int, int], List[int]] = {}
+        with self._streams_lock:
+            row_streams = [self._streams.get(stream_id) for stream_id, _, _ in batch]
+        for i, (stream, (_, chunk, _)) in enumerate(zip(row_streams, batch)):
+            if stream is None or len(chunk) == 0:
+                results[i] = np.zeros(0, dtype=np.int16)
+                continue
+            groups.setdefault((len(chunk), stream.phase), []).append(i)
+
+        for (n, phase), indices in groups.items():
+            streams = [row_streams[i] for i in indices]
+            work = np.empty((len(indices), hist + n), dtype=np.float32)
+            for row, (i, stream) in enumerate(zip(indices, streams)):
+                work[row, :hist] = stream.history
+                work[row, hist:] = batch[i][1]
+
+            windows = np.lib.stride_tricks.sliding_window_view(work, hist + 1, axis=1)[:, phase::self.down, :]
+            out = windows @ self._taps_rev # (rows, n_out) in one call
+            np.clip(out, INT16_MIN, INT16_MAX, out=out)
+            out_int16 = out.astype(np.int16)
+
+            new_phase = (phase - n) % self.down
+            for row, (i, stream) in enumerate(zip(indices, streams)):
+                stream.history[:] = work[row, n:]
+                stream.phase = new_phase
+                results[i] = out_int16[row]
+
+        self.batches += 1
+        self.rows += len(batch)
+        return results
@@ -19,11 +19,9 @@ if __name__ == "__main__":
     log_event("🎙️", "Voice Chat Server Starting...")
 
 from upsample_overlap import UpsampleOverlap
-from datetime import datetime
 from colors import Colors
 import uvicorn
 import asyncio
-import struct
 import json
 import time
 import threading # Keep threading for SpeechPipelineManager internals and AbortWorker
@@ -78,6 +76,117 @@ except ValueError:
         logger.warning("🖥️⚠️ Invalid MAX_AUDIO_QUEUE_SIZE env var. Using default: 50")
     MAX_AUDIO_QUEUE_SIZE = 50
 
+# Optional central resampling stage: batches incoming audio from all connections
+# into one vectorized resample call off the event loop (worthwhile with many sessions)
+BATCH_RESAMPLING = os.getenv("BATCH_RESAMPLING", "0").lower() in ("1", "true", "yes")
+try:
+    BATCH_RESAMPLING_WINDOW_MS = float(os.getenv("BATCH_RESAMPLING_WINDOW_MS", 4.0))
+except ValueError:
+    BATCH_RESAMPLING_WINDOW_MS = 4.0
+if __name__ == "__main__":
+    logger.info(f"🖥️⚙️ {Colors.apply('[PARAM]').blue} Batch resampling: {Colors.apply('ON' if BATCH_RESAMPLING else 'OFF').blue}")
+
+# Where each connection's decode/resample runs: "inline" (event loop), "thread"
+# (shared thread pool, the default) or "process" (shared process pool + shared memory)
+from audio_executor import DEFAULT_EXECUTOR_MODE, EXECUTOR_MODES
+AUDIO_EXECUTOR_MODE = os.getenv("AUDIO_EXECUTOR_MODE", DEFAULT_EXECUTOR_MODE).lower()
+if AUDIO_EXECUTOR_MODE not in EXECUTOR_MODES:
+    logger.warning(f"🖥️⚠️ Invalid AUDIO_EXECUTOR_MODE '{AUDIO_EXECUTOR_MODE}'. Using default: {DEFAULT_EXECUTOR_MODE}")
+    AUDIO_EXECUTOR_MODE = DEFAULT_EXECUTOR_MODE
+try:
+    AUDIO_EXECUTOR_WORKERS = int(os.getenv("AUDIO_EXECUTOR_WORKERS", 2))
+except ValueError:
+    AUDIO_EXECUTOR_WORKERS = 2
+if __name__ == "__main__":
+    logger.info(f"🖥️⚙️ {Colors.apply('[PARAM]').blue} Audio executor mode: {Colors.apply(AUDIO_EXECUTOR_MODE).blue} ({AUDIO_EXECUTOR_WORKERS} workers)")
+
+# Energy/ZCR pre-gate: drop clearly silent microphone chunks before resampling and STT
+SILENCE_GATE = os.getenv("SILENCE_GATE", "1").lower() in ("1", "true", "yes")
+try:
+    SILENCE_GATE_OPEN_DBFS = float(os.getenv("SILENCE_GATE_OPEN_DBFS", -48.0))
+    SILENCE_GATE_CLOSE_DBFS = float(os.getenv("SILENCE_GATE_CLOSE_DBFS", -54.0))
+except ValueError:
+    SILENCE_GATE_OPEN_DBFS, SILENCE_GATE_CLOSE_DBFS = -48.0, -54.0
+if __name__ == "__main__":
+    logger.info(f"🖥️⚙️ {Colors.apply('[PARAM]').blue} Silence gate: {Colors.apply('ON' if SILENCE_GATE else 'OFF').blue} (open {SILENCE_GATE_OPEN_DBFS} dBFS, close {SILENCE_GATE_CLOSE_DBFS} dBFS)")
+
+
+# Inference backend of the sentence completion classifier used for turn detection
+TURN_DETECTION_BACKEND = os.getenv("TURN_DETECTION_BACKEND", "torch").lower()
+if TURN_DETECTION_BACKEND not in ("torch", "onnx", "onnx-int8"):
+    logger.warning(f"🖥️⚠️ Invalid TURN_DETECTION_BACKEND '{TURN_DETECTION_BACKEND}'. Using default: torch")
+    TURN_DETECTION_BACKEND = "torch"
+try:
+    TURN_DETECTION_CACHE_SIZE = int(os.getenv("TURN_DETECTION_CACHE_SIZE", 4096))
+except ValueError:
+    TURN_DETECTION_CACHE_SIZE = 4096
+TURN_DETECTION_DEBOUNCE = os.getenv("TURN_DETECTION_DEBOUNCE", "0").lower() in ("1", "true", "yes")
+TURN_DETECTION_VERIFY = os.getenv("TURN_DETECTION_VERIFY", "1").lower() in ("1", "true", "yes")
+if __name__ == "__main__":
+    logger.info(f"🖥️⚙️ {Colors.apply('[PARAM]').blue} Turn detection backend: {Colors.apply(TURN_DETECTION_BACKEND).blue} (cache {TURN_DETECTION_CACHE_SIZE}, debounce {'ON' if TURN_DETECTION_DEBOUNCE else 'OFF'}, parity check {'ON' if TURN_DETECTION_VERIFY else 'OFF'})")
+
+# Speech-to-text topology: "shared" (one AudioToTextRecorder fed by every connection),
+# "multiplexed" (shared Whisper models, per-session VAD/buffers, cross-session batching)
+# or "pool" (Whisper in worker processes, sessions pinned to workers by consistent hashing)
+STT_MODE = os.getenv("STT_MODE", "shared").lower()
+if STT_MODE not in ("shared", "multiplexed", "pool"):
+    logger.warning(f"🖥️⚠️ Invalid STT_MODE '{STT_MODE}'. Using default: shared")
+    STT_MODE = "shared"
+try:
+    STT_MAX_BATCH = int(os.getenv("STT_MAX_BATCH", 8))
+    STT_BATCH_WINDOW_MS = float(os.getenv("STT_BATCH_WINDOW_MS", 10.0))
+except ValueError:
+    STT_MAX_BATCH, STT_BATCH_WINDOW_MS = 8, 10.0
+try:
+    STT_WORKERS = int(os.getenv("STT_WORKERS", 2))
+    STT_SESSIONS_PER_WORKER = int(os.getenv("STT_SESSIONS_PER_WORKER", 8))
+    STT_ADMISSION_TIMEOUT_S = float(os.getenv("STT_ADMISSION_TIMEOUT_S", 10.0))
+    STT_PARTIAL_TAIL_S = float(os.getenv("STT_PARTIAL_TAIL_S", 0.0))
+except ValueError:
+    STT_WORKERS, STT_SESSIONS_PER_WORKER, STT_ADMISSION_TIMEOUT_S, STT_PARTIAL_TAIL_S = 2, 8, 10.0, 0.0
+STT_SPECULATIVE_FINAL = os.getenv("STT_SPECULATIVE_FINAL", "0").lower() in ("1", "true", "yes")
+STT_ADMISSION = os.getenv("STT_ADMISSION", "queue").lower()
+if STT_ADMISSION not in ("queue", "reject"):
+    logger.warning(f"🖥️⚠️ Invalid STT_ADMISSION '{STT_ADMISSION}'. Using default: queue")
+    STT_ADMISSION = "queue"
+if __name__ == "__main__":
+    logger.info(f"🖥️⚙️ {Colors.apply('[PARAM]').blue} STT mode: {Colors.apply(STT_MODE).blue}" + (f" (batch ≤{STT_MAX_BATCH}, window {STT_BATCH_WINDOW_MS:.0f}ms)" if STT_MODE != "shared" else "")
+                + (f", {STT_WORKERS} workers × {STT_SESSIONS_PER_WORKER} sessions, admission {STT_ADMISSION}" if STT_MODE == "pool" else "")
+                + (f", speculative finals {'ON' if STT_SPECULATIVE_FINAL else 'OFF'}, incremental partials "
+                   + (f"(tail {STT_PARTIAL_TAIL_S:.1f}s)" if STT_PARTIAL_TAIL_S > 0 else "OFF") if STT_MODE != "shared" else ""))
+
+# TTS engine instances: 0 shares one engine/stream between all connections (legacy);
+# N > 0 runs N independent engines behind a synthesis job queue
+try:
+    TTS_ENGINE_POOL_SIZE = int(os.getenv("TTS_ENGINE_POOL_SIZE", 0))
+except ValueError:
+    TTS_ENGINE_POOL_SIZE = 0
+# Content-addressed cache of synthesized sentences (memory LRU + optional mmap'd disk tier)
+try:
+    TTS_CACHE_MB = float(os.getenv("TTS_CACHE_MB", 64))
+    TTS_CACHE_DISK_MB = float(os.getenv("TTS_CACHE_DISK_MB", 1024))
+except ValueError:
+    TTS_CACHE_MB, TTS_CACHE_DISK_MB = 64.0, 1024.0
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR") or None
+# Accepted probability of a client playout underrun per answer: lower buffers more before
+# the first audio (smoother), higher starts sooner (lower latency)
+try:
+    TTS_UNDERRUN_TARGET = float(os.getenv("TTS_UNDERRUN_TARGET", 0.05))
+except ValueError:
+    TTS_UNDERRUN_TARGET = 0.05
+# Fixed utterances rendered at startup ("name=text|name=text", or "default" for the built-in
+# greeting/one_moment/ack set); unset disables pre-rendering
+TTS_PRERENDER = os.getenv("TTS_PRERENDER")
+# Play the pre-rendered "one_moment" filler if no answer audio exists this long after the turn ends; 0 disables
+try:
+    TTS_FILLER_DELAY_MS = float(os.getenv("TTS_FILLER_DELAY_MS", 0))
+except ValueError:
+    TTS_FILLER_DELAY_MS = 0.0
+if __name__ == "__main__":
+    logger.info(f"🖥️⚙️ {Colors.apply('[PARAM]').blue} TTS engines: {Colors.apply(str(TTS_ENGINE_POOL_SIZE) + ' pooled' if TTS_ENGINE_POOL_SIZE > 0 else 'one shared stream').blue}")
+    logger.info(f"🖥️⚙️ {Colors.apply('[PARAM]').blue} TTS cache: {Colors.apply(f'{TTS_CACHE_MB:.0f} MiB').blue}" + (f", disk {TTS_CACHE_DIR} ({TTS_CACHE_DISK_MB:.0f} MiB)" if TTS_CACHE_DIR else ""))
+    logger.info(f"🖥️⚙️ {Colors.apply('[PARAM]').blue} TTS underrun target: {Colors.apply(f'{TTS_UNDERRUN_TARGET:.1%}').blue}")
+    logger.info(f"🖥️⚙️ {Colors.apply('[PARAM]').blue} TTS filler delay: {Colors.apply(f'{TTS_FILLER_DELAY_MS:.0f} ms' if TTS_FILLER_DELAY_MS > 0 else 'off').blue}")
 
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -85,12 +194,16 @@ if sys.platform == "win32":
 #from handlerequests import LanguageProcessor
 #from audio_out import AudioOutProcessor
 from audio_in import AudioInputProcessor
+from silence_gate import SilenceGate
 from speech_pipeline_manager import SpeechPipelineManager
+from ws_protocol import TTSFramer
+from audio_ingest import AUDIO_PACKET_HEADER_SIZE, AudioIngestRing
+from async_bridge import AsyncWakeup, ChannelClosed, ThreadToAsyncChannel
+from audio_encoder import EncoderStage, available_encoders, create_encoder, shutdown_encoder_pool
+from tts_pacing import StreamPacingController, pcm_duration
 from colors import Colors
 
 LANGUAGE = "en"
-# TTS_FINAL_TIMEOUT = 0.5 # unsure if 1.0 is needed for stability
-TTS_FINAL_TIMEOUT = 1.0 # unsure if 1.0 is needed for stability
 
 # --------------------------------------------------------------------
 # Custom no-cache StaticFiles
@@ -174,19 +287,50 @@ async def lifespan(app: FastAPI):
     # ============================================================================
     logger.info("🖥️🔧 Initializing shared resources...")
     
-    # 1. Shared TTS Engine and Stream
-    logger.info(f"🖥️🔊 Initializing shared TTS engine: {TTS_START_ENGINE}")
-    from audio_module import AudioProcessor
-    shared_audio = AudioProcessor(
-        engine=TTS_START_ENGINE,
-        orpheus_model=TTS_ORPHEUS_MODEL,
-        skip_prewarm=False  # Prewarm once at startup
+    # 1. Shared TTS Engine and Stream (or a pool of engines behind a job queue)
+    from tts_cache import configure_tts_cache
+    app.state.tts_cache = configure_tts_cache(
+        int(TTS_CACHE_MB * 1024 * 1024),
+        disk_dir=TTS_CACHE_DIR,
+        disk_max_bytes=int(TTS_CACHE_DISK_MB * 1024 * 1024),
     )
-    app.state.shared_tts_engine = shared_audio.engine
-    app.state.shared_tts_stream = shared_audio.stream
-    # Store measured TTFA for later use
-    app.state.shared_tts_stream._measured_ttfa = shared_audio.tts_inference_time
-    logger.info(f"🖥️✅ Shared TTS engine initialized (TTFA: {shared_audio.tts_inference_time:.2f}ms)")
+    app.state.tts_service = None
+    if TTS_ENGINE_POOL_SIZE > 0:
+        from tts_service import TTSSynthesisService
+        app.state.tts_service = TTSSynthesisService(
+            TTS_START_ENGINE, TTS_ORPHEUS_MODEL, pool_size=TTS_ENGINE_POOL_SIZE, underrun_target=TTS_UNDERRUN_TARGET,
+        )
+        logger.info(f"🖥️✅ TTS synthesis service initialized (TTFA: {app.state.tts_service.tts_inference_time:.2f}ms)")
+    else:
+        logger.info(f"🖥️🔊 Initializing shared TTS engine: {TTS_START_ENGINE}")
+        from audio_module import AudioProcessor
+        shared_audio = AudioProcessor(
+            engine=TTS_START_ENGINE,
+            orpheus_model=TTS_ORPHEUS_MODEL,
+            skip_prewarm=False  # Prewarm once at startup
+        )
+        app.state.shared_tts_engine = shared_audio.engine
+        app.state.shared_tts_stream = shared_audio.stream
+        # Store measured TTFA for later use
+        app.state.shared_tts_stream._measured_ttfa = shared_audio.tts_inference_time
+        logger.info(f"🖥️✅ Shared TTS engine initialized (TTFA: {shared_audio.tts_inference_time:.2f}ms)")
+
+    # 1b. Fixed utterances (greeting, fillers) rendered once with the active engine and voice
+    from prerendered_audio import DEFAULT_UTTERANCES, PrerenderedUtterances, parse_utterances
+    app.state.prerendered = None
+    if not TTS_PRERENDER:
+        utterances = {} # Opt-in: synthesizing at startup costs engine time
+    elif TTS_PRERENDER.strip().lower() == "default":
+        utterances = DEFAULT_UTTERANCES
+    else:
+        utterances = parse_utterances(TTS_PRERENDER)
+    if utterances:
+        app.state.prerendered = PrerenderedUtterances()
+        app.state.prerendered.render(
+            app.state.tts_service.open_session("prerender") if app.state.tts_service else shared_audio,
+            utterances,
+        )
+        logger.info(f"🖥️✅ Pre-rendered {len(app.state.prerendered)} utterances: {', '.join(app.state.prerendered.names())}")
     
     # 2. Shared LLM Client (skip for Bedrock as it's session-based)
     if LLM_START_PROVIDER != "bedrock":
@@ -220,6 +364,13 @@ async def lifespan(app: FastAPI):
         logger.info("🖥️ℹ️ Bedrock uses per-session LLM, skipping shared LLM initialization")
     
     # 3. Shared STT Recorder (WhisperModel)
+    from completion_server import configure_completion_servers
+    configure_completion_servers(
+        backend=TURN_DETECTION_BACKEND,
+        cache_size=TURN_DETECTION_CACHE_SIZE,
+        debounce=TURN_DETECTION_DEBOUNCE,
+        verify_backend=TURN_DETECTION_VERIFY,
+    )
     logger.info(f"🖥️🎙️ Initializing shared STT recorder (Whisper model)")
     from transcribe import TranscriptionProcessor, DEFAULT_RECORDER_CONFIG, START_STT_SERVER
     import copy
@@ -230,7 +381,32 @@ async def lifespan(app: FastAPI):
     
     # We'll create the recorder directly without callbacks for now
     # Callbacks will be set per-connection
-    if START_STT_SERVER:
+    app.state.stt_service = None
+    if STT_MODE == "multiplexed":
+        from stt_service import MultiplexedSTTService
+        app.state.stt_service = MultiplexedSTTService(
+            temp_config,
+            max_batch=STT_MAX_BATCH,
+            window_ms=STT_BATCH_WINDOW_MS,
+            speculative_final=STT_SPECULATIVE_FINAL,
+            partial_tail_s=STT_PARTIAL_TAIL_S,
+        )
+        shared_recorder = None # Each connection gets its own session stream
+    elif STT_MODE == "pool":
+        from stt_pool import STTWorkerPool
+        app.state.stt_service = STTWorkerPool(
+            temp_config,
+            workers=STT_WORKERS,
+            max_sessions_per_worker=STT_SESSIONS_PER_WORKER,
+            admission=STT_ADMISSION,
+            admission_timeout=STT_ADMISSION_TIMEOUT_S,
+            max_batch=STT_MAX_BATCH,
+            window_ms=STT_BATCH_WINDOW_MS,
+            speculative_final=STT_SPECULATIVE_FINAL,
+            partial_tail_s=STT_PARTIAL_TAIL_S,
+        )
+        shared_recorder = None
+    elif START_STT_SERVER:
         from RealtimeSTT import AudioToTextRecorderClient
         shared_recorder = AudioToTextRecorderClient(**temp_config)
     else:
@@ -243,7 +419,7 @@ async def lifespan(app: FastAPI):
         shared_recorder.use_wake_words = False
     
     app.state.shared_recorder = shared_recorder
-    logger.info("🖥️✅ Shared STT recorder initialized (Whisper model loaded)")
+    logger.info(f"🖥️✅ Shared STT {'service' if app.state.stt_service else 'recorder'} initialized (Whisper model loaded)")
     
     # 4. Shared utility classes (lightweight but why not)
     from text_similarity import TextSimilarity
@@ -251,14 +427,50 @@ async def lifespan(app: FastAPI):
     app.state.shared_text_similarity = TextSimilarity(focus='end', n_words=5)
     app.state.shared_text_context = TextContext()
     logger.info("🖥️✅ Shared utility classes initialized")
+
+    # 5. Optional central batch resampler for incoming audio
+    if BATCH_RESAMPLING:
+        from resampler import BatchResampler
+        app.state.batch_resampler = BatchResampler(
+            down=AudioInputProcessor._RESAMPLE_RATIO,
+            window_ms=BATCH_RESAMPLING_WINDOW_MS,
+        )
+        app.state.batch_resampler.start()
+    else:
+        app.state.batch_resampler = None
+
+    # 6. Shared audio executor pool and event-loop stall monitor
+    from audio_executor import EventLoopLagMonitor, get_audio_executor, shutdown_audio_executors
+    get_audio_executor(AUDIO_EXECUTOR_MODE, max_workers=AUDIO_EXECUTOR_WORKERS)
+    app.state.loop_lag_monitor = EventLoopLagMonitor(report_interval=60.0)
+    app.state.loop_lag_monitor.start()
     
     logger.info("🖥️✅ All shared resources initialized - ready for connections")
 
     yield
 
     logger.info("🖥️⏹️ Server shutting down")
+
+    if app.state.batch_resampler:
+        await app.state.batch_resampler.stop()
+    logger.info(f"🖥️⏱️ Event loop lag ({AUDIO_EXECUTOR_MODE} audio executor): {app.state.loop_lag_monitor.summary()}")
+    await app.state.loop_lag_monitor.stop()
+    shutdown_audio_executors()
+    shutdown_encoder_pool()
+    from completion_server import shutdown_completion_servers
+    shutdown_completion_servers()
+    from timer_scheduler import shutdown_timer_scheduler
+    shutdown_timer_scheduler()
     
     # Cleanup shared resources
+    if app.state.tts_cache:
+        logger.info(f"🖥️🔊 TTS cache: {app.state.tts_cache.summary()}")
+    if app.state.tts_service:
+        logger.info(f"🖥️🔊 TTS service: {app.state.tts_service.summary()}")
+        app.state.tts_service.shutdown()
+    if app.state.stt_service:
+        logger.info(f"🖥️🎙️ STT service: {app.state.stt_service.summary()}")
+        app.state.stt_service.shutdown()
     if hasattr(app.state, 'shared_recorder') and app.state.shared_recorder:
         try:
             logger.info("🖥️🧹 Shutting down shared recorder...")
@@ -350,50 +562,25 @@ def parse_json_message(text: str) -> dict:
         logger.warning("🖥️⚠️ Ignoring client message with invalid JSON")
         return {}
 
-def format_timestamp_ns(timestamp_ns: int) -> str:
-    """
-    Formats a nanosecond timestamp into a human-readable HH:MM:SS.fff string.
-
-    Args:
-        timestamp_ns: The timestamp in nanoseconds since the epoch.
-
-    Returns:
-        A string formatted as hours:minutes:seconds.milliseconds.
-    """
-    # Split into whole seconds and the nanosecond remainder
-    seconds = timestamp_ns // 1_000_000_000
-    remainder_ns = timestamp_ns % 1_000_000_000
-
-    # Convert seconds part into a datetime object (local time)
-    dt = datetime.fromtimestamp(seconds)
-
-    # Format the main time as HH:MM:SS
-    time_str = dt.strftime("%H:%M:%S")
-
-    # For instance, if you want milliseconds, divide the remainder by 1e6 and format as 3-digit
-    milliseconds = remainder_ns // 1_000_000
-    formatted_timestamp = f"{time_str}.{milliseconds:03d}"
-
-    return formatted_timestamp
-
 # --------------------------------------------------------------------
 # WebSocket data processing
 # --------------------------------------------------------------------
 
-async def process_incoming_data(ws: WebSocket, conn_state, incoming_chunks: asyncio.Queue, callbacks: 'TranscriptionCallbacks') -> None:
+async def process_incoming_data(ws: WebSocket, conn_state, incoming_chunks: AudioIngestRing, callbacks: 'TranscriptionCallbacks') -> None:
     """
     Receives messages via WebSocket, processes audio and text messages.
 
-    Handles binary audio chunks, extracting metadata (timestamp, flags) and
-    putting the audio PCM data with metadata into the `incoming_chunks` queue.
-    Applies back-pressure if the queue is full.
+    Handles binary audio chunks by pushing them into the connection's
+    `incoming_chunks` ring, which parses the header (timestamp, flags) into a
+    reused metadata record and keeps the PCM as a zero-copy view of the
+    message. Drops chunks if the ring is full.
     Parses text messages (assumed JSON) and triggers actions based on message type
     (e.g., updates client TTS state via `callbacks`, clears history, sets speed).
 
     Args:
         ws: The WebSocket connection instance.
         app: The FastAPI application instance (for accessing global state if needed).
-        incoming_chunks: An asyncio queue to put processed audio metadata dictionaries into.
+        incoming_chunks: The connection's `AudioIngestRing` for received audio packets.
         callbacks: The TranscriptionCallbacks instance for this connection to manage state.
     """
     try:
@@ -403,39 +590,14 @@ async def process_incoming_data(ws: WebSocket, conn_state, incoming_chunks: asyn
                 raw = msg["bytes"]
 
                 # Ensure we have at least an 8‑byte header: 4 bytes timestamp_ms + 4 bytes flags
-                if len(raw) < 8:
+                if len(raw) < AUDIO_PACKET_HEADER_SIZE:
                     logger.warning("🖥️⚠️ Received packet too short for 8‑byte header.")
                     continue
 
-                # Unpack big‑endian uint32 timestamp (ms) and uint32 flags
-                timestamp_ms, flags = struct.unpack("!II", raw[:8])
-                client_sent_ns = timestamp_ms * 1_000_000
-
-                # Build metadata using fixed fields
-                metadata = {
-                    "client_sent_ms":           timestamp_ms,
-                    "client_sent":              client_sent_ns,
-                    "client_sent_formatted":    format_timestamp_ns(client_sent_ns),
-                    "isTTSPlaying":             bool(flags & 1),
-                }
-
-                # Record server receive time
-                server_ns = time.time_ns()
-                metadata["server_received"] = server_ns
-                metadata["server_received_formatted"] = format_timestamp_ns(server_ns)
-
-                # The rest of the payload is raw PCM bytes
-                metadata["pcm"] = raw[8:]
-
-                # Check queue size before putting data
-                current_qsize = incoming_chunks.qsize()
-                if current_qsize < MAX_AUDIO_QUEUE_SIZE:
-                    # Now put only the metadata dict (containing PCM audio) into the processing queue.
-                    await incoming_chunks.put(metadata)
-                else:
-                    # Queue is full, drop the chunk and log a warning
+                if not incoming_chunks.push(raw):
+                    # Ring is full, the chunk was dropped
                     logger.warning(
-                        f"🖥️⚠️ Audio queue full ({current_qsize}/{MAX_AUDIO_QUEUE_SIZE}); dropping chunk. Possible lag."
+                        f"🖥️⚠️ Audio queue full ({incoming_chunks.qsize()}/{MAX_AUDIO_QUEUE_SIZE}); dropping chunk. Possible lag."
                     )
 
             elif "text" in msg and msg["text"]:
@@ -453,6 +615,10 @@ async def process_incoming_data(ws: WebSocket, conn_state, incoming_chunks: asyn
                     logger.info("🖥️ℹ️ Received tts_stop from client.")
                     # Update connection-specific state via callbacks
                     callbacks.tts_client_playing = False
+                    # Playback ran dry while the answer is still streaming: an underrun
+                    pipeline_manager = conn_state.pipeline_manager
+                    if pipeline_manager.is_valid_gen() and not pipeline_manager.running_generation.abortion_started:
+                        pipeline_manager.audio.pacing.record_client_stop()
                 # Add to the handleJSONMessage function in server.py
                 elif msg_type == "clear_history":
                     logger.info("🖥️ℹ️ Received clear_history from client.")
@@ -464,6 +630,16 @@ async def process_incoming_data(ws: WebSocket, conn_state, incoming_chunks: asyn
                     if turn_detection:
                         turn_detection.update_settings(speed_factor)
                         logger.info(f"🖥️⚙️ Updated turn detection settings to factor: {speed_factor:.2f}")
+                elif msg_type == "set_tts_transport":
+                    # Encoded payloads only travel in binary frames; base64 JSON stays PCM
+                    codec_name = data.get("codec", "pcm") if data.get("transport") == "binary" else "pcm"
+                    conn_state.tts_encoder = EncoderStage(create_encoder(codec_name))
+                    # Answer goes through the message queue so it precedes any frame in the new format
+                    answer = conn_state.tts_framer.negotiate(data.get("transport"), conn_state.tts_encoder.codec_id)
+                    answer["codec_name"] = conn_state.tts_encoder.encoder.name
+                    answer["available_codecs"] = available_encoders()
+                    logger.info(f"🖥️⚙️ TTS transport set to: {conn_state.tts_framer.transport} ({answer['codec_name']})")
+                    callbacks.message_queue.put_nowait(answer)
 
 
     except asyncio.CancelledError:
@@ -475,21 +651,27 @@ async def process_incoming_data(ws: WebSocket, conn_state, incoming_chunks: asyn
     except Exception as e:
         logger.exception(f"🖥️💥 {Colors.apply('EXCEPTION').red} in process_incoming_data: {repr(e)}")
 
-async def send_text_messages(ws: WebSocket, message_queue: asyncio.Queue) -> None:
+async def send_text_messages(ws: WebSocket, message_queue: ThreadToAsyncChannel) -> None:
     """
     Continuously sends text messages from a queue to the client via WebSocket.
 
-    Waits for messages on the `message_queue`, formats them as JSON, and sends
-    them to the connected WebSocket client. Logs non-TTS messages.
+    Waits for messages on the `message_queue` and sends them to the connected
+    WebSocket client: dictionaries as JSON text messages, bytes (binary TTS
+    frames) as binary messages. Logs non-TTS messages.
 
     Args:
         ws: The WebSocket connection instance.
-        message_queue: An asyncio queue yielding dictionaries to be sent as JSON.
+        message_queue: The connection's outgoing channel (fed from the event loop
+                       and from pipeline/transcription threads) yielding
+                       dictionaries to be sent as JSON or bytes to be sent as
+                       binary frames.
     """
     try:
         while True:
-            await asyncio.sleep(0.001) # Yield control
             data = await message_queue.get()
+            if isinstance(data, bytes):
+                await ws.send_bytes(data)
+                continue
             msg_type = data.get("type")
             if msg_type != "tts_chunk":
                 logger.info(Colors.apply(f"🖥️📤 →→Client: {data}").orange)
@@ -526,7 +708,7 @@ async def _reset_interrupt_flag_async(audio_processor, callbacks: 'Transcription
         callbacks.interruption_time = 0
         logger.info(Colors.apply("🖥️🎙️ interruption flag reset after TTS chunk (async)").cyan)
 
-async def send_tts_chunks(conn_state, message_queue: asyncio.Queue, callbacks: 'TranscriptionCallbacks') -> None:
+async def send_tts_chunks(conn_state, message_queue: ThreadToAsyncChannel, callbacks: 'TranscriptionCallbacks') -> None:
     """
     Continuously sends TTS audio chunks from the SpeechPipelineManager to the client.
 
@@ -535,16 +717,29 @@ async def send_tts_chunks(conn_state, message_queue: asyncio.Queue, callbacks: '
     queue, upsamples/encodes them, and puts them onto the outgoing `message_queue`
     for the client. Handles the end-of-generation logic and state resets.
 
+    Event-driven: whenever there is nothing to send, the task awaits
+    `conn_state.tts_wakeup`, which the pipeline threads and callbacks notify on
+    every relevant state change or queued audio chunk. The only timed wakeup is
+    the pending microphone interruption reset. The generation's `audio_chunks`
+    channel is closed by the pipeline once all of its audio has been queued,
+    so the end of a generation is "channel closed and drained" rather than a
+    guess based on an empty queue.
+
     Args:
         app: The FastAPI application instance (to access global components).
-        message_queue: An asyncio queue to put outgoing TTS chunk messages onto.
+        message_queue: The outgoing channel to put TTS chunk messages onto.
         callbacks: The TranscriptionCallbacks instance managing this connection's state.
     """
     try:
         logger.info("🖥️🔊 Starting TTS chunk sender")
-        last_quick_answer_chunk = 0
-        last_chunk_sent = 0
         prev_status = None
+        wakeup = conn_state.tts_wakeup
+
+        def interruption_reset_timeout() -> Optional[float]:
+            """Seconds until the microphone interruption flag is due for reset, or None if not pending."""
+            if conn_state.audio_processor.interrupted and callbacks.interruption_time:
+                return callbacks.interruption_time + 2.0 - time.time()
+            return None
 
         while True:
             # Use connection-specific interruption_time via callbacks
@@ -557,12 +752,6 @@ async def send_tts_chunks(conn_state, message_queue: asyncio.Queue, callbacks: '
 
             def log_status():
                 nonlocal prev_status
-                last_quick_answer_chunk_decayed = (
-                    last_quick_answer_chunk
-                    and time.time() - last_quick_answer_chunk > TTS_FINAL_TIMEOUT
-                    and time.time() - last_chunk_sent > TTS_FINAL_TIMEOUT
-                )
-
                 curr_status = (
                     # Access connection-specific state via callbacks
                     int(callbacks.tts_to_client),
@@ -594,42 +783,59 @@ async def send_tts_chunks(conn_state, message_queue: asyncio.Queue, callbacks: '
             # Use connection-specific state via callbacks
             if not callbacks.tts_to_client:
                 log_status()
-                await asyncio.sleep(0.001)  # Only sleep when waiting
+                await wakeup.wait(interruption_reset_timeout())
                 continue
 
             if not conn_state.pipeline_manager.running_generation:
                 log_status()
-                await asyncio.sleep(0.001)  # Only sleep when waiting
+                await wakeup.wait(interruption_reset_timeout())
                 continue
 
             if conn_state.pipeline_manager.running_generation.abortion_started:
                 log_status()
-                await asyncio.sleep(0.001)  # Only sleep when waiting
+                await wakeup.wait(interruption_reset_timeout())
                 continue
 
             if not conn_state.pipeline_manager.running_generation.audio_quick_finished:
                 conn_state.pipeline_manager.running_generation.tts_quick_allowed_event.set()
 
-            if not conn_state.pipeline_manager.running_generation.quick_answer_first_chunk_ready:
+            if (not conn_state.pipeline_manager.running_generation.quick_answer_first_chunk_ready
+                    and not conn_state.pipeline_manager.running_generation.audio_chunks.closed):
+                log_status()
+                await wakeup.wait(interruption_reset_timeout())
+                continue
+
+            # The request worker thread may abort and clear the generation at any
+            # time (also while the encoder is awaited), so the chunk is sent for this snapshot
+            gen = conn_state.pipeline_manager.running_generation
+            if gen is None or gen.abortion_started:
                 log_status()
-                await asyncio.sleep(0.001)  # Only sleep when waiting
                 continue
 
             chunk = None
             try:
-                chunk = conn_state.pipeline_manager.running_generation.audio_chunks.get_nowait()
+                chunk = gen.audio_chunks.get_nowait()
                 if chunk:
-                    last_quick_answer_chunk = time.time()
                     logger.debug(f"🖥️🔊 Got audio chunk from queue, size={len(chunk)} bytes")
             except Empty:
-                final_expected = conn_state.pipeline_manager.running_generation.quick_answer_provided
-                audio_final_finished = conn_state.pipeline_manager.running_generation.audio_final_finished
-
-                if not final_expected or audio_final_finished:
+                log_status()
+                await wakeup.wait(interruption_reset_timeout())
+                continue
+            except ChannelClosed:
+                # All audio of the generation has been queued and sent. A channel
+                # closed by an abort is left to the abort path instead.
+                if not gen.abortion_started:
                     logger.info("🖥️🏁 Sending of TTS chunks and 'user request/assistant answer' cycle finished.")
+                    conn_state.pipeline_manager.audio.pacing.end_response()
+                    if conn_state.tts_framer.binary and callbacks.tts_chunk_sent:
+                        gen_id = gen.id
+                        tail = conn_state.tts_encoder.finish(gen_id)
+                        if tail:
+                            message_queue.put_nowait(conn_state.tts_framer.frame(gen_id, tail))
+                        message_queue.put_nowait(conn_state.tts_framer.end_frame(gen_id))
                     callbacks.send_final_assistant_answer() # Callbacks method
 
-                    assistant_answer = conn_state.pipeline_manager.running_generation.quick_answer + conn_state.pipeline_manager.running_generation.final_answer                    
+                    assistant_answer = gen.quick_answer + gen.final_answer                    
                     conn_state.pipeline_manager.running_generation = None
 
                     callbacks.tts_chunk_sent = False # Reset via callbacks
@@ -637,18 +843,28 @@ async def send_tts_chunks(conn_state, message_queue: asyncio.Queue, callbacks: '
                     # final partial_assistant_answer messages from being sent if LLM is still generating
                     # State will be reset when the next user turn starts (on_before_final)
 
-                await asyncio.sleep(0.001)
                 log_status()
-                continue
+                continue # Re-check state right away; the next generation may already be waiting
 
             # Process chunk immediately without sleeping
-            base64_chunk = conn_state.upsampler.get_base64_chunk(chunk)
-            logger.info(f"🖥️🔊📤 Sending tts_chunk to client, b64_len={len(base64_chunk)}, raw_len={len(chunk)}")
-            message_queue.put_nowait({
-                "type": "tts_chunk",
-                "content": base64_chunk
-            })
-            last_chunk_sent = time.time()
+            if conn_state.tts_framer.binary:
+                gen_id = gen.id
+                payload = await conn_state.tts_encoder.encode(gen_id, chunk)
+                if gen.abortion_started:
+                    continue # Aborted while encoding; the abort path resets the client
+                if payload:
+                    logger.debug(f"🖥️🔊📤 Sending binary tts frame to client, raw_len={len(chunk)}, payload_len={len(payload)}")
+                    message_queue.put_nowait(conn_state.tts_framer.frame(gen_id, payload))
+            else:
+                base64_chunk = conn_state.upsampler.get_base64_chunk(chunk)
+                logger.info(f"🖥️🔊📤 Sending tts_chunk to client, b64_len={len(base64_chunk)}, raw_len={len(chunk)}")
+                message_queue.put_nowait({
+                    "type": "tts_chunk",
+                    "content": base64_chunk
+                })
+
+            # Feeds the playout lead estimate of the session's pacing controller
+            conn_state.pipeline_manager.audio.pacing.record_sent(gen.id, pcm_duration(chunk))
 
             # Use connection-specific state via callbacks
             if not callbacks.tts_chunk_sent:
@@ -680,13 +896,14 @@ class TranscriptionCallbacks:
     `message_queue` and manages interaction logic like interruptions and final answer delivery.
     It also includes a threaded worker to handle abort checks based on partial transcription.
     """
-    def __init__(self, conn_state, message_queue: asyncio.Queue, user_id: str):
+    def __init__(self, conn_state, message_queue: ThreadToAsyncChannel, user_id: str):
         """
         Initializes the TranscriptionCallbacks instance for a WebSocket connection.
 
         Args:
             conn_state: The connection-specific state object containing pipeline_manager and audio_processor.
-            message_queue: An asyncio queue for sending messages back to the client.
+            message_queue: The outgoing channel for sending messages back to the client
+                           (safe to feed from the transcription and pipeline threads).
             user_id: Short identifier for this user (for logging).
         """
         self.conn_state = conn_state
@@ -855,6 +1072,10 @@ class TranscriptionCallbacks:
 
         logger.info(f"{Colors.apply('🖥️🔊 TTS STREAM RELEASED').blue}")
         self.tts_to_client = True # Set connection-specific flag
+        self.conn_state.tts_wakeup.notify() # Release the waiting TTS sender
+        if TTS_FILLER_DELAY_MS > 0:
+            # Bridge a slow first answer sentence with "one moment"
+            self.conn_state.pipeline_manager.schedule_prerendered("one_moment", TTS_FILLER_DELAY_MS / 1000)
 
         # Send final user request (using the reliable final_transcription OR current partial if final isn't set yet)
         user_request_content = self.final_transcription if self.final_transcription else self.partial_transcription
@@ -1072,8 +1293,8 @@ async def websocket_endpoint(ws: WebSocket):
     user_id = str(connection_id)[-4:]
     log_event("🔌", f"[User {user_id}] Connected")
 
-    message_queue = asyncio.Queue()
-    audio_chunks = asyncio.Queue()
+    message_queue = ThreadToAsyncChannel()
+    audio_chunks = AudioIngestRing(MAX_AUDIO_QUEUE_SIZE + 1) # +1: the packet being processed
     
     # Send "initializing" status to client
     await ws.send_json({
@@ -1081,86 +1302,135 @@ async def websocket_endpoint(ws: WebSocket):
         "status": "initializing",
         "message": "Setting up your interview session..."
     })
+
+    # Reserve this connection's STT session first: in pool mode it may wait for,
+    # or be refused, a worker slot, and nothing else should be set up before that
+    stt_session = None
+    if app.state.stt_service:
+        try:
+            opening = asyncio.ensure_future(asyncio.to_thread(app.state.stt_service.open_session, str(connection_id)))
+            stt_session = await asyncio.shield(opening)
+        except asyncio.CancelledError:
+            # The thread cannot be interrupted; close the session it may still open
+            opening.add_done_callback(lambda task: task.cancelled() or task.exception() or task.result().shutdown())
+            raise
+        except RuntimeError as e:
+            logger.warning(f"🖥️🚫 [User {user_id}] No STT capacity: {e}")
+            await ws.send_json({
+                "type": "status",
+                "status": "busy",
+                "message": "All speech recognition workers are busy. Please try again shortly."
+            })
+            await ws.close(code=1013) # Try again later
+            return
     
-    # Create DEDICATED pipeline manager for this connection
-    # Uses SHARED resources (TTS engine, LLM client, STT recorder) but maintains
-    # per-connection state (history, generation state, callbacks)
-    log_event("⚙️", f"[User {user_id}] Initializing session (using shared models)...")
+    # Until the session's try/finally below owns it, a failed setup must return the STT slot
+    tasks = []
+    audio_processor = None
+    try:
+        # Create DEDICATED pipeline manager for this connection
+        # Uses SHARED resources (TTS engine, LLM client, STT recorder) but maintains
+        # per-connection state (history, generation state, callbacks)
+        log_event("⚙️", f"[User {user_id}] Initializing session (using shared models)...")
     
-    # Prepare shared audio processor wrapper
-    from audio_module import AudioProcessor
-    shared_audio_wrapper = AudioProcessor(
-        engine=TTS_START_ENGINE,
-        orpheus_model=TTS_ORPHEUS_MODEL,
-        skip_prewarm=True,  # Skip prewarm, use shared resources
-        shared_engine=app.state.shared_tts_engine,
-        shared_stream=app.state.shared_tts_stream,
-    )
+        # Prepare shared audio processor wrapper (a session on the TTS service, if pooled)
+        if app.state.tts_service:
+            shared_audio_wrapper = app.state.tts_service.open_session(user_id)
+        else:
+            from audio_module import AudioProcessor
+            shared_audio_wrapper = AudioProcessor(
+                engine=TTS_START_ENGINE,
+                orpheus_model=TTS_ORPHEUS_MODEL,
+                skip_prewarm=True,  # Skip prewarm, use shared resources
+                shared_engine=app.state.shared_tts_engine,
+                shared_stream=app.state.shared_tts_stream,
+                pacing=StreamPacingController(TTS_UNDERRUN_TARGET),
+            )
     
-    # Create pipeline manager with shared resources
-    pipeline_config = app.state.PIPELINE_CONFIG.copy()
-    pipeline_config.update({
-        "skip_prewarm": True,  # Skip prewarming, use shared resources
-        "shared_audio_processor": shared_audio_wrapper,
-        "shared_llm": app.state.shared_llm,
-        "shared_text_similarity": app.state.shared_text_similarity,
-        "shared_text_context": app.state.shared_text_context,
-    })
+        # Create pipeline manager with shared resources
+        pipeline_config = app.state.PIPELINE_CONFIG.copy()
+        pipeline_config.update({
+            "skip_prewarm": True,  # Skip prewarming, use shared resources
+            "shared_audio_processor": shared_audio_wrapper,
+            "shared_llm": app.state.shared_llm,
+            "shared_text_similarity": app.state.shared_text_similarity,
+            "shared_text_context": app.state.shared_text_context,
+            "prerendered": app.state.prerendered,
+        })
     
-    pipeline_manager = SpeechPipelineManager(**pipeline_config)
-    log_event("✅", f"[User {user_id}] Pipeline ready (shared models)")
+        pipeline_manager = SpeechPipelineManager(**pipeline_config)
+        log_event("✅", f"[User {user_id}] Pipeline ready (shared models)")
     
-    # Create DEDICATED audio processor for this connection (uses shared recorder)
-    audio_processor = AudioInputProcessor(
-        LANGUAGE,
-        is_orpheus=TTS_START_ENGINE=="orpheus",
-        pipeline_latency=pipeline_manager.full_output_pipeline_latency / 1000,
-        shared_recorder=app.state.shared_recorder,  # Use shared recorder
-    )
-    log_event("🎧", f"[User {user_id}] Audio system ready (shared recorder)")
-
-    # Create connection state holder
-    class ConnectionState:
-        def __init__(self):
-            self.pipeline_manager = pipeline_manager
-            self.audio_processor = audio_processor
-            self.upsampler = app.state.Upsampler  # Shared (stateless)
-            self.conversation_history = []  # Per-connection history
+        # Create DEDICATED audio processor for this connection (uses shared recorder,
+        # or its own session stream on the STT service)
+        audio_processor = AudioInputProcessor(
+            LANGUAGE,
+            is_orpheus=TTS_START_ENGINE=="orpheus",
+            pipeline_latency=pipeline_manager.full_output_pipeline_latency / 1000,
+            shared_recorder=stt_session or app.state.shared_recorder,  # Use shared recorder
+            batch_resampler=app.state.batch_resampler,
+            executor_mode=AUDIO_EXECUTOR_MODE,
+            silence_gate=SilenceGate(
+                open_dbfs=SILENCE_GATE_OPEN_DBFS,
+                close_dbfs=SILENCE_GATE_CLOSE_DBFS,
+            ) if SILENCE_GATE else None,
+        )
+        log_event("🎧", f"[User {user_id}] Audio system ready (shared recorder)")
+
+        # Create connection state holder
+        class ConnectionState:
+            def __init__(self):
+                self.pipeline_manager = pipeline_manager
+                self.audio_processor = audio_processor
+                self.upsampler = app.state.Upsampler  # Shared (stateless)
+                self.tts_framer = TTSFramer()  # Legacy base64 until the client negotiates binary
+                self.tts_encoder = EncoderStage(create_encoder("pcm"))  # Outbound codec for binary frames
+                self.tts_wakeup = AsyncWakeup()  # Wakes send_tts_chunks on pipeline state changes
+                self.conversation_history = []  # Per-connection history
     
-    conn_state = ConnectionState()
-
-    # Set up callback manager with connection-specific state
-    callbacks = TranscriptionCallbacks(conn_state, message_queue, user_id)
-
-    # Assign callbacks to the shared AudioInputProcessor
-    audio_processor.realtime_callback = callbacks.on_partial
-    audio_processor.transcriber.potential_sentence_end = callbacks.on_potential_sentence
-    audio_processor.transcriber.on_tts_allowed_to_synthesize = callbacks.on_tts_allowed_to_synthesize
-    audio_processor.transcriber.potential_full_transcription_callback = callbacks.on_potential_final
-    audio_processor.transcriber.potential_full_transcription_abort_callback = callbacks.on_potential_abort
-    audio_processor.transcriber.full_transcription_callback = callbacks.on_final
-    audio_processor.transcriber.before_final_sentence = callbacks.on_before_final
-    audio_processor.recording_start_callback = callbacks.on_recording_start
-    audio_processor.silence_active_callback = callbacks.on_silence_active
-
-    # Assign callback to the shared SpeechPipelineManager
-    pipeline_manager.on_partial_assistant_text = callbacks.on_partial_assistant_text
-
-    # Create tasks for handling different responsibilities
-    tasks = [
-        asyncio.create_task(process_incoming_data(ws, conn_state, audio_chunks, callbacks)),
-        asyncio.create_task(audio_processor.process_chunk_queue(audio_chunks)),
-        asyncio.create_task(send_text_messages(ws, message_queue)),
-        asyncio.create_task(send_tts_chunks(conn_state, message_queue, callbacks)),
-    ]
+        conn_state = ConnectionState()
+
+        # Set up callback manager with connection-specific state
+        callbacks = TranscriptionCallbacks(conn_state, message_queue, user_id)
+
+        # Assign callbacks to the shared AudioInputProcessor
+        audio_processor.realtime_callback = callbacks.on_partial
+        audio_processor.transcriber.potential_sentence_end = callbacks.on_potential_sentence
+        audio_processor.transcriber.on_tts_allowed_to_synthesize = callbacks.on_tts_allowed_to_synthesize
+        audio_processor.transcriber.potential_full_transcription_callback = callbacks.on_potential_final
+        audio_processor.transcriber.potential_full_transcription_abort_callback = callbacks.on_potential_abort
+        audio_processor.transcriber.full_transcription_callback = callbacks.on_final
+        audio_processor.transcriber.before_final_sentence = callbacks.on_before_final
+        audio_processor.recording_start_callback = callbacks.on_recording_start
+        audio_processor.silence_active_callback = callbacks.on_silence_active
+
+        # Assign callback to the shared SpeechPipelineManager
+        pipeline_manager.on_partial_assistant_text = callbacks.on_partial_assistant_text
+        pipeline_manager.on_state_change = conn_state.tts_wakeup.notify
+
+        # Create tasks for handling different responsibilities
+        tasks = [
+            asyncio.create_task(process_incoming_data(ws, conn_state, audio_chunks, callbacks)),
+            asyncio.create_task(audio_processor.process_chunk_queue(audio_chunks)),
+            asyncio.create_task(send_text_messages(ws, message_queue)),
+            asyncio.create_task(send_tts_chunks(conn_state, message_queue, callbacks)),
+        ]
     
-    # NOW send "ready" status - everything is initialized and tasks are running
-    await ws.send_json({
-        "type": "status",
-        "status": "ready",
-        "message": "Interview session ready! You can start speaking now."
-    })
-    log_event("🚀", f"[User {user_id}] Interview session ready - user can speak now")
+        # NOW send "ready" status - everything is initialized and tasks are running
+        await ws.send_json({
+            "type": "status",
+            "status": "ready",
+            "message": "Interview session ready! You can start speaking now."
+        })
+        log_event("🚀", f"[User {user_id}] Interview session ready - user can speak now")
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        if stt_session:
+            if audio_processor:
+                audio_processor.shutdown() # Closes the session and ends its transcription task
+            stt_session.shutdown()
+        raise
 
     try:
         # Wait for any task to complete (e.g., client disconnect)
@@ -1194,6 +1464,19 @@ async def websocket_endpoint(ws: WebSocket):
             
             # Stop audio processor
             audio_processor.interrupted = True
+            audio_processor.release_resampler()
+            if stt_session:
+                # Per-session recorder: safe to shut down (closes the session, ends the transcription task)
+                audio_processor.shutdown()
+            logger.info(f"🖥️⏱️ [{connection_id}] Audio stage latency ({AUDIO_EXECUTOR_MODE}): {audio_processor.stage_latency_summary()}")
+            logger.info(f"🖥️⏱️ Event loop lag: {app.state.loop_lag_monitor.summary()}")
+            logger.info(f"🖥️🎙️ [{connection_id}] Audio ingest: {audio_chunks.pushed} packets, {audio_chunks.dropped} dropped")
+            if conn_state.tts_framer.binary:
+                logger.info(f"🖥️📦 [{connection_id}] TTS egress {conn_state.tts_encoder.summary()}")
+            logger.info(f"🖥️🔊 [{connection_id}] TTS pacing: {pipeline_manager.audio.pacing.summary()}")
+            pipeline_manager.on_state_change = None
+            logger.info(f"🖥️⏱️ [{connection_id}] TTS sender wakeups: {conn_state.tts_wakeup.wakeups} "
+                        f"({conn_state.tts_wakeup.wakeups_per_second():.1f}/s, {conn_state.tts_wakeup.notifications} notifications)")
             
             logger.info(f"🖥️✅ Cleaned up pipeline and audio processor for connection {connection_id}")
         except Exception as e:
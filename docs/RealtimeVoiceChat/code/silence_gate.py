@@ -0,0 +1,145 @@
+"""
+Cheap energy / zero-crossing pre-gate for incoming microphone audio.
+
+Sits in front of resampling and transcription. While the gate is closed,
+chunks are dropped before any resampling, VAD or Whisper work is done for
+them, so a connection idling in a quiet room costs almost nothing.
+
+A chunk counts as speech-like if its RMS level reaches the gate threshold, or
+if it is a quieter but noise-like chunk (high zero-crossing rate) that could
+be an unvoiced onset such as "s" or "f". Hysteresis avoids chattering: the
+gate opens at `open_dbfs`, stays open down to `close_dbfs`, and only closes
+after `hangover_s` without speech-like chunks and while the recorder is not
+in the middle of an utterance. When it opens, the last `preroll_s` of dropped
+audio is released first so the recorder's own pre-roll and VAD see the onset.
+"""
+import logging
+from collections import deque
+from typing import Callable, Deque, List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PCMChunk = Union[bytes, memoryview]
+INT16_FULL_SCALE_ENERGY = 32768.0 ** 2
+
+
+class SilenceGate:
+    """Per-connection energy/ZCR gate with hysteresis, hangover and pre-roll."""
+
+    def __init__(
+            self,
+            sample_rate: int = 48000,
+            open_dbfs: float = -48.0,
+            close_dbfs: float = -54.0,
+            fricative_dbfs: float = -58.0,
+            fricative_zcr: float = 0.3,
+            hangover_s: float = 1.0,
+            preroll_s: float = 0.3,
+            hold_open: Optional[Callable[[], bool]] = None,
+        ) -> None:
+        """
+        Initializes the SilenceGate.
+
+        Args:
+            sample_rate: Sample rate of the incoming int16 audio.
+            open_dbfs: RMS level (dB full scale) that opens a closed gate.
+            close_dbfs: RMS level below which an open gate counts a chunk as silent.
+            fricative_dbfs: Lowest RMS level at which a high-ZCR chunk still counts as speech.
+            fricative_zcr: Zero-crossing rate (crossings per sample) for that rule.
+            hangover_s: Time the gate stays open after the last speech-like chunk.
+            preroll_s: Amount of dropped audio released when the gate opens.
+            hold_open: Optional callable; while it returns True the gate does not
+                       close (e.g. the recorder is still waiting for end of speech).
+                       Only evaluated once the hangover has expired.
+        """
+        self.sample_rate = sample_rate
+        self.open_dbfs = open_dbfs
+        self.close_dbfs = close_dbfs
+        self.fricative_dbfs = fricative_dbfs
+        self.fricative_zcr = fricative_zcr
+        self.hangover_samples = int(hangover_s * sample_rate)
+        self.preroll_samples = int(preroll_s * sample_rate)
+        self.hold_open = hold_open
+
+        self.is_open: bool = False
+        self._silent_samples: int = 0 # Samples since the last speech-like chunk (while open)
+        self._preroll: Deque[PCMChunk] = deque()
+        self._preroll_len: int = 0
+
+        # Counters
+        self.chunks_total: int = 0
+        self.chunks_skipped: int = 0
+        self.samples_skipped: int = 0
+        self.openings: int = 0
+
+    def _is_speech_like(self, samples: np.ndarray) -> bool:
+        as_float = samples.astype(np.float32)
+        energy = float(np.dot(as_float, as_float)) / samples.size
+        level_dbfs = 10.0 * np.log10(energy / INT16_FULL_SCALE_ENERGY + 1e-12)
+        threshold = self.close_dbfs if self.is_open else self.open_dbfs
+        if level_dbfs >= threshold:
+            return True
+        if level_dbfs < self.fricative_dbfs:
+            return False
+        # Quiet but possibly an unvoiced onset: check the zero-crossing rate
+        signs = np.signbit(samples)
+        zcr = np.count_nonzero(signs[1:] != signs[:-1]) / (samples.size - 1)
+        return zcr >= self.fricative_zcr
+
+    def process(self, pcm: PCMChunk) -> List[PCMChunk]:
+        """
+        Runs one chunk through the gate.
+
+        Args:
+            pcm: Raw int16 audio (bytes or a view of the received message).
+
+        Returns:
+            The chunks to pass on, oldest first: empty while the gate is closed,
+            the pre-roll followed by `pcm` when it opens, otherwise `[pcm]`.
+        """
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        self.chunks_total += 1
+        if samples.size < 2:
+            return [pcm] if self.is_open else []
+
+        if self._is_speech_like(samples):
+            self._silent_samples = 0
+            if self.is_open:
+                return [pcm]
+            self.is_open = True
+            self.openings += 1
+            released = list(self._preroll)
+            self.chunks_skipped -= len(released) # Pre-roll turned out not to be skipped
+            self.samples_skipped -= self._preroll_len
+            self._preroll.clear()
+            self._preroll_len = 0
+            released.append(pcm)
+            logger.debug(f"👂🚪 Silence gate opened (pre-roll {len(released) - 1} chunks).")
+            return released
+
+        if self.is_open:
+            self._silent_samples += samples.size
+            if self._silent_samples < self.hangover_samples or (self.hold_open and self.hold_open()):
+                return [pcm]
+            self.is_open = False
+            logger.debug(f"👂🚪 Silence gate closed after {self._silent_samples / self.sample_rate:.2f}s of silence.")
+
+        self.chunks_skipped += 1
+        self.samples_skipped += samples.size
+        self._preroll.append(pcm)
+        self._preroll_len += samples.size
+        while self._preroll and self._preroll_len - len(self._preroll[0]) // 2 >= self.preroll_samples:
+            self._preroll_len -= len(self._preroll.popleft()) // 2
+        return []
+
+    def skipped_seconds(self) -> float:
+        """Returns the amount of audio dropped so far, in seconds."""
+        return self.samples_skipped / self.sample_rate
+
+    def summary(self) -> str:
+        """Returns the gate counters as a one-line string."""
+        ratio = self.chunks_skipped / self.chunks_total * 100 if self.chunks_total else 0.0
+        return (f"{self.chunks_skipped}/{self.chunks_total} chunks skipped ({ratio:.0f}%, "
+                f"{self.skipped_seconds():.1f}s), opened {self.openings}x")
@@ -3,7 +3,7 @@ from typing import Optional, Callable
 import threading
 import logging
 import time
-from queue import Queue, Empty
+from queue import Queue, Empty, Full
 import sys
 import uuid
 
@@ -14,6 +14,9 @@ from text_context import TextContext
 from llm_module import LLM
 from bedrock_agent_llm import BedrockAgentLLM
 from colors import Colors
+from async_bridge import ThreadToAsyncChannel
+from prerendered_audio import PrerenderedUtterances
+from timer_scheduler import get_timer_scheduler
 
 # (Logging setup)
 logger = logging.getLogger(__name__)
@@ -65,6 +68,11 @@ class PipelineRequest:
         self.data = data
         self.timestamp = time.time()
 
+# Upper bound of buffered TTS chunks per generation. When the client-side sender
+# falls this far behind, synthesis blocks instead of buffering without limit.
+AUDIO_CHUNK_CHANNEL_SIZE = 512
+
+
 class RunningGeneration:
     """
     Holds the state and resources for a single, ongoing text-to-speech generation process.
@@ -73,12 +81,15 @@ class RunningGeneration:
     the status of LLM and TTS stages (quick and final), threading events for synchronization,
     queues for audio chunks, and text buffers for partial/complete answers.
     """
-    def __init__(self, id: int):
+    def __init__(self, id: int, on_audio_change: Optional[Callable[[], None]] = None):
         """
         Initializes a RunningGeneration state object.
 
         Args:
             id: A unique identifier for this generation attempt.
+            on_audio_change: Optional callback invoked (from the TTS threads) whenever
+                             an audio chunk is put into `audio_chunks` or the
+                             channel is closed.
         """
         self.id: int = id # Store the generation ID
         self.text: Optional[str] = None
@@ -94,9 +105,11 @@ class RunningGeneration:
         self.quick_answer_first_chunk_ready: bool = False
         self.quick_answer_overhang: str = "" # This is the part of the text that was not used in the context
         self.tts_quick_started: bool = False
+        self.prerendered_played: Optional[str] = None # Name of a pre-rendered utterance queued ahead of the answer
 
         self.tts_quick_allowed_event = threading.Event()
-        self.audio_chunks = Queue()
+        # Closed once no more audio will be produced (synthesis done or aborted)
+        self.audio_chunks = ThreadToAsyncChannel(AUDIO_CHUNK_CHANNEL_SIZE, on_change=on_audio_change)
         self.audio_quick_finished: bool = False
         self.audio_quick_aborted: bool = False
         self.tts_quick_finished_event = threading.Event()
@@ -139,6 +152,7 @@ class SpeechPipelineManager:
             shared_llm: Optional[LLM] = None,
             shared_text_similarity: Optional[TextSimilarity] = None,
             shared_text_context: Optional[TextContext] = None,
+            prerendered: Optional[PrerenderedUtterances] = None,
         ):
         """
         Initializes the SpeechPipelineManager.
@@ -156,6 +170,7 @@ class SpeechPipelineManager:
             bedrock_agent_id: Bedrock Agent ID (required if llm_provider="bedrock").
             bedrock_agent_alias_id: Bedrock Agent Alias ID (required if llm_provider="bedrock").
             bedrock_region: AWS region for Bedrock (default: us-west-2).
+            prerendered: Utterances rendered at startup, playable via `play_prerendered`.
         """
         self.tts_engine = tts_engine
         self.llm_provider = llm_provider
@@ -184,6 +199,9 @@ class SpeechPipelineManager:
                 skip_prewarm=skip_prewarm
             )
         self.audio.on_first_audio_chunk_synthesize = self.on_first_audio_chunk_synthesize
+        self.prerendered = prerendered
+        # Orders pre-rendered audio before the quick answer's first synthesized chunk
+        self.audio_head_lock = threading.Lock()
         
         # NEW: Use shared utility classes if provided
         if shared_text_similarity is not None:
@@ -281,12 +299,30 @@ class SpeechPipelineManager:
         self.tts_final_inference_thread.start()
 
         self.on_partial_assistant_text: Optional[Callable[[str], None]] = None
+        # Called from any thread whenever generation state the audio sender waits on changes
+        self.on_state_change: Optional[Callable[[], None]] = None
+        # Wakes the final TTS worker when the state it waits on changes
+        self.state_changed_event = threading.Event()
 
         self.full_output_pipeline_latency = self.llm_inference_time + self.audio.tts_inference_time
         logger.info(f"🗣️⏱️ Full output pipeline latency: {self.full_output_pipeline_latency:.2f}ms (LLM: {self.llm_inference_time:.2f}ms, TTS: {self.audio.tts_inference_time:.2f}ms)")
 
         logger.info("🗣️🚀 SpeechPipelineManager initialized and workers started.")
 
+    def _notify_state_change(self) -> None:
+        """Wakes the final TTS worker and the audio sender after a generation state change."""
+        self.state_changed_event.set()
+        self._notify_audio_sender()
+
+    def _notify_audio_sender(self) -> None:
+        """Invokes the `on_state_change` callback, if set, shielding workers from callback errors."""
+        callback = self.on_state_change
+        if callback:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"🗣️💥 Callback error in on_state_change: {e}")
+
     def is_valid_gen(self) -> bool:
         """
         Checks if there is a currently running generation that has not started aborting.
@@ -355,6 +391,7 @@ class SpeechPipelineManager:
         logger.info("🗣️🎶 First audio chunk synthesized. Setting TTS quick allowed event.")
         if self.running_generation:
             self.running_generation.quick_answer_first_chunk_ready = True
+            self._notify_state_change()
 
     def preprocess_chunk(self, chunk: str) -> str:
         """
@@ -643,6 +680,8 @@ class SpeechPipelineManager:
             if not current_gen or not current_gen.quick_answer:
                 logger.warning("🗣️👄❓ Quick TTS Worker: No valid generation or quick answer found after event.")
                 self.tts_quick_generation_active = False
+                if current_gen:
+                    current_gen.audio_chunks.close() # Nothing to speak; let the sender finish the cycle
                 continue # Go back to waiting
 
             # Double-check if this generation was aborted *just* before we got here
@@ -652,6 +691,8 @@ class SpeechPipelineManager:
                 current_gen.audio_quick_finished = True
                 self.tts_quick_generation_active = False
                 self.stop_tts_quick_finished_event.set()
+                current_gen.audio_chunks.close()
+                self._notify_state_change()
                 continue
 
             gen_id = current_gen.id
@@ -661,7 +702,8 @@ class SpeechPipelineManager:
             self.tts_quick_generation_active = True
             self.stop_tts_quick_finished_event.clear()
             current_gen.tts_quick_finished_event.clear() # Reset TTS finish marker for this attempt
-            current_gen.tts_quick_started = True
+            with self.audio_head_lock: # A pre-rendered utterance being queued goes first
+                current_gen.tts_quick_started = True
 
             # --- tts_quick_allowed_event Wait Logic ---
             # This event seems intended for external control/timing, but isn't set anywhere
@@ -725,6 +767,9 @@ class SpeechPipelineManager:
                     current_gen.tts_quick_finished_event.set() # Signal natural completion
 
                 current_gen.audio_quick_finished = True # Mark quick audio phase as done (even if aborted)
+                if current_gen.audio_quick_aborted or not current_gen.quick_answer_provided:
+                    current_gen.audio_chunks.close() # Final TTS won't run; this was the last audio
+                self._notify_state_change()
 
     def _tts_final_inference_worker(self):
         """
@@ -747,8 +792,11 @@ class SpeechPipelineManager:
         last_logged_gen_id = None
         last_log_time = 0
         while not self.shutdown_event.is_set():
+            # Sleep until the generation state changes (the timeout only re-checks shutdown).
+            # State is written before it is signaled, so reading it after clear() misses nothing.
+            self.state_changed_event.wait(timeout=1.0)
+            self.state_changed_event.clear()
             current_gen = self.running_generation
-            time.sleep(0.01) # Prevent tight spinning when idle
 
             # --- Wait for prerequisites ---
             if not current_gen: continue # No active generation
@@ -868,6 +916,8 @@ class SpeechPipelineManager:
                     current_gen.tts_final_finished_event.set() # Signal natural completion
 
                 current_gen.audio_final_finished = True # Mark final audio phase as done (even if aborted)
+                current_gen.audio_chunks.close() # Last audio of this generation
+                self._notify_state_change()
 
 
     # --- Processing Methods ---
@@ -914,8 +964,9 @@ class SpeechPipelineManager:
         self.abort_block_event.set() # Ensure block is released if check_abort didn't run/clear it
 
         # --- Create new generation object ---
-        self.running_generation = RunningGeneration(id=new_gen_id)
+        self.running_generation = RunningGeneration(id=new_gen_id, on_audio_change=self._notify_audio_sender)
         self.running_generation.text = txt
+        self._notify_state_change()
 
         try:
             logger.info(f"🗣️🧠🚀 [Gen {new_gen_id}] Calling LLM generate...")
@@ -983,6 +1034,8 @@ class SpeechPipelineManager:
             # --- Start Abort Process ---
             logger.info(f"🗣️🛑🚀 {current_gen_id_str} Abortion process starting...")
             current_gen_obj.abortion_started = True # Mark immediately
+            current_gen_obj.audio_chunks.close() # Release TTS threads blocked on a full channel
+            self._notify_state_change()
             self.abort_block_event.clear() # Block new requests *before* waiting
             self.abort_completed_event.clear() # Clear completion flag at start
             self.stop_everything_event.set() # General signal (might be unused by workers)
@@ -1091,6 +1144,7 @@ class SpeechPipelineManager:
             self.llm_answer_ready_event.clear()
 
             # --- Signal Completion ---
+            self._notify_state_change()
             logger.info(f"🗣️🛑✅ {current_gen_id_str} Abort processing complete. Setting completion event and releasing block.")
             self.abort_completed_event.set() # Signal that the abort process is fully done
             self.abort_block_event.set() # Release the block for the request processor
@@ -1110,6 +1164,63 @@ class SpeechPipelineManager:
         logger.info(f"🗣️📥 Queueing 'prepare' request for: '{txt[:50]}...'")
         self.requests_queue.put(PipelineRequest("prepare", txt))
 
+    def play_prerendered(self, name: str, gen_id: Optional[int] = None) -> bool:
+        """
+        Queues a pre-rendered utterance at the head of the running generation's audio.
+
+        Only plays before the quick answer's synthesis has started, and at most
+        one utterance per generation. Never blocks: the utterance is skipped if
+        the audio channel has no room for all of it, so this is safe to call
+        from timer callbacks.
+
+        Args:
+            name: Utterance name (see `prerendered_audio.DEFAULT_UTTERANCES`).
+            gen_id: Only play if this generation is still the running one.
+
+        Returns:
+            True if the utterance was queued.
+        """
+        utterance = self.prerendered.get(name) if self.prerendered else None
+        current_gen = self.running_generation
+        if utterance is None or current_gen is None or (gen_id is not None and current_gen.id != gen_id):
+            return False
+        chunks = list(utterance.chunks())
+        audio_chunks = current_gen.audio_chunks
+        with self.audio_head_lock:
+            if (current_gen.abortion_started or current_gen.tts_quick_started
+                    or current_gen.prerendered_played or audio_chunks.closed
+                    or 0 < audio_chunks.maxsize < audio_chunks.qsize() + len(chunks)):
+                return False
+            current_gen.prerendered_played = name
+            try:
+                for chunk in chunks:
+                    if not audio_chunks.put_nowait(chunk):
+                        break
+            except Full: # Only the sender drains the channel while we hold the head; room was checked
+                logger.warning(f"🗣️⚠️ [Gen {current_gen.id}] Audio channel filled up while queueing '{name}'")
+        logger.info(f"🗣️📼 [Gen {current_gen.id}] Playing pre-rendered '{name}' ({utterance.duration_s:.2f}s) while the answer is prepared")
+        current_gen.quick_answer_first_chunk_ready = True
+        self._notify_state_change()
+        return True
+
+    def schedule_prerendered(self, name: str, delay_s: float) -> None:
+        """
+        Plays a pre-rendered utterance if the running generation has no audio after `delay_s`.
+
+        Used as a filler at the end of the user's turn: if the LLM is still working
+        on its first sentence by then, "one moment" bridges the gap.
+        """
+        current_gen = self.running_generation
+        if not self.prerendered or current_gen is None:
+            return
+
+        def play_if_silent(gen_id: int) -> None:
+            generation = self.running_generation
+            if generation is not None and generation.id == gen_id and not generation.quick_answer_first_chunk_ready:
+                self.play_prerendered(name, gen_id)
+
+        get_timer_scheduler().call_later(delay_s, play_if_silent, current_gen.id)
+
     def finish_generation(self):
         """
         Public method to signal the end of user input or interaction.
@@ -1200,6 +1311,7 @@ class SpeechPipelineManager:
         logger.info("🗣️🔌🔔 Signaling events to wake up any waiting threads...")
         self.generator_ready_event.set()
         self.llm_answer_ready_event.set()
+        self.state_changed_event.set()
         # Also signal 'finished' and 'completion' events
         self.stop_llm_finished_event.set()
         self.stop_tts_quick_finished_event.set()
@@ -77,6 +77,134 @@ function initAudioContext() {
   }
 }
 
+// Binary TTS frames: 12-byte big-endian header, then the payload.
+// [version u8][codec u8][flags u16][generation id u32][sequence u32]
+const TTS_FRAME_HEADER_BYTES = 12;
+const TTS_CODEC_PCM16 = 0;
+const TTS_CODEC_OPUS = 1;
+const TTS_FLAG_GENERATION_END = 0x0002;
+const TTS_SAMPLE_RATE = 24000;
+const OPUS_FRAME_US = 20000;
+
+// Opus is decoded with WebCodecs; browsers without it stay on raw PCM frames
+let opusDecoder = null;
+let opusTimestamp = 0;
+let opusGeneration = null;
+let opusDownsampler = null;
+const DOWNSAMPLER_TAPS = 31;
+
+// Low-pass FIR (Hamming-windowed sinc) followed by decimation by an integer step.
+// Filter history and decimation phase carry across decoder frames.
+class Downsampler {
+  constructor(step) {
+    this.step = step;
+    const cutoff = 0.45 / step; // Just below the output Nyquist frequency, in cycles per input sample
+    const center = (DOWNSAMPLER_TAPS - 1) / 2;
+    this.coefficients = new Float32Array(DOWNSAMPLER_TAPS);
+    let sum = 0;
+    for (let n = 0; n < DOWNSAMPLER_TAPS; n++) {
+      const t = n - center;
+      const sinc = t === 0 ? 2 * cutoff : Math.sin(2 * Math.PI * cutoff * t) / (Math.PI * t);
+      const window = 0.54 - 0.46 * Math.cos((2 * Math.PI * n) / (DOWNSAMPLER_TAPS - 1));
+      this.coefficients[n] = sinc * window;
+      sum += this.coefficients[n];
+    }
+    for (let n = 0; n < DOWNSAMPLER_TAPS; n++) this.coefficients[n] /= sum;
+    this.history = new Float32Array(DOWNSAMPLER_TAPS - 1);
+    this.phase = 0;
+  }
+
+  process(input) {
+    const historyLength = this.history.length;
+    const samples = new Float32Array(historyLength + input.length);
+    samples.set(this.history);
+    samples.set(input, historyLength);
+    const output = new Float32Array(Math.max(0, Math.ceil((input.length - this.phase) / this.step)));
+    let i = this.phase;
+    for (let j = 0; i < input.length; i += this.step, j++) {
+      let acc = 0;
+      const newest = i + historyLength;
+      for (let k = 0; k < DOWNSAMPLER_TAPS; k++) acc += this.coefficients[k] * samples[newest - k];
+      output[j] = acc;
+    }
+    this.phase = i - input.length;
+    this.history = samples.slice(samples.length - historyLength);
+    return output;
+  }
+}
+
+function resetOpusStream(generation) {
+  // Each generation is a new Opus stream: timestamps restart and filter state is dropped
+  opusGeneration = generation;
+  opusTimestamp = 0;
+  opusDownsampler = null;
+}
+
+function createOpusDecoder() {
+  if (!('AudioDecoder' in window)) return null;
+  const decoder = new AudioDecoder({
+    output: (audioData) => {
+      let floats = new Float32Array(audioData.numberOfFrames);
+      audioData.copyTo(floats, { planeIndex: 0, format: 'f32-planar' });
+      // Hand the worklet the same 24kHz int16 stream the PCM path delivers
+      const step = Math.max(1, Math.round(audioData.sampleRate / TTS_SAMPLE_RATE));
+      audioData.close();
+      if (step > 1) {
+        if (!opusDownsampler || opusDownsampler.step !== step) opusDownsampler = new Downsampler(step);
+        floats = opusDownsampler.process(floats);
+      }
+      const int16Data = new Int16Array(floats.length);
+      for (let i = 0; i < floats.length; i++) {
+        int16Data[i] = Math.max(-32768, Math.min(32767, Math.round(floats[i] * 32768)));
+      }
+      if (ttsWorkletNode && !ignoreIncomingTTS) ttsWorkletNode.port.postMessage(int16Data);
+    },
+    error: (e) => console.error('Opus decoder error:', e),
+  });
+  decoder.configure({ codec: 'opus', sampleRate: TTS_SAMPLE_RATE, numberOfChannels: 1 });
+  return decoder;
+}
+
+function decodeOpusPayload(buffer, offset) {
+  // Payload: sequence of [uint16 big-endian length][Opus packet]
+  const view = new DataView(buffer);
+  while (offset + 2 <= buffer.byteLength) {
+    const length = view.getUint16(offset);
+    offset += 2;
+    opusDecoder.decode(new EncodedAudioChunk({
+      type: 'key',
+      timestamp: opusTimestamp,
+      data: new Uint8Array(buffer, offset, length),
+    }));
+    opusTimestamp += OPUS_FRAME_US;
+    offset += length;
+  }
+}
+
+function handleBinaryTTSFrame(buffer) {
+  if (buffer.byteLength < TTS_FRAME_HEADER_BYTES) return;
+  const header = new DataView(buffer, 0, TTS_FRAME_HEADER_BYTES);
+  const codec = header.getUint8(1);
+  const flags = header.getUint16(2);
+  const generation = header.getUint32(4);
+  if (flags & TTS_FLAG_GENERATION_END) {
+    if (generation === opusGeneration) resetOpusStream(null);
+    return;
+  }
+  if (ignoreIncomingTTS) return;
+  if (!ttsWorkletNode) {
+    console.warn('No ttsWorkletNode when binary tts frame arrived');
+    return;
+  }
+  if (codec === TTS_CODEC_OPUS && opusDecoder) {
+    if (generation !== opusGeneration) resetOpusStream(generation);
+    decodeOpusPayload(buffer, TTS_FRAME_HEADER_BYTES);
+  } else if (codec === TTS_CODEC_PCM16) {
+    // Header length is even, so the PCM payload can be viewed in place
+    ttsWorkletNode.port.postMessage(new Int16Array(buffer, TTS_FRAME_HEADER_BYTES));
+  }
+}
+
 function base64ToInt16Array(b64) {
   const raw = atob(b64);
   const buf = new ArrayBuffer(raw.length);
@@ -160,6 +288,11 @@ function cleanupAudio() {
     ttsWorkletNode.disconnect();
     ttsWorkletNode = null;
   }
+  if (opusDecoder && opusDecoder.state !== 'closed') {
+    opusDecoder.close();
+  }
+  opusDecoder = null;
+  resetOpusStream(null);
   if (audioContext) {
     audioContext.close();
     audioContext = null;
@@ -288,16 +421,22 @@ document.getElementById('startBtn').onclick = async () => {
 
   const wsProto = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
   socket = new WebSocket(`${wsProto}//${location.host}/ws`);
+  socket.binaryType = 'arraybuffer';
 
   socket.onopen = async () => {
     statusDiv.textContent = 'Connected. Activating mic and TTS…';
+    // Ask for binary TTS frames instead of base64 JSON, Opus-encoded if we can decode it
+    opusDecoder = createOpusDecoder();
+    socket.send(JSON.stringify({ type: 'set_tts_transport', transport: 'binary', codec: opusDecoder ? 'opus' : 'pcm' }));
     await startRawPcmCapture();
     await setupTTSPlayback();
     speedSlider.disabled = false;
   };
 
   socket.onmessage = (evt) => {
-    if (typeof evt.data === 'string') {
+    if (evt.data instanceof ArrayBuffer) {
+      handleBinaryTTSFrame(evt.data);
+    } else if (typeof evt.data === 'string') {
       try {
         const msg = JSON.parse(evt.data);
         handleJSONMessage(msg);
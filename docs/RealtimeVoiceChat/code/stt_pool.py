@@ -0,0 +1,517 @@
+"""
+Speech-to-text worker pool: Whisper in N processes, sessions pinned to workers.
+
+`MultiplexedSTTService` batches sessions onto one set of models in the server
+process, so a long final transcription still holds up everyone else and the
+box's other cores sit idle. `STTWorkerPool` offers the same session interface
+(`open_session`, `submit`, `dispatch`, ...) backed by worker processes:
+
+- Each worker process loads `WhisperBatchTranscriber` once and micro-batches
+  the requests it receives, finals before realtime partials.
+- Sessions are pinned to a worker by consistent hashing (`ConsistentHashRing`),
+  so adding or removing a worker only moves the sessions on its arcs. When the
+  pinned worker is full, the session walks the ring to the next one with room.
+- Audio crosses the process boundary through a shared-memory segment per
+  request; only the segment name and sample count are pickled.
+- Admission control: when every worker is at `max_sessions_per_worker`, new
+  sessions are rejected with `STTCapacityError` or wait (``queue`` mode) for a
+  slot up to `admission_timeout` seconds.
+- A watchdog thread checks worker liveness every `WORKER_CHECK_INTERVAL_S`.
+  When a worker dies, its unanswered requests fail and its sessions move to the
+  next live worker with room on the ring (or fail their requests if none has).
+
+The per-session VAD and recorder surface is the unchanged `STTSessionStream`.
+"""
+import bisect
+import hashlib
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from stt_service import (
+    EVENT_THREADS,
+    INT16_MAX_ABS_VALUE,
+    RealtimeDecodeStats,
+    SessionEventDispatcher,
+    SpeculationStats,
+    STTSessionStream,
+    WhisperBatchTranscriber,
+)
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_MODES: Tuple[str, ...] = ("queue", "reject")
+WORKER_CHECK_INTERVAL_S: float = 1.0 # Watchdog period for dead worker processes
+
+
+class STTCapacityError(RuntimeError):
+    """Raised by `STTWorkerPool.open_session` when no worker can take another session."""
+
+
+class ConsistentHashRing:
+    """Maps keys to nodes on a hash ring with virtual nodes."""
+
+    def __init__(self, nodes: List[int], replicas: int = 64) -> None:
+        """
+        Builds the ring.
+
+        Args:
+            nodes: Node identifiers (worker indices).
+            replicas: Virtual nodes per node; more gives a more even spread.
+        """
+        self.replicas = replicas
+        self._points: List[Tuple[int, int]] = sorted(
+            (self._hash(f"worker-{node}#{replica}"), node) for node in nodes for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in self._points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def preference(self, key: str) -> List[int]:
+        """Returns every node once, in ring order starting at the key's position."""
+        start = bisect.bisect(self._hashes, self._hash(key))
+        order: List[int] = []
+        for i in range(len(self._points)):
+            node = self._points[(start + i) % len(self._points)][1]
+            if node not in order:
+                order.append(node)
+        return order
+
+
+# --------------------------------------------------------------------
+# Worker process
+# --------------------------------------------------------------------
+def _read_segment(name: str, samples: int) -> np.ndarray:
+    """Copies a request's int16 audio out of its segment as normalized float32."""
+    segment = shared_memory.SharedMemory(name=name)
+    try:
+        view = np.ndarray((samples,), dtype=np.int16, buffer=segment.buf)
+        audio = view.astype(np.float32) / INT16_MAX_ABS_VALUE
+        del view # Release the buffer export before closing
+    finally:
+        segment.close()
+    return audio
+
+
+def _worker_main(
+        index: int,
+        config: Dict[str, Any],
+        max_batch: int,
+        window_s: float,
+        requests: "multiprocessing.Queue",
+        results: "multiprocessing.Queue",
+    ) -> None:
+    """Worker process entry point: loads the models, then serves batches until it receives None."""
+    language = config.get("language") or None
+    device = config.get("device", "auto")
+    compute_type = config.get("compute_type", "default")
+    model_name = config.get("model", "medium.en")
+    final_model = WhisperBatchTranscriber(model_name, language, device, compute_type)
+    realtime_name = config.get("realtime_model_type", model_name)
+    if config.get("use_main_model_for_realtime") or realtime_name == model_name:
+        realtime_model = final_model
+    else:
+        realtime_model = WhisperBatchTranscriber(realtime_name, language, device, compute_type)
+    results.put(("ready", index, None))
+
+    stopping = False
+    while not stopping:
+        item = requests.get()
+        if item is None:
+            break
+        batch = [item]
+        deadline = time.monotonic() + window_s
+        while len(batch) < max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+
+        # Finals first: they gate the next LLM turn, partials only refresh the UI
+        for final in (True, False):
+            group = [request for request in batch if request[3] == final]
+            if not group:
+                continue
+            if final:
+                model, beam_size, prompt = final_model, config.get("beam_size", 1), config.get("initial_prompt")
+            else:
+                model, beam_size, prompt = realtime_model, config.get("beam_size_realtime", 1), config.get("initial_prompt_realtime")
+            start = time.perf_counter()
+            try:
+                texts = model.transcribe([_read_segment(name, samples) for _, name, samples, _ in group],
+                                         beam_size=beam_size, initial_prompt=prompt)
+            except Exception as e:
+                for request_id, _, _, _ in group:
+                    results.put((request_id, None, f"{type(e).__name__}: {e}"))
+                continue
+            elapsed = time.perf_counter() - start
+            for (request_id, _, _, _), text in zip(group, texts):
+                results.put((request_id, text, elapsed / len(group)))
+
+
+# --------------------------------------------------------------------
+# Pool (server process)
+# --------------------------------------------------------------------
+class _Worker:
+    __slots__ = ("index", "process", "requests", "sessions", "pending", "finals", "realtime", "inference_s", "alive")
+
+    def __init__(self, index: int, process: multiprocessing.Process, requests: "multiprocessing.Queue") -> None:
+        self.index = index
+        self.process = process
+        self.requests = requests
+        self.sessions: int = 0
+        self.pending: int = 0 # Requests sent and not yet answered
+        self.finals: int = 0
+        self.realtime: int = 0
+        self.inference_s: float = 0.0
+        self.alive: bool = True
+
+
+class STTWorkerPool:
+    """Whisper worker processes behind the `MultiplexedSTTService` session interface."""
+
+    def __init__(
+            self,
+            recorder_config: Dict[str, Any],
+            workers: int = 2,
+            max_sessions_per_worker: int = 8,
+            admission: str = "queue",
+            admission_timeout: float = 10.0,
+            max_batch: int = 8,
+            window_ms: float = 10.0,
+            speculative_final: bool = False,
+            partial_tail_s: float = 0.0,
+            event_threads: int = EVENT_THREADS,
+            startup_timeout: float = 600.0,
+        ) -> None:
+        """
+        Starts the worker processes and waits until each has loaded its models.
+
+        Args:
+            recorder_config: Recorder-style configuration (see `MultiplexedSTTService`).
+            workers: Number of worker processes (one model copy each).
+            max_sessions_per_worker: Sessions a worker accepts before it counts as saturated.
+            admission: "queue" (wait for a free slot) or "reject" when all workers are saturated.
+            admission_timeout: Longest wait for a slot in "queue" mode, in seconds.
+            max_batch: Maximum number of requests per forward pass in a worker.
+            window_ms: How long a worker waits for more requests after the first one of a batch.
+            speculative_final: Start final transcriptions when a session goes "hot"
+                               (see `STTSessionStream.speculate_final`).
+            partial_tail_s: Incremental partials (see `MultiplexedSTTService`); 0 disables.
+            event_threads: Threads running session callbacks (see `SessionEventDispatcher`).
+            startup_timeout: Longest wait for all workers to load their models, in seconds.
+        """
+        if admission not in ADMISSION_MODES:
+            raise ValueError(f"Unknown admission mode '{admission}', expected one of {ADMISSION_MODES}")
+        self.config = dict(recorder_config)
+        self.max_sessions_per_worker = max_sessions_per_worker
+        self.admission = admission
+        self.admission_timeout = admission_timeout
+        self.speculative_final = speculative_final
+        self.speculation = SpeculationStats()
+        self.partial_tail_s = partial_tail_s
+        self.realtime_stats = RealtimeDecodeStats()
+
+        # Spawn, not fork: the server process already runs model and I/O threads
+        context = multiprocessing.get_context("spawn")
+        self._results: "multiprocessing.Queue" = context.Queue()
+        self._workers: List[_Worker] = []
+        logger.info(f"🎙️🧩 Starting {workers} STT worker processes "
+                    f"(model '{self.config.get('model', 'medium.en')}', ≤{max_sessions_per_worker} sessions each)")
+        for index in range(workers):
+            requests = context.Queue()
+            process = context.Process(
+                target=_worker_main,
+                args=(index, self.config, max_batch, window_ms / 1000.0, requests, self._results),
+                name=f"STTWorker-{index}",
+                daemon=True,
+            )
+            process.start()
+            self._workers.append(_Worker(index, process, requests))
+        self._ring = ConsistentHashRing([worker.index for worker in self._workers])
+
+        self._await_ready(startup_timeout)
+
+        self._lock = threading.Condition() # Guards sessions, assignments and pending requests
+        self._assignments: Dict[str, _Worker] = {}
+        self._sessions: Dict[str, STTSessionStream] = {}
+        self._pending: Dict[int, Tuple[Future, Optional[shared_memory.SharedMemory], _Worker, bool]] = {}
+        self._request_ids = itertools.count()
+        self._outbox: "queue.Queue[Optional[Tuple[int, List[bytes], bool, _Worker]]]" = queue.Queue()
+        self._stopped: bool = False
+        self._events = SessionEventDispatcher(event_threads)
+
+        # Statistics
+        self.rejected: int = 0
+        self.queued: int = 0 # Sessions that had to wait for a slot
+        self.max_segment_bytes: int = 0
+
+        self._sender = threading.Thread(target=self._send_requests, name="STTPoolSender", daemon=True)
+        self._sender.start()
+        self._receiver = threading.Thread(target=self._receive_results, name="STTPoolResults", daemon=True)
+        self._receiver.start()
+        self._watchdog_stop = threading.Event()
+        self._watchdog = threading.Thread(target=self._watch_workers, name="STTPoolWatchdog", daemon=True)
+        self._watchdog.start()
+
+    def _await_ready(self, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        ready = 0
+        while ready < len(self._workers):
+            try:
+                kind, index, _ = self._results.get(timeout=max(0.1, deadline - time.monotonic()))
+            except queue.Empty:
+                dead = [w.index for w in self._workers if not w.process.is_alive()]
+                if dead or time.monotonic() >= deadline:
+                    self._terminate_workers()
+                    raise RuntimeError(f"STT workers failed to start (dead: {dead or 'none'}, {ready} ready)")
+                continue
+            if kind == "ready":
+                ready += 1
+                logger.info(f"🎙️✅ STT worker {index} ready ({ready}/{len(self._workers)})")
+
+    # --- Sessions ---
+
+    def _pick_worker(self, session_id: str) -> Optional[_Worker]:
+        """Returns the first live worker with room along the session's ring order."""
+        for index in self._ring.preference(session_id):
+            worker = self._workers[index]
+            if worker.alive and worker.sessions < self.max_sessions_per_worker:
+                return worker
+        return None
+
+    def open_session(self, session_id: str) -> STTSessionStream:
+        """
+        Assigns a session to a worker and creates its stream.
+
+        In "queue" admission mode this blocks until a slot frees up, so call it
+        off the event loop.
+
+        Raises:
+            STTCapacityError: Every worker is saturated (after waiting, in "queue" mode).
+        """
+        deadline = time.monotonic() + self.admission_timeout
+        with self._lock:
+            worker = self._pick_worker(session_id)
+            if worker is None and self.admission == "queue" and not self._stopped:
+                self.queued += 1
+                logger.info(f"🎙️⏳ STT session {session_id} waiting for a worker slot")
+                while worker is None and not self._stopped:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._lock.wait(remaining)
+                    worker = self._pick_worker(session_id)
+            if worker is None:
+                self.rejected += 1
+                raise STTCapacityError(f"All {len(self._workers)} STT workers are saturated "
+                                       f"({self.max_sessions_per_worker} sessions each)")
+            worker.sessions += 1
+            self._assignments[session_id] = worker
+            session = STTSessionStream(self, session_id, self.config)
+            self._sessions[session_id] = session
+        logger.info(f"🎙️➕ STT session {session_id} opened on worker {worker.index} ({worker.sessions} there)")
+        return session
+
+    def close_session(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            worker = self._assignments.pop(session_id, None)
+            if worker is not None:
+                worker.sessions -= 1
+                self._lock.notify() # One waiting session can take the slot
+        if worker is not None:
+            logger.info(f"🎙️➖ STT session {session_id} closed on worker {worker.index} ({worker.sessions} left there)")
+
+    # --- Requests ---
+
+    def submit(self, session_id: str, frames: List[bytes], final: bool) -> "Future[str]":
+        """
+        Queues one clip for transcription on the session's worker.
+
+        Args:
+            session_id: Requesting session.
+            frames: int16 PCM frames of the clip; the list must not be mutated afterwards.
+            final: True for a final transcription (prioritized), False for a realtime partial.
+
+        Returns:
+            A future resolving to the transcribed text.
+        """
+        future: "Future[str]" = Future()
+        with self._lock:
+            worker = self._assignments.get(session_id)
+            if self._stopped or worker is None or not worker.alive:
+                future.set_exception(RuntimeError(f"No STT worker for session {session_id}"))
+                return future
+            request_id = next(self._request_ids)
+            self._pending[request_id] = (future, None, worker, final) # Segment filled in by the sender
+            worker.pending += 1
+        self._outbox.put((request_id, frames, final, worker))
+        return future
+
+    def dispatch(self, session_id: str, callback: Callable[..., Any], *args: Any) -> None:
+        """Runs a session callback on the session's event thread (in submission order)."""
+        self._events.dispatch(session_id, callback, *args)
+
+    def _send_requests(self) -> None:
+        """Copies clips into shared memory and hands them to the workers (off the caller's thread)."""
+        while True:
+            item = self._outbox.get()
+            if item is None:
+                break
+            request_id, frames, final, worker = item
+            pcm = b"".join(frames)
+            try:
+                segment = shared_memory.SharedMemory(create=True, size=max(2, len(pcm)))
+            except OSError as e:
+                self._fail(request_id, e)
+                continue
+            segment.buf[:len(pcm)] = pcm
+            self.max_segment_bytes = max(self.max_segment_bytes, len(pcm))
+            with self._lock:
+                entry = self._pending.get(request_id)
+                if entry is not None:
+                    self._pending[request_id] = (entry[0], segment, worker, final)
+            if entry is None: # Failed while we were copying (worker died)
+                self._release(segment)
+                continue
+            worker.requests.put((request_id, segment.name, len(pcm) // 2, final))
+
+    def _receive_results(self) -> None:
+        """Resolves futures from worker replies."""
+        while not self._stopped:
+            try:
+                request_id, text, detail = self._results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                entry = self._pending.pop(request_id, None)
+                if entry is not None:
+                    entry[2].pending -= 1
+            if entry is None:
+                continue
+            future, segment, worker, final = entry
+            if segment is not None:
+                self._release(segment)
+            if text is None:
+                future.set_exception(RuntimeError(f"STT worker {worker.index}: {detail}"))
+                continue
+            worker.inference_s += detail
+            if final:
+                worker.finals += 1
+            else:
+                worker.realtime += 1
+                self.realtime_stats.record(model_s=detail)
+            future.set_result(text)
+
+    def _watch_workers(self) -> None:
+        """Checks worker liveness on its own timer, independent of result traffic."""
+        while not self._watchdog_stop.wait(WORKER_CHECK_INTERVAL_S):
+            self._check_workers()
+
+    def _check_workers(self) -> None:
+        if self._stopped: # Workers exiting on shutdown are expected
+            return
+        for worker in self._workers:
+            if worker.alive and not worker.process.is_alive():
+                self._on_worker_died(worker)
+
+    def _on_worker_died(self, worker: _Worker) -> None:
+        """Fails the dead worker's requests and moves its sessions along the ring."""
+        moved, orphaned = [], []
+        with self._lock:
+            worker.alive = False
+            lost = [request_id for request_id, entry in self._pending.items() if entry[2] is worker]
+            for session_id in [sid for sid, assigned in self._assignments.items() if assigned is worker]:
+                worker.sessions -= 1
+                replacement = self._pick_worker(session_id)
+                if replacement is None:
+                    del self._assignments[session_id] # Its requests now fail right away
+                    orphaned.append(session_id)
+                    continue
+                replacement.sessions += 1
+                self._assignments[session_id] = replacement
+                moved.append(f"{session_id}→w{replacement.index}")
+        logger.error(f"🎙️💥 STT worker {worker.index} died (exit code {worker.process.exitcode}); "
+                     f"{len(lost)} requests failed, sessions moved: {', '.join(moved) or 'none'}"
+                     + (f", without a worker: {', '.join(orphaned)}" if orphaned else ""))
+        for request_id in lost:
+            self._fail(request_id, RuntimeError(f"STT worker {worker.index} died"))
+
+    def _fail(self, request_id: int, error: BaseException) -> None:
+        with self._lock:
+            entry = self._pending.pop(request_id, None)
+            if entry is not None:
+                entry[2].pending -= 1
+        if entry is None:
+            return
+        if entry[1] is not None:
+            self._release(entry[1])
+        entry[0].set_exception(error)
+
+    @staticmethod
+    def _release(segment: shared_memory.SharedMemory) -> None:
+        segment.close()
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+
+    # --- Lifecycle ---
+
+    def _terminate_workers(self) -> None:
+        for worker in self._workers:
+            if worker.process.is_alive():
+                worker.requests.put(None)
+        for worker in self._workers:
+            worker.process.join(timeout=5.0)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+    def shutdown(self) -> None:
+        """Stops the workers and threads; unanswered requests fail."""
+        with self._lock:
+            self._stopped = True
+            self._lock.notify_all() # Release sessions waiting for admission
+        self._watchdog_stop.set()
+        self._watchdog.join(timeout=2.0)
+        self._outbox.put(None)
+        self._sender.join(timeout=2.0)
+        self._terminate_workers()
+        self._receiver.join(timeout=2.0)
+        for request_id in list(self._pending):
+            self._fail(request_id, RuntimeError("STT worker pool shut down"))
+        self._events.stop()
+
+    def summary(self) -> str:
+        """Returns per-worker load statistics as a one-line string."""
+        parts = []
+        for worker in self._workers:
+            requests = worker.finals + worker.realtime
+            per_request_ms = worker.inference_s / requests * 1000 if requests else 0.0
+            parts.append(f"w{worker.index}{'' if worker.alive else ' (dead)'}: {worker.sessions} sessions, "
+                         f"{worker.finals} final + {worker.realtime} realtime, {per_request_ms:.1f}ms/request")
+        summary = (f"{'; '.join(parts)} | {self.queued} queued, {self.rejected} rejected, "
+                   f"largest clip {self.max_segment_bytes / 1024:.0f} KiB | realtime: {self.realtime_stats.summary()}")
+        if self.speculative_final:
+            summary += f" | speculative finals: {self.speculation.summary()}"
+        return summary
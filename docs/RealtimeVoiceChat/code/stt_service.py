@@ -0,0 +1,726 @@
+"""
+Multiplexed speech-to-text service: one set of Whisper models, many sessions.
+
+The legacy setup feeds every connection's audio into a single
+`AudioToTextRecorder`, so all sessions share one VAD state, one frame buffer
+and one set of callbacks. This service splits that apart:
+
+- Each session gets an `STTSessionStream` with its own WebRTC VAD, pre-roll,
+  frame buffer, silence timing and callbacks. It exposes the attributes and
+  methods `TranscriptionProcessor` uses on a recorder (`feed_audio`, `text`,
+  `frames`, `speech_end_silence_start`, `post_speech_silence_duration`,
+  `on_recording_start`, ...), so it can be passed in as the recorder.
+- All sessions submit transcription requests to one `MultiplexedSTTService`,
+  which owns the faster-whisper models (the realtime model is the main model
+  when both names match) and runs requests from different sessions in one
+  batched encoder/decoder pass. Final transcriptions take priority over
+  realtime (partial) ones.
+- Results are routed back to the requesting session. Session callbacks run
+  in order on one of a few event threads (chosen by session id), never on
+  the caller feeding audio.
+- Optionally, realtime partials are decoded incrementally: audio before a
+  pause is transcribed once and committed, and only the tail after the last
+  committed pause is re-decoded on each update (see `partial_tail_s`).
+- Optionally, a session starts its final transcription speculatively when
+  `TranscriptionProcessor` enters the "hot" state, and reuses the result at
+  the real end of the turn if no speech came in between.
+"""
+import logging
+import queue
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+import webrtcvad
+from faster_whisper import WhisperModel
+from faster_whisper.audio import pad_or_trim
+from faster_whisper.tokenizer import Tokenizer
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE: int = 16000
+INT16_MAX_ABS_VALUE: float = 32768.0
+VAD_FRAME_SAMPLES: int = 480 # 30 ms, one of the frame sizes WebRTC VAD accepts
+VAD_FRAME_BYTES: int = VAD_FRAME_SAMPLES * 2
+START_VOICED_FRAMES: int = 3 # Consecutive voiced frames (90 ms) that start a recording
+MAX_BATCH_SECONDS: float = 30.0 # Whisper's window; longer audio is transcribed on its own
+VAD_FRAME_SECONDS: float = VAD_FRAME_SAMPLES / SAMPLE_RATE
+COMMIT_PAUSE_FRAMES: int = 3 # Unvoiced frames (90 ms) that make a safe point to commit a partial prefix
+MIN_TAIL_SECONDS: float = 1.0 # Audio always left in the re-decoded tail, so fresh words keep context
+EVENT_THREADS: int = 4 # Callback threads per service; sessions are spread over them by id
+
+
+def frames_to_float32(frames: List[bytes]) -> np.ndarray:
+    """Joins int16 PCM frames into normalized float32 audio."""
+    return np.frombuffer(b"".join(frames), dtype=np.int16).astype(np.float32) / INT16_MAX_ABS_VALUE
+
+
+class WhisperBatchTranscriber:
+    """A faster-whisper model that transcribes several short clips in one pass."""
+
+    def __init__(
+            self,
+            model_name: str,
+            language: Optional[str] = "en",
+            device: str = "auto",
+            compute_type: str = "default",
+        ) -> None:
+        """
+        Loads the model.
+
+        Args:
+            model_name: faster-whisper model name or path (e.g. "medium.en").
+            language: Language code; None lets Whisper detect it (per clip, unbatched).
+            device: "cuda", "cpu" or "auto".
+            compute_type: CTranslate2 compute type (e.g. "float16", "int8").
+        """
+        self.model_name = model_name
+        self.language = language
+        self.model = WhisperModel(model_name, device=device, compute_type=compute_type)
+        self.tokenizer = Tokenizer(
+            self.model.hf_tokenizer,
+            self.model.model.is_multilingual,
+            task="transcribe",
+            language=language or "en",
+        )
+        self.max_samples = int(MAX_BATCH_SECONDS * SAMPLE_RATE)
+
+    def _prompt(self, initial_prompt: Optional[str]) -> List[int]:
+        prompt: List[int] = []
+        if initial_prompt:
+            prompt_tokens = self.tokenizer.encode(" " + initial_prompt.strip())
+            prompt = [self.tokenizer.sot_prev] + prompt_tokens[-(self.model.max_length // 2 - 1):]
+        return prompt + list(self.tokenizer.sot_sequence) + [self.tokenizer.no_timestamps]
+
+    def transcribe(self, audios: List[np.ndarray], beam_size: int = 1, initial_prompt: Optional[str] = None) -> List[str]:
+        """
+        Transcribes float32 16 kHz clips.
+
+        Clips up to 30 s are padded to Whisper's window and decoded together;
+        longer clips (and language detection) fall back to `WhisperModel.transcribe`.
+
+        Returns:
+            One text per clip, in order.
+        """
+        texts: List[Optional[str]] = [None] * len(audios)
+        batched = [i for i, audio in enumerate(audios) if audio.size <= self.max_samples and self.language]
+        for i in set(range(len(audios))) - set(batched):
+            segments, _ = self.model.transcribe(
+                audios[i], language=self.language, beam_size=beam_size, initial_prompt=initial_prompt
+            )
+            texts[i] = " ".join(segment.text.strip() for segment in segments)
+
+        if batched:
+            features = np.stack([pad_or_trim(self.model.feature_extractor(audios[i])) for i in batched])
+            encoder_output = self.model.encode(features)
+            prompt = self._prompt(initial_prompt)
+            results = self.model.model.generate(
+                encoder_output,
+                [prompt] * len(batched),
+                beam_size=beam_size,
+                max_length=self.model.max_length,
+                suppress_blank=True,
+                suppress_tokens=[-1],
+            )
+            for i, result in zip(batched, results):
+                texts[i] = self.tokenizer.decode(result.sequences_ids[0]).strip()
+        return texts # type: ignore[return-value]
+
+
+class SessionEventDispatcher:
+    """
+    Runs session callbacks on a small pool of daemon threads keyed by session id.
+
+    A session always maps to the same thread, so its callbacks run in
+    submission order, while a slow callback only delays the sessions sharing
+    its thread instead of every session of the service.
+    """
+
+    def __init__(self, threads: int = EVENT_THREADS, name: str = "STTEvents") -> None:
+        self._queues: List["queue.Queue[Optional[Tuple[Callable[..., Any], Tuple[Any, ...]]]]"] = [
+            queue.Queue() for _ in range(max(1, threads))
+        ]
+        self._threads = [
+            threading.Thread(target=self._run, args=(events,), name=f"{name}-{index}", daemon=True)
+            for index, events in enumerate(self._queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def dispatch(self, session_id: str, callback: Callable[..., Any], *args: Any) -> None:
+        self._queues[zlib.crc32(session_id.encode()) % len(self._queues)].put((callback, args))
+
+    def _run(self, events: "queue.Queue[Optional[Tuple[Callable[..., Any], Tuple[Any, ...]]]]") -> None:
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            callback, args = event
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.error(f"🎙️💥 STT session callback {getattr(callback, '__qualname__', callback)} failed: {e}", exc_info=True)
+
+    def stop(self) -> None:
+        for events in self._queues:
+            events.put(None)
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+
+
+class SpeculationStats:
+    """Counters for speculative final transcriptions, shared by a service's sessions."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started: int = 0
+        self.reused: int = 0
+        self.discarded: int = 0 # Speech resumed (or the session closed) before the turn ended
+        self.saved_s: float = 0.0 # Final-transcription latency avoided by reused speculations
+
+    def record(self, started: int = 0, reused: int = 0, discarded: int = 0, saved_s: float = 0.0) -> None:
+        with self._lock:
+            self.started += started
+            self.reused += reused
+            self.discarded += discarded
+            self.saved_s += saved_s
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of speculations whose result became the final transcription."""
+        return self.reused / self.started if self.started else 0.0
+
+    def summary(self) -> str:
+        """Returns the counters as a one-line string."""
+        saved_ms = self.saved_s / self.reused * 1000 if self.reused else 0.0
+        return (f"{self.hit_rate * 100:.0f}% hit rate ({self.reused} reused, {self.discarded} discarded "
+                f"of {self.started}), {saved_ms:.0f}ms saved per reused final")
+
+
+class RealtimeDecodeStats:
+    """Realtime (partial) transcription cost, shared by a service's sessions."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.model_s: float = 0.0 # Realtime model compute time
+        self.decoded_s: float = 0.0 # Audio seconds passed to the realtime model
+        self.utterance_s: float = 0.0 # Audio seconds of finished recordings
+        self.commits: int = 0 # Prefixes committed by incremental decoding
+
+    def record(self, model_s: float = 0.0, decoded_s: float = 0.0, utterance_s: float = 0.0, commits: int = 0) -> None:
+        with self._lock:
+            self.model_s += model_s
+            self.decoded_s += decoded_s
+            self.utterance_s += utterance_s
+            self.commits += commits
+
+    def summary(self) -> str:
+        """Returns realtime-model seconds per audio second and the re-decode factor."""
+        if not self.utterance_s:
+            return "no finished utterances"
+        return (f"{self.model_s / self.utterance_s:.3f} model s per audio s, "
+                f"{self.decoded_s / self.utterance_s:.1f}x audio re-decoded, {self.commits} commits")
+
+
+class _Speculation:
+    __slots__ = ("voiced_frames", "started_at", "done_at", "future")
+
+    def __init__(self, voiced_frames: int, future: "Future[str]") -> None:
+        self.voiced_frames = voiced_frames # Key: audio length up to the last voiced frame
+        self.started_at = time.monotonic()
+        self.done_at: Optional[float] = None
+        self.future = future
+        future.add_done_callback(self._mark_done) # Registered first, so it runs before later callbacks
+
+    def _mark_done(self, _: Future) -> None:
+        self.done_at = time.monotonic()
+
+
+class _Request:
+    __slots__ = ("session_id", "frames", "future")
+
+    def __init__(self, session_id: str, frames: List[bytes]) -> None:
+        self.session_id = session_id
+        self.frames = frames # Snapshot of the session's frame list; joined on the worker
+        self.future: "Future[str]" = Future()
+
+
+class MultiplexedSTTService:
+    """Shared Whisper models with cross-session micro-batching."""
+
+    def __init__(
+            self,
+            recorder_config: Dict[str, Any],
+            max_batch: int = 8,
+            window_ms: float = 10.0,
+            speculative_final: bool = False,
+            partial_tail_s: float = 0.0,
+            event_threads: int = EVENT_THREADS,
+        ) -> None:
+        """
+        Loads the models and starts the inference and event threads.
+
+        Args:
+            recorder_config: Recorder-style configuration (`DEFAULT_RECORDER_CONFIG`
+                             keys: model, realtime_model_type, language, beam sizes,
+                             prompts, VAD and timing parameters).
+            max_batch: Maximum number of requests per forward pass.
+            window_ms: How long to wait for more requests after the first one
+                       of a batch arrived.
+            speculative_final: Start final transcriptions when a session goes "hot"
+                               (see `STTSessionStream.speculate_final`).
+            partial_tail_s: Incremental partials: once the uncommitted audio exceeds this
+                            many seconds, the part before a pause is committed and no longer
+                            re-decoded. 0 re-decodes the whole utterance every time.
+            event_threads: Threads running session callbacks; a session always uses
+                           the same one (see `SessionEventDispatcher`).
+        """
+        self.config = dict(recorder_config)
+        self.max_batch = max_batch
+        self.window_s = window_ms / 1000.0
+        self.speculative_final = speculative_final
+        self.speculation = SpeculationStats()
+        self.partial_tail_s = partial_tail_s
+        self.realtime_stats = RealtimeDecodeStats()
+        language = self.config.get("language") or None
+        device = self.config.get("device", "auto")
+        compute_type = self.config.get("compute_type", "default")
+
+        model_name = self.config.get("model", "medium.en")
+        logger.info(f"🎙️🔌 Loading shared Whisper model '{model_name}' (batch ≤{max_batch}, window {window_ms:.0f}ms)")
+        self.final_model = WhisperBatchTranscriber(model_name, language, device, compute_type)
+        realtime_name = self.config.get("realtime_model_type", model_name)
+        if self.config.get("use_main_model_for_realtime") or realtime_name == model_name:
+            self.realtime_model = self.final_model # One copy in memory serves both
+        else:
+            logger.info(f"🎙️🔌 Loading shared realtime Whisper model '{realtime_name}'")
+            self.realtime_model = WhisperBatchTranscriber(realtime_name, language, device, compute_type)
+
+        self._finals: Deque[_Request] = deque()
+        self._realtime: Deque[_Request] = deque()
+        self._condition = threading.Condition()
+        self._stopped: bool = False
+        self._events = SessionEventDispatcher(event_threads)
+        self._sessions: Dict[str, "STTSessionStream"] = {}
+        self._sessions_lock = threading.Lock()
+
+        # Statistics
+        self.finals: int = 0
+        self.realtime: int = 0
+        self.batches: int = 0
+        self.max_batch_seen: int = 0
+        self.inference_s: float = 0.0
+
+        self._worker = threading.Thread(target=self._run, name="STTInference", daemon=True)
+        self._worker.start()
+
+    # --- Sessions ---
+
+    def open_session(self, session_id: str) -> "STTSessionStream":
+        """Creates the per-session stream to pass to `TranscriptionProcessor` as its recorder."""
+        session = STTSessionStream(self, session_id, self.config)
+        with self._sessions_lock:
+            self._sessions[session_id] = session
+        logger.info(f"🎙️➕ STT session {session_id} opened ({len(self._sessions)} active)")
+        return session
+
+    def close_session(self, session_id: str) -> None:
+        with self._sessions_lock:
+            self._sessions.pop(session_id, None)
+        logger.info(f"🎙️➖ STT session {session_id} closed ({len(self._sessions)} active)")
+
+    # --- Requests ---
+
+    def submit(self, session_id: str, frames: List[bytes], final: bool) -> "Future[str]":
+        """
+        Queues one clip for transcription.
+
+        Args:
+            session_id: Requesting session (for logging and routing).
+            frames: int16 PCM frames of the clip; the list must not be mutated afterwards.
+            final: True for a final transcription (main model, prioritized),
+                   False for a realtime partial (realtime model).
+
+        Returns:
+            A future resolving to the transcribed text.
+        """
+        request = _Request(session_id, frames)
+        with self._condition:
+            if self._stopped:
+                request.future.set_exception(RuntimeError("STT service shut down"))
+                return request.future
+            (self._finals if final else self._realtime).append(request)
+            self._condition.notify()
+        return request.future
+
+    def dispatch(self, session_id: str, callback: Callable[..., Any], *args: Any) -> None:
+        """Runs a session callback on the session's event thread (in submission order)."""
+        self._events.dispatch(session_id, callback, *args)
+
+    def _take_batch(self) -> Optional[Tuple[bool, List[_Request]]]:
+        """Waits for requests, gathers more for `window_s`, and returns (is_final, batch)."""
+        with self._condition:
+            while not (self._finals or self._realtime or self._stopped):
+                self._condition.wait()
+            if self._stopped:
+                return None
+            deadline = time.monotonic() + self.window_s
+            while len(self._finals) + len(self._realtime) < self.max_batch and not self._stopped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            final = bool(self._finals)
+            source = self._finals if final else self._realtime
+            batch = [source.popleft() for _ in range(min(self.max_batch, len(source)))]
+            return final, batch
+
+    def _run(self) -> None:
+        while True:
+            taken = self._take_batch()
+            if taken is None:
+                break
+            final, batch = taken
+            if final:
+                model = self.final_model
+                beam_size = self.config.get("beam_size", 1)
+                prompt = self.config.get("initial_prompt")
+            else:
+                model = self.realtime_model
+                beam_size = self.config.get("beam_size_realtime", 1)
+                prompt = self.config.get("initial_prompt_realtime")
+
+            start = time.perf_counter()
+            try:
+                texts = model.transcribe([frames_to_float32(r.frames) for r in batch], beam_size=beam_size, initial_prompt=prompt)
+            except Exception as e:
+                logger.error(f"🎙️💥 Whisper batch of {len(batch)} ({'final' if final else 'realtime'}) failed: {e}", exc_info=True)
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            elapsed = time.perf_counter() - start
+            self.inference_s += elapsed
+            self.batches += 1
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            if final:
+                self.finals += len(batch)
+            else:
+                self.realtime += len(batch)
+                self.realtime_stats.record(model_s=elapsed)
+            for request, text in zip(batch, texts):
+                request.future.set_result(text)
+
+        # Fail whatever is still queued so sessions don't hang
+        for request in list(self._finals) + list(self._realtime):
+            request.future.set_exception(RuntimeError("STT service shut down"))
+
+    def shutdown(self) -> None:
+        """Stops the inference and event threads."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._worker.join(timeout=5.0)
+        self._events.stop()
+
+    def summary(self) -> str:
+        """Returns batching statistics as a one-line string."""
+        requests = self.finals + self.realtime
+        avg = requests / self.batches if self.batches else 0.0
+        per_request_ms = self.inference_s / requests * 1000 if requests else 0.0
+        summary = (f"{self.finals} final + {self.realtime} realtime transcriptions in {self.batches} batches "
+                   f"(avg {avg:.1f}, max {self.max_batch_seen}), {per_request_ms:.1f}ms model time per request"
+                   f" | realtime: {self.realtime_stats.summary()}")
+        if self.speculative_final:
+            summary += f" | speculative finals: {self.speculation.summary()}"
+        return summary
+
+
+class STTSessionStream:
+    """
+    Per-session VAD, buffer and callback state on top of `MultiplexedSTTService`
+    (or `stt_pool.STTWorkerPool`, which provides the same session interface).
+
+    Implements the subset of the `AudioToTextRecorder` interface used by
+    `TranscriptionProcessor`. Audio is fed from one thread (the connection's
+    audio task); callbacks are delivered on the service's event thread.
+    """
+
+    def __init__(self, service: MultiplexedSTTService, session_id: str, config: Dict[str, Any]) -> None:
+        self.service = service
+        self.session_id = session_id
+
+        # Recorder-compatible surface (attributes read/written by TranscriptionProcessor)
+        self.on_realtime_transcription_update: Optional[Callable[[str], None]] = None
+        self.on_turn_detection_start: Optional[Callable[[], None]] = None
+        self.on_turn_detection_stop: Optional[Callable[[], None]] = None
+        self.on_recording_start: Optional[Callable[[], None]] = None
+        self.on_recording_stop: Optional[Callable[[], Any]] = None
+        self.post_speech_silence_duration: float = config.get("post_speech_silence_duration", 0.7)
+        self.min_length_of_recording: float = config.get("min_length_of_recording", 0.5)
+        self.realtime_processing_pause: float = config.get("realtime_processing_pause", 0.2)
+        self.enable_realtime_transcription: bool = config.get("enable_realtime_transcription", True)
+        self.use_wake_words: bool = False
+        self.speech_end_silence_start: float = 0.0
+        self.is_recording: bool = False
+        self.frames: List[bytes] = []
+        self.frames_lock = threading.Lock()
+        self._frame_voiced: List[bool] = [] # VAD result per frame of `frames` (pre-roll counts as voiced)
+
+        self._vad = webrtcvad.Vad(config.get("webrtc_sensitivity", 3))
+        self._pending = bytearray() # Incomplete VAD frame carried to the next chunk
+        preroll_frames = int(config.get("pre_recording_buffer_duration", 1.0) * SAMPLE_RATE / VAD_FRAME_SAMPLES)
+        self._preroll: Deque[bytes] = deque(maxlen=max(1, preroll_frames))
+        self._voiced_run: int = 0
+        self._recording_started_at: float = 0.0
+        self._last_realtime_at: float = 0.0
+        self._realtime_in_flight: bool = False
+        self._recording_index: int = 0 # Bumped per recording; late partial results of older ones are ignored
+        self._committed_frames: int = 0 # frames[:n] are transcribed into _committed_text (incremental partials)
+        self._committed_text: str = ""
+        self._voiced_frames: int = 0 # len(frames) after the last voiced frame of the recording
+        self._speculation: Optional[_Speculation] = None
+        self._speculation_lock = threading.Lock()
+        self._finals: "queue.Queue[Optional[Future]]" = queue.Queue()
+        self._closed: bool = False
+
+    # --- Audio input ---
+
+    def feed_audio(self, chunk: bytes, original_sample_rate: int = SAMPLE_RATE) -> None:
+        """Feeds 16 kHz int16 PCM; runs VAD and the recording state machine per 30 ms frame."""
+        if self._closed:
+            return
+        self._pending += chunk
+        frame_count = len(self._pending) // VAD_FRAME_BYTES
+        for i in range(frame_count):
+            self._process_frame(bytes(self._pending[i * VAD_FRAME_BYTES:(i + 1) * VAD_FRAME_BYTES]))
+        del self._pending[:frame_count * VAD_FRAME_BYTES]
+
+    def _process_frame(self, frame: bytes) -> None:
+        voiced = self._vad.is_speech(frame, SAMPLE_RATE)
+        if not self.is_recording:
+            self._preroll.append(frame)
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= START_VOICED_FRAMES:
+                self._start_recording()
+            return
+
+        with self.frames_lock:
+            self.frames.append(frame)
+            self._frame_voiced.append(voiced)
+            if voiced:
+                self._voiced_frames = len(self.frames)
+        now = time.time()
+        if voiced:
+            if self._speculation is not None:
+                self._discard_speculation() # New speech: the speculative audio is incomplete
+            if self.speech_end_silence_start:
+                self.speech_end_silence_start = 0.0
+                self._emit(self.on_turn_detection_stop)
+        elif not self.speech_end_silence_start:
+            self.speech_end_silence_start = now
+            self._emit(self.on_turn_detection_start)
+        elif (now - self.speech_end_silence_start >= self.post_speech_silence_duration
+              and now - self._recording_started_at >= self.min_length_of_recording):
+            self._stop_recording()
+            return
+
+        if (self.enable_realtime_transcription and not self._realtime_in_flight
+                and now - self._last_realtime_at >= self.realtime_processing_pause):
+            self._last_realtime_at = now
+            self._realtime_in_flight = True
+            self._submit_partial()
+
+    def _start_recording(self) -> None:
+        with self.frames_lock:
+            self.frames = list(self._preroll) # New container: TranscriptionProcessor detects the restart
+            self._frame_voiced = [True] * len(self.frames)
+            self._voiced_frames = len(self.frames)
+            # Under the lock: a partial result being applied on the inference thread
+            # must see either the old recording or the new one, never a mix
+            self._recording_index += 1
+            self._committed_frames = 0
+            self._committed_text = ""
+        self._discard_speculation()
+        self._preroll.clear()
+        self._voiced_run = 0
+        self.speech_end_silence_start = 0.0
+        self._recording_started_at = self._last_realtime_at = time.time()
+        self.is_recording = True
+        self._emit(self.on_recording_start)
+
+    def _stop_recording(self) -> None:
+        self.is_recording = False
+        with self.frames_lock:
+            frames = list(self.frames)
+        self.service.realtime_stats.record(utterance_s=len(frames) * VAD_FRAME_SECONDS)
+        # Frames stay in place until the next recording so on_recording_stop can still read them
+        self.service.dispatch(self.session_id, self._finish_utterance, frames)
+
+    def _finish_utterance(self, frames: List[bytes]) -> None:
+        if self.on_recording_stop:
+            self.on_recording_stop()
+        if not self._closed:
+            self._finals.put(self._take_speculation() or self.service.submit(self.session_id, frames, final=True))
+
+    # --- Speculative finals ---
+
+    def speculate_final(self) -> None:
+        """
+        Starts the final transcription of the recording so far, ahead of the turn end.
+
+        Called when the turn is likely over ("hot" state). The result is keyed by
+        the audio length up to the last voiced frame: if the recording stops
+        without further speech, the speculative result becomes the final
+        transcription; new speech discards it. No-op unless the service enables
+        `speculative_final`.
+        """
+        if not self.service.speculative_final or self._closed or not self.is_recording:
+            return
+        with self.frames_lock:
+            voiced_frames = self._voiced_frames # Read before the snapshot: the key never covers unseen speech
+            snapshot = list(self.frames)
+        with self._speculation_lock:
+            if self._speculation is not None and self._speculation.voiced_frames == voiced_frames:
+                return # Already speculating on this audio
+            replaced = self._speculation is not None
+            self._speculation = _Speculation(voiced_frames, self.service.submit(self.session_id, snapshot, final=True))
+        self.service.speculation.record(started=1, discarded=int(replaced))
+
+    def _discard_speculation(self) -> None:
+        with self._speculation_lock:
+            speculation, self._speculation = self._speculation, None
+        if speculation is not None:
+            self.service.speculation.record(discarded=1)
+
+    def _take_speculation(self) -> Optional[Future]:
+        """Returns the speculative result's future if it still covers all speech of the recording."""
+        with self._speculation_lock:
+            speculation, self._speculation = self._speculation, None
+        if speculation is None:
+            return None
+        if speculation.voiced_frames != self._voiced_frames:
+            self.service.speculation.record(discarded=1)
+            return None
+        ended_at = time.monotonic()
+
+        def record_saving(future: Future) -> None:
+            # Without speculation the decode would have started now; it takes
+            # about as long as the speculative one did
+            if future.exception() is None:
+                decode_s = (speculation.done_at or time.monotonic()) - speculation.started_at
+                self.service.speculation.record(reused=1, saved_s=min(decode_s, ended_at - speculation.started_at))
+
+        speculation.future.add_done_callback(record_saving)
+        return speculation.future
+
+    # --- Realtime partials ---
+
+    def _submit_partial(self) -> None:
+        """
+        Requests a realtime transcription of the current recording.
+
+        With incremental decoding, only the frames after the committed prefix are
+        sent; when that tail grows past `partial_tail_s`, its part up to a pause
+        is sent as a separate request and committed.
+        """
+        commit_future: Optional[Future] = None
+        with self.frames_lock:
+            recording = self._recording_index
+            start = self._committed_frames
+            commit_at = self._find_commit_point() if self.service.partial_tail_s > 0 else None
+            if commit_at is not None:
+                committed = self.frames[start:commit_at]
+                self._committed_frames = commit_at
+            tail = self.frames[self._committed_frames:]
+        if commit_at is not None:
+            commit_future = self.service.submit(self.session_id, committed, final=False)
+        future = self.service.submit(self.session_id, tail, final=False)
+        decoded_frames = len(tail) + (len(committed) if commit_at is not None else 0)
+        self.service.realtime_stats.record(decoded_s=decoded_frames * VAD_FRAME_SECONDS, commits=int(commit_at is not None))
+        future.add_done_callback(lambda f: self._on_realtime_result(f, commit_future, start, recording))
+
+    def _find_commit_point(self) -> Optional[int]:
+        """
+        Returns the frame index to commit the partial transcript up to, or None.
+
+        Prefers the latest pause (`COMMIT_PAUSE_FRAMES` unvoiced frames) that
+        leaves at least `MIN_TAIL_SECONDS` in the tail and commits at least as much. Continuous speech longer
+        than twice `partial_tail_s` is cut at its quietest frame instead.
+        Called with `frames_lock` held.
+        """
+        start = self._committed_frames
+        tail_frames = len(self.frames) - start
+        if tail_frames * VAD_FRAME_SECONDS < self.service.partial_tail_s:
+            return None
+        min_frames = int(MIN_TAIL_SECONDS / VAD_FRAME_SECONDS)
+        limit = len(self.frames) - min_frames
+        run = 0
+        for i in range(limit - 1, start + min_frames, -1):
+            run = run + 1 if not self._frame_voiced[i] else 0
+            if run >= COMMIT_PAUSE_FRAMES:
+                return i + run // 2 # Middle of the pause
+        if tail_frames * VAD_FRAME_SECONDS < 2 * self.service.partial_tail_s or limit <= start + 1:
+            return None
+        energy = [np.abs(np.frombuffer(frame, dtype=np.int16)).mean() for frame in self.frames[start + 1:limit]]
+        return start + 1 + int(np.argmin(energy))
+
+    def _on_realtime_result(self, future: Future, commit_future: Optional[Future], previous_commit: int, recording: int) -> None:
+        if commit_future is not None and not commit_future.done(): # Tail came back first; finish once the prefix is in
+            commit_future.add_done_callback(lambda _: self._on_realtime_result(future, commit_future, previous_commit, recording))
+            return
+        with self.frames_lock: # Runs on the inference thread; _start_recording resets this state
+            if recording != self._recording_index: # A new recording started meanwhile
+                self._realtime_in_flight = False
+                return
+            if commit_future is not None:
+                if commit_future.exception() is None:
+                    self._committed_text = f"{self._committed_text} {commit_future.result()}".strip()
+                else:
+                    self._committed_frames = previous_commit # Re-decode the prefix with the next tail
+            self._realtime_in_flight = False
+            if future.exception() is not None or not self.is_recording:
+                return
+            text = f"{self._committed_text} {future.result()}".strip()
+        if text:
+            self._emit(self.on_realtime_transcription_update, text)
+
+    def _emit(self, callback: Optional[Callable[..., Any]], *args: Any) -> None:
+        if callback is not None and not self._closed:
+            self.service.dispatch(self.session_id, callback, *args)
+
+    # --- Recorder API ---
+
+    def text(self, on_transcription_finished: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """
+        Blocks until this session's next utterance is transcribed.
+
+        Args:
+            on_transcription_finished: Called with the final text.
+
+        Returns:
+            The final text, or None if the session was closed or transcription failed.
+        """
+        future = self._finals.get()
+        if future is None:
+            return None
+        try:
+            text = future.result()
+        except Exception as e:
+            logger.error(f"🎙️💥 Final transcription for session {self.session_id} failed: {e}")
+            return None
+        if text and on_transcription_finished:
+            on_transcription_finished(text)
+        return text
+
+    def shutdown(self) -> None:
+        """Closes the session: stops callbacks, releases a waiting `text` call."""
+        if self._closed:
+            return
+        self._closed = True
+        self._discard_speculation()
+        self._finals.put(None)
+        self.service.close_session(self.session_id)
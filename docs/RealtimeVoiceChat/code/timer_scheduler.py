@@ -0,0 +1,150 @@
+"""
+Process-wide timer scheduler for per-connection deadlines.
+
+One thread sleeps on a heap of deadlines and runs each callback when its
+deadline is reached, so N connections waiting for silence thresholds cost one
+sleeping thread instead of N threads polling every millisecond. Handles are
+cancelled lazily (skipped when they reach the top of the heap).
+
+Callbacks run on the scheduler thread and must be short; anything slow should
+be handed off to another thread.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TimerHandle:
+    """A scheduled callback; `cancel` prevents it from running if it has not yet."""
+    __slots__ = ("when", "callback", "args", "cancelled")
+
+    def __init__(self, when: float, callback: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+        self.when = when # time.monotonic() deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled: bool = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class TimerScheduler:
+    """Runs callbacks at monotonic deadlines from a single daemon thread."""
+
+    def __init__(self, name: str = "TimerScheduler") -> None:
+        """
+        Initializes the scheduler and starts its thread.
+
+        Args:
+            name: Name of the scheduler thread.
+        """
+        self._heap: List[Tuple[float, int, TimerHandle]] = []
+        self._sequence = itertools.count() # Tie-breaker for equal deadlines
+        self._condition = threading.Condition()
+        self._stopped: bool = False
+
+        # Statistics
+        self.fired: int = 0
+        self.cancelled: int = 0
+        self.jitter_total_s: float = 0.0 # Sum of (fire time - deadline)
+        self.jitter_max_s: float = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def call_at(self, when: float, callback: Callable[..., Any], *args: Any) -> TimerHandle:
+        """
+        Schedules `callback(*args)` at a `time.monotonic()` deadline.
+
+        Returns:
+            A handle that can cancel the call.
+        """
+        handle = TimerHandle(when, callback, args)
+        with self._condition:
+            heapq.heappush(self._heap, (when, next(self._sequence), handle))
+            if self._heap[0][2] is handle: # New earliest deadline: re-arm the sleep
+                self._condition.notify()
+        return handle
+
+    def call_later(self, delay: float, callback: Callable[..., Any], *args: Any) -> TimerHandle:
+        """Schedules `callback(*args)` after `delay` seconds; see `call_at`."""
+        return self.call_at(time.monotonic() + max(0.0, delay), callback, *args)
+
+    def _next_due(self) -> Optional[TimerHandle]:
+        """Waits for the next due handle; returns None once stopped."""
+        with self._condition:
+            while not self._stopped:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                when, _, handle = self._heap[0]
+                if handle.cancelled:
+                    heapq.heappop(self._heap)
+                    self.cancelled += 1
+                    continue
+                remaining = when - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                heapq.heappop(self._heap)
+                return handle
+            return None
+
+    def _run(self) -> None:
+        while True:
+            handle = self._next_due()
+            if handle is None:
+                break
+            jitter = time.monotonic() - handle.when
+            self.fired += 1
+            self.jitter_total_s += jitter
+            self.jitter_max_s = max(self.jitter_max_s, jitter)
+            try:
+                handle.callback(*handle.args)
+            except Exception as e:
+                logger.error(f"⏰💥 Timer callback {getattr(handle.callback, '__qualname__', handle.callback)} failed: {e}", exc_info=True)
+
+    def stop(self) -> None:
+        """Stops the thread; pending callbacks are dropped."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join(timeout=2.0)
+
+    def pending(self) -> int:
+        """Returns the number of scheduled entries (including not yet skipped cancelled ones)."""
+        return len(self._heap)
+
+    def summary(self) -> str:
+        """Returns firing statistics as a one-line string."""
+        avg_ms = self.jitter_total_s / self.fired * 1000 if self.fired else 0.0
+        return (f"{self.fired} fired, {self.cancelled} cancelled, "
+                f"jitter avg {avg_ms:.2f}ms / max {self.jitter_max_s * 1000:.2f}ms")
+
+
+_scheduler_lock = threading.Lock()
+_scheduler: Optional[TimerScheduler] = None
+
+
+def get_timer_scheduler() -> TimerScheduler:
+    """Returns the process-wide scheduler, starting it on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = TimerScheduler()
+        return _scheduler
+
+
+def shutdown_timer_scheduler() -> None:
+    """Stops the process-wide scheduler and logs its statistics."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            logger.info(f"⏰📊 Timer scheduler: {_scheduler.summary()}")
+            _scheduler.stop()
+            _scheduler = None
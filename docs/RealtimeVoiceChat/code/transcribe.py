@@ -5,6 +5,8 @@ from turndetect import strip_ending_punctuation
 from difflib import SequenceMatcher
 from colors import Colors
 from text_similarity import TextSimilarity
+from utterance_buffer import UtteranceBuffer
+from timer_scheduler import TimerHandle, get_timer_scheduler
 from scipy import signal
 import numpy as np
 import threading
@@ -68,6 +70,7 @@ if USE_TURN_DETECTION:
 
 INT16_MAX_ABS_VALUE: float = 32768.0
 SAMPLE_RATE: int = 16000
+UTTERANCE_BUFFER_SECONDS: float = 30.0 # Preallocated; longer utterances grow the buffer (nothing is dropped)
 
 
 class TranscriptionProcessor:
@@ -158,7 +161,19 @@ class TranscriptionProcessor:
         self.shutdown_performed: bool = False
         self.silence_time: float = 0.0
         self.silence_active: bool = False
+        # Silence deadlines (see _reschedule_silence_deadlines)
+        self._timer_scheduler = get_timer_scheduler()
+        self._silence_lock = threading.Lock()
+        self._silence_timers: List[TimerHandle] = []
+        self._silence_generation: int = 0 # Bumped on every reschedule; stale timers ignore themselves
+        self._potential_end_due: bool = False
+        self._hot: bool = False
         self.last_audio_copy: Optional[np.ndarray] = None
+        # Mirror of the recorder's frames for the current utterance, filled incrementally
+        self.utterance_audio = UtteranceBuffer(UTTERANCE_BUFFER_SECONDS, SAMPLE_RATE)
+        self._mirrored_frames: Any = None # Recorder frame container being mirrored
+        self._mirrored_first_frame: Any = None # Its first frame, to detect a reused container
+        self._mirrored_frame_count: int = 0
 
         self.on_tts_allowed_to_synthesize: Optional[Callable] = None # Note: Seems unused
 
@@ -245,90 +260,134 @@ class TranscriptionProcessor:
             # Ensure the attribute exists before accessing
             return getattr(self.recorder, "is_recording", False)
 
+    def is_recording(self) -> bool:
+        """Returns True while the recorder is inside an utterance."""
+        return bool(self._is_recorder_recording())
+
     # --- Silence Monitor ---
     def _start_silence_monitor(self) -> None:
         """
-        Starts a background thread to monitor silence duration and trigger
-        events like potential sentence end detection, TTS synthesis allowance,
-        and potential full transcription ("hot") state changes.
-        """
-        def monitor():
-            hot = False
-            # Initialize silence_time using the abstracted getter
-            self.silence_time = self._get_recorder_param("speech_end_silence_start", 0.0)
-
-            while not self.shutdown_performed:
-                speech_end_silence_start = self.silence_time # Use cached value updated by callback
-
-                if self.recorder and speech_end_silence_start is not None and speech_end_silence_start != 0:
-                    silence_waiting_time = self._get_recorder_param("post_speech_silence_duration", 0.0)
-                    time_since_silence = time.time() - speech_end_silence_start
-
-                    # Calculate latest time pipeline can start without exceeding silence duration
-                    latest_pipe_start_time = silence_waiting_time - self.pipeline_latency - self._PIPELINE_RESERVE_TIME_MS
-
-                    # Calculate the target time to trigger potential sentence end detection
-                    potential_sentence_end_time = latest_pipe_start_time
-                    # Ensure it doesn't trigger too early
-                    if potential_sentence_end_time < self._MIN_POTENTIAL_END_DETECTION_TIME_MS:
-                        potential_sentence_end_time = self._MIN_POTENTIAL_END_DETECTION_TIME_MS
-
-                    # Determine the threshold time to enter the "hot" state
-                    start_hot_condition_time = silence_waiting_time - self._HOT_THRESHOLD_OFFSET_S
-                    # Ensure the hot condition has a minimum meaningful duration
-                    if start_hot_condition_time < self._MIN_HOT_CONDITION_DURATION_S:
-                        start_hot_condition_time = self._MIN_HOT_CONDITION_DURATION_S
-
-                    # Adjust potential_sentence_end_time based on Orpheus mode
-                    if self.is_orpheus:
-                         # For Orpheus, ensure potential end detection doesn't happen too early relative to hot state
-                        orpheus_potential_end_time = silence_waiting_time - self._HOT_THRESHOLD_OFFSET_S
-                        if potential_sentence_end_time < orpheus_potential_end_time:
-                             potential_sentence_end_time = orpheus_potential_end_time
-
-
-                    # --- Trigger Actions Based on Timing ---
-
-                    # 1. Force potential sentence end detection if time has passed
-                    if time_since_silence > potential_sentence_end_time:
-                        # Check if realtime_text exists before logging/detecting
-                        current_text = self.realtime_text if self.realtime_text else ""
-                        # Use force_yield=True because this is triggered by timeout, not punctuation detection
-                        self.detect_potential_sentence_end(current_text, force_yield=True, force_ellipses=True) # Force ellipses if timeout occurs
-
-                    # 2. Allow TTS synthesis shortly before the final silence duration elapses
-                    tts_allowance_time = silence_waiting_time - self._TTS_ALLOWANCE_OFFSET_S
-                    if time_since_silence > tts_allowance_time:
-                        if self.on_tts_allowed_to_synthesize: # Check if callback exists
-                            self.on_tts_allowed_to_synthesize()
-
-                    # 3. Handle "Hot" state (potential full transcription)
-                    hot_condition_met = time_since_silence > start_hot_condition_time
-                    if hot_condition_met and not hot:
-                        hot = True
-                        print(f"{Colors.MAGENTA}HOT{Colors.RESET}")
-                        if self.potential_full_transcription_callback:
-                            self.potential_full_transcription_callback(self.realtime_text)
-                    elif not hot_condition_met and hot:
-                        # Transitioning from Hot to Cold while still in silence period (e.g., silence_waiting_time changed)
-                        if self._is_recorder_recording(): # Check if still recording before aborting
-                            print(f"{Colors.CYAN}COLD (during silence){Colors.RESET}")
-                            if self.potential_full_transcription_abort_callback:
-                                self.potential_full_transcription_abort_callback()
-                        hot = False
-
-                elif hot: # Exited silence period (speech_end_silence_start is 0 or None)
-                    # If we were hot, but silence ended (e.g., new speech started), transition to cold
-                    if self._is_recorder_recording(): # Check if recording actually restarted
-                         print(f"{Colors.CYAN}COLD (silence ended){Colors.RESET}")
-                         if self.potential_full_transcription_abort_callback:
-                             self.potential_full_transcription_abort_callback()
-                    hot = False
-
-                time.sleep(0.001) # Short sleep to prevent busy-waiting dominating CPU
-
-        monitor_thread = threading.Thread(target=monitor, daemon=True)
-        monitor_thread.start()
+        Arms the silence deadlines for the recorder's current silence state.
+
+        Potential sentence end detection, TTS synthesis allowance and the
+        potential full transcription ("hot") state are driven by deadlines on the
+        process-wide `TimerScheduler`. They are computed once whenever silence
+        starts or ends or the waiting time changes (`_reschedule_silence_deadlines`)
+        instead of being re-evaluated by a per-connection thread every millisecond.
+        """
+        self._set_silence_time(self._get_recorder_param("speech_end_silence_start", 0.0))
+
+    def _silence_deadlines(self, silence_waiting_time: float) -> tuple[float, float, float]:
+        """
+        Computes the silence thresholds for a given post-speech silence duration.
+
+        Args:
+            silence_waiting_time: The recorder's `post_speech_silence_duration`.
+
+        Returns:
+            Seconds after silence start for (potential sentence end detection,
+            TTS synthesis allowance, entering the "hot" state).
+        """
+        # Calculate latest time pipeline can start without exceeding silence duration
+        latest_pipe_start_time = silence_waiting_time - self.pipeline_latency - self._PIPELINE_RESERVE_TIME_MS
+
+        # Calculate the target time to trigger potential sentence end detection
+        potential_sentence_end_time = latest_pipe_start_time
+        # Ensure it doesn't trigger too early
+        if potential_sentence_end_time < self._MIN_POTENTIAL_END_DETECTION_TIME_MS:
+            potential_sentence_end_time = self._MIN_POTENTIAL_END_DETECTION_TIME_MS
+
+        # Determine the threshold time to enter the "hot" state
+        start_hot_condition_time = silence_waiting_time - self._HOT_THRESHOLD_OFFSET_S
+        # Ensure the hot condition has a minimum meaningful duration
+        if start_hot_condition_time < self._MIN_HOT_CONDITION_DURATION_S:
+            start_hot_condition_time = self._MIN_HOT_CONDITION_DURATION_S
+
+        # Adjust potential_sentence_end_time based on Orpheus mode
+        if self.is_orpheus:
+            # For Orpheus, ensure potential end detection doesn't happen too early relative to hot state
+            orpheus_potential_end_time = silence_waiting_time - self._HOT_THRESHOLD_OFFSET_S
+            if potential_sentence_end_time < orpheus_potential_end_time:
+                potential_sentence_end_time = orpheus_potential_end_time
+
+        # Allow TTS synthesis shortly before the final silence duration elapses
+        tts_allowance_time = silence_waiting_time - self._TTS_ALLOWANCE_OFFSET_S
+
+        return potential_sentence_end_time, tts_allowance_time, start_hot_condition_time
+
+    def _set_silence_time(self, silence_start: Optional[float]) -> None:
+        """Records the start of the current silence (0 = speaking) and re-arms the deadlines."""
+        self.silence_time = silence_start or 0.0
+        self._reschedule_silence_deadlines()
+
+    def _reschedule_silence_deadlines(self) -> None:
+        """
+        Cancels pending silence deadlines and schedules new ones for the current
+        silence start and waiting time. Leaves the "hot" state if silence ended or
+        the hot threshold moved past the elapsed silence.
+        """
+        with self._silence_lock:
+            for timer in self._silence_timers:
+                timer.cancel()
+            self._silence_timers = []
+            self._silence_generation += 1
+            generation = self._silence_generation
+            self._potential_end_due = False
+
+            silence_start = self.silence_time
+            in_silence = bool(self.recorder and silence_start and not self.shutdown_performed)
+            hot_condition_met = False
+            if in_silence:
+                silence_waiting_time = self._get_recorder_param("post_speech_silence_duration", 0.0)
+                potential_end_time, tts_allowance_time, start_hot_time = self._silence_deadlines(silence_waiting_time)
+                time_since_silence = time.time() - silence_start
+                hot_condition_met = time_since_silence > start_hot_time
+                for deadline, action in (
+                    (potential_end_time, self._on_potential_end_deadline),
+                    (tts_allowance_time, self._on_tts_allowance_deadline),
+                    (start_hot_time, self._on_hot_deadline),
+                ):
+                    self._silence_timers.append(
+                        self._timer_scheduler.call_later(deadline - time_since_silence, action, generation)
+                    )
+
+            cool_down = self._hot and not hot_condition_met
+            if cool_down:
+                self._hot = False
+
+        if cool_down and self._is_recorder_recording(): # Check if still/again recording before aborting
+            print(f"{Colors.CYAN}COLD ({'during silence' if in_silence else 'silence ended'}){Colors.RESET}")
+            if self.potential_full_transcription_abort_callback:
+                self.potential_full_transcription_abort_callback()
+
+    def _is_current_silence(self, generation: int) -> bool:
+        return generation == self._silence_generation and not self.shutdown_performed
+
+    def _on_potential_end_deadline(self, generation: int) -> None:
+        """Forces potential sentence end detection once the silence passed its threshold."""
+        with self._silence_lock:
+            if not self._is_current_silence(generation):
+                return
+            self._potential_end_due = True # Later partials in this silence are yielded too (see on_partial)
+        current_text = self.realtime_text if self.realtime_text else ""
+        # Use force_yield=True because this is triggered by timeout, not punctuation detection
+        self.detect_potential_sentence_end(current_text, force_yield=True, force_ellipses=True) # Force ellipses if timeout occurs
+
+    def _on_tts_allowance_deadline(self, generation: int) -> None:
+        if self._is_current_silence(generation) and self.on_tts_allowed_to_synthesize:
+            self.on_tts_allowed_to_synthesize()
+
+    def _on_hot_deadline(self, generation: int) -> None:
+        """Enters the "hot" state (potential full transcription)."""
+        with self._silence_lock:
+            if not self._is_current_silence(generation) or self._hot:
+                return
+            self._hot = True
+        print(f"{Colors.MAGENTA}HOT{Colors.RESET}")
+        if hasattr(self.recorder, "speculate_final"): # Per-session STT streams can start the final pass now
+            self.recorder.speculate_final()
+        if self.potential_full_transcription_callback:
+            self.potential_full_transcription_callback(self.realtime_text)
 
     def on_new_waiting_time(
             self,
@@ -349,6 +408,8 @@ class TranscriptionProcessor:
                 log_text = text if text else "(No text provided)"
                 logger.info(f"👂⏳ {Colors.GRAY}New waiting time: {Colors.RESET}{Colors.YELLOW}{waiting_time:.2f}{Colors.RESET}{Colors.GRAY} for text: {log_text}{Colors.RESET}")
                 self._set_recorder_param("post_speech_silence_duration", waiting_time)
+                if self.silence_time:
+                    self._reschedule_silence_deadlines() # Thresholds moved
         else:
             logger.warning("👂⚠️ Recorder not initialized, cannot set new waiting time.")
 
@@ -613,17 +674,24 @@ class TranscriptionProcessor:
 
     def get_audio_copy(self) -> Optional[np.ndarray]:
         """
-        Copies the current audio buffer from the recorder's frames.
-
-        Retrieves the raw audio frames, concatenates them, converts to a float32
-        NumPy array normalized to [-1.0, 1.0], and returns a deep copy. Updates
-        `self.last_audio_copy` if successful. If the recorder is unavailable,
-        frames are empty, or an error occurs, it returns the `last_audio_copy`.
+        Returns the current utterance from the recorder's frames.
+
+        Only frames appended since the previous call are converted: they are
+        mirrored into `utterance_audio`, a preallocated int16/float32 buffer
+        that grows for long utterances, so the cost is O(new samples) rather
+        than O(utterance length). A new recording (the recorder replaced or restarted its frame buffer)
+        resets the buffer. Updates `self.last_audio_copy` if successful. If the
+        recorder is unavailable, frames are empty, or an error occurs, it
+        returns the `last_audio_copy`. No per-call copy is made: the previous
+        utterance is copied out of the buffer once, right before it is reset
+        for the next one, so `last_audio_copy` never sees the new recording.
 
         Returns:
-            A deep copy of the current audio buffer as a float32 NumPy array,
-            or the last known good copy if the current fetch fails, or None
-            if no audio has ever been successfully captured.
+            The current utterance as a float32 NumPy array normalized to
+            [-1.0, 1.0]. This is a view into the buffer that stays valid
+            until the next utterance starts (copy it to keep it longer).
+            Returns the last known good copy if the current fetch fails, or
+            None if no audio has ever been successfully captured.
         """
         if not self.recorder:
              logger.warning("👂⚠️ Cannot get audio copy: Recorder not initialized.")
@@ -636,28 +704,42 @@ class TranscriptionProcessor:
              # Access frames safely
              # Ensure frames is thread-safe if accessed concurrently
              with self.recorder.frames_lock if hasattr(self.recorder, 'frames_lock') else threading.Lock(): # Use recorder's lock if available
-                 frames_data = list(self.recorder.frames) # Create a copy of the deque items
-
-             if not frames_data:
+                 frames = self.recorder.frames
+                 frame_count = len(frames)
+                 first_frame = frames[0] if frame_count else None
+                 restarted = (
+                     frames is not self._mirrored_frames
+                     or first_frame is not self._mirrored_first_frame
+                     or frame_count < self._mirrored_frame_count
+                 )
+                 start = 0 if restarted else self._mirrored_frame_count
+                 # Index from the end: O(new frames) for lists and deques alike
+                 new_frames = [frames[i] for i in range(start, frame_count)]
+
+             if restarted:
+                 if frame_count:
+                     # Reset only once new audio arrives, so an empty recorder buffer still returns last_audio_copy.
+                     # last_audio_copy is a view into the buffer: detach it before the buffer is reused.
+                     if len(self.utterance_audio):
+                         self.last_audio_copy = self.utterance_audio.float32().copy()
+                     self.utterance_audio.reset()
+                 self._mirrored_frames = frames
+                 self._mirrored_first_frame = first_frame
+             for frame in new_frames:
+                 self.utterance_audio.append(frame)
+             self._mirrored_frame_count = frame_count
+
+             if not frame_count:
                  logger.debug("👂💾 Recorder frames buffer is currently empty.")
                  return self.last_audio_copy # Return last known if current is empty
 
-             # Process audio buffer
-             full_audio_array = np.frombuffer(b''.join(frames_data), dtype=np.int16)
-             if full_audio_array.size == 0:
+             audio_copy = self.utterance_audio.float32()
+             if audio_copy.size == 0:
                  logger.debug("👂💾 Recorder frames buffer resulted in empty array after join.")
                  return self.last_audio_copy # Return last known if buffer is empty after join
 
-             full_audio = full_audio_array.astype(np.float32) / INT16_MAX_ABS_VALUE
-             # No need for deepcopy here as full_audio is a new array derived from the buffer
-             audio_copy = full_audio
-
-             # Update last_audio_copy only if the new copy is valid and has data
-             if audio_copy is not None and len(audio_copy) > 0:
-                 self.last_audio_copy = audio_copy
-                 logger.debug(f"👂💾 Successfully got audio copy (length: {len(audio_copy)} samples).")
-
-
+             self.last_audio_copy = audio_copy
+             logger.debug(f"👂💾 Successfully got audio copy (length: {len(audio_copy)} samples, {len(new_frames)} new frames).")
              return audio_copy
         except Exception as e:
              logger.error(f"👂💥 Error getting audio copy: {e}", exc_info=True)
@@ -677,20 +759,20 @@ class TranscriptionProcessor:
             """Callback triggered when recorder detects start of silence (end of speech)."""
             self.set_silence(True)
             recorder_silence_start = self._get_recorder_param("speech_end_silence_start", None)
-            self.silence_time = recorder_silence_start if recorder_silence_start else time.time()
+            self._set_silence_time(recorder_silence_start if recorder_silence_start else time.time())
             logger.debug(f"👂🤫 Silence detected (start_silence_detection called). Silence time set to: {self.silence_time}")
 
         def stop_silence_detection():
             """Callback triggered when recorder detects end of silence (start of speech)."""
             self.set_silence(False)
-            self.silence_time = 0.0
+            self._set_silence_time(0.0)
             logger.debug("👂🗣️ Speech detected (stop_silence_detection called). Silence time reset.")
 
         def start_recording():
             """Callback triggered when recorder starts a new recording segment."""
             logger.info("👂▶️ Recording started.")
             self.set_silence(False)
-            self.silence_time = 0.0
+            self._set_silence_time(0.0)
             if self.on_recording_start_callback:
                 self.on_recording_start_callback()
 
@@ -714,6 +796,8 @@ class TranscriptionProcessor:
                 return
             self.realtime_text = text
             self.detect_potential_sentence_end(text)
+            if self._potential_end_due: # Silence already past its threshold: yield updated text too
+                self.detect_potential_sentence_end(text, force_yield=True, force_ellipses=True)
             stripped_partial_user_text_new = strip_ending_punctuation(text)
             if stripped_partial_user_text_new != self.stripped_partial_user_text:
                 self.stripped_partial_user_text = stripped_partial_user_text_new
@@ -748,14 +832,14 @@ class TranscriptionProcessor:
             self.set_silence(True)
             # Capture silence start time immediately. Use recorder's time if available.
             recorder_silence_start = self._get_recorder_param("speech_end_silence_start", None)
-            self.silence_time = recorder_silence_start if recorder_silence_start else time.time()
+            self._set_silence_time(recorder_silence_start if recorder_silence_start else time.time())
             logger.debug(f"👂🤫 Silence detected (start_silence_detection called). Silence time set to: {self.silence_time}")
 
 
         def stop_silence_detection():
             """Callback triggered when recorder detects end of silence (start of speech)."""
             self.set_silence(False)
-            self.silence_time = 0.0 # Reset silence time
+            self._set_silence_time(0.0) # Reset silence time
             logger.debug("👂🗣️ Speech detected (stop_silence_detection called). Silence time reset.")
 
 
@@ -763,7 +847,7 @@ class TranscriptionProcessor:
             """Callback triggered when recorder starts a new recording segment."""
             logger.info("👂▶️ Recording started.")
             self.set_silence(False) # Ensure silence is marked inactive
-            self.silence_time = 0.0   # Ensure silence timer is reset
+            self._set_silence_time(0.0) # Ensure silence timer is reset
             if self.on_recording_start_callback:
                 self.on_recording_start_callback()
 
@@ -816,6 +900,8 @@ class TranscriptionProcessor:
 
             # Detect potential sentence ends based on punctuation stability
             self.detect_potential_sentence_end(text)
+            if self._potential_end_due: # Silence already past its threshold: yield updated text too
+                self.detect_potential_sentence_end(text, force_yield=True, force_ellipses=True)
 
             # Process for partial transcription callback and turn detection
             stripped_partial_user_text_new = strip_ending_punctuation(text)
@@ -883,14 +969,15 @@ class TranscriptionProcessor:
             logger.exception(f"👂🔥 Failed to create recorder: {e}")
             self.recorder = None # Ensure recorder is None if creation failed
 
-    def feed_audio(self, chunk: bytes, audio_meta_data: Optional[Dict[str, Any]] = None) -> None:
+    def feed_audio(self, chunk: bytes, audio_meta_data: Optional[Any] = None) -> None:
         """
         Feeds an audio chunk to the underlying recorder instance for processing.
 
         Args:
             chunk: A bytes object containing the raw audio data chunk.
-            audio_meta_data: Optional dictionary containing metadata about the audio
-                             (e.g., sample rate, channels), if required by the recorder.
+            audio_meta_data: Optional metadata about the audio (an `AudioPacketMeta`
+                             record from the ingest ring, only valid during this
+                             call), if required by the recorder.
         """
         if self.recorder and not self.shutdown_performed:
             try:
@@ -919,6 +1006,7 @@ class TranscriptionProcessor:
         if not self.shutdown_performed:
             logger.info("👂🔌 Shutting down TranscriptionProcessor...")
             self.shutdown_performed = True # Set flag early to stop loops/threads
+            self._reschedule_silence_deadlines() # Cancels pending silence deadlines
 
             if self.recorder:
                 logger.info("👂🔌 Calling recorder shutdown()...")
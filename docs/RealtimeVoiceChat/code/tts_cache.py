@@ -0,0 +1,209 @@
+"""
+Content-addressed cache of synthesized TTS audio.
+
+Interview bots repeat many sentences verbatim (greetings, "Thanks for sharing
+that.", follow-up templates). The cache stores the PCM of a synthesized
+sentence under a hash of everything that determines the audio (engine, voice,
+speed, normalized text), so a repeated sentence can be streamed immediately
+instead of being synthesized again.
+
+Two tiers:
+
+- memory: an LRU map bounded by a byte budget.
+- disk (optional): one raw PCM file per entry under `disk_dir`, read back
+  through `mmap`, so a hit costs no synthesis and no full read into memory.
+  Oldest files are evicted when the directory exceeds its byte budget.
+"""
+import collections
+import hashlib
+import logging
+import mmap
+import os
+import threading
+from typing import Iterator, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+CACHE_CHUNK_BYTES: int = 4800 # 100 ms of 24 kHz 16-bit mono per streamed slice
+
+Pcm = Union[bytes, mmap.mmap]
+
+
+def normalize_tts_text(text: str) -> str:
+    """Collapses whitespace; case and punctuation are kept because they change the prosody."""
+    return " ".join(text.split())
+
+
+def tts_cache_key(engine: str, voice: str, speed: float, text: str) -> str:
+    """Returns the content address of a sentence's audio."""
+    material = f"{engine}\x00{voice}\x00{speed:.3f}\x00{normalize_tts_text(text)}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def iter_pcm_chunks(pcm: Pcm, chunk_bytes: int = CACHE_CHUNK_BYTES) -> Iterator[bytes]:
+    """Yields cached audio in playback-sized slices (whole 16-bit samples); closes a disk hit's mmap when done."""
+    chunk_bytes -= chunk_bytes % 2
+    try:
+        for start in range(0, len(pcm), chunk_bytes):
+            yield bytes(pcm[start:start + chunk_bytes])
+    finally:
+        if isinstance(pcm, mmap.mmap):
+            pcm.close()
+
+
+class TTSAudioCache:
+    """Thread-safe two-tier (memory LRU + optional mmap'd disk) PCM cache."""
+
+    def __init__(
+            self,
+            max_bytes: int = 64 * 1024 * 1024,
+            disk_dir: Optional[str] = None,
+            disk_max_bytes: int = 1024 * 1024 * 1024,
+        ) -> None:
+        """
+        Initializes the TTSAudioCache.
+
+        Args:
+            max_bytes: Memory tier budget; least recently used entries are evicted.
+                       0 disables the memory tier.
+            disk_dir: Directory of the disk tier; None disables it.
+            disk_max_bytes: Disk tier budget; oldest files are evicted.
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: collections.OrderedDict[str, bytes] = collections.OrderedDict()
+        self._bytes: int = 0
+        self._lock = threading.Lock()
+        self._disk_bytes: int = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(entry.stat().st_size for entry in os.scandir(disk_dir) if entry.name.endswith(".pcm"))
+
+        # Statistics
+        self.memory_hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.pcm") # type: ignore[arg-type]
+
+    def get(self, key: str) -> Optional[Pcm]:
+        """Returns the cached PCM (bytes, or a read-only mmap for disk hits), or None."""
+        with self._lock:
+            pcm = self._entries.get(key)
+            if pcm is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return pcm
+        if self.disk_dir:
+            try:
+                path = self._disk_path(key)
+                with open(path, "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                os.utime(path) # Eviction removes the least recently used files first
+                with self._lock:
+                    self.disk_hits += 1
+                return mapped
+            except (FileNotFoundError, ValueError): # ValueError: empty file cannot be mapped
+                pass
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, pcm: bytes) -> None:
+        """Stores a sentence's audio in both tiers."""
+        if not pcm:
+            return
+        if 0 < len(pcm) <= self.max_bytes:
+            with self._lock:
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self._bytes -= len(previous)
+                self._entries[key] = pcm
+                self._bytes += len(pcm)
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted)
+                    self.evictions += 1
+        if self.disk_dir:
+            self._write_disk(key, pcm)
+
+    def _write_disk(self, key: str, pcm: bytes) -> None:
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(pcm)
+            os.replace(temp_path, path) # Atomic: readers never map a partial file
+        except OSError as e:
+            logger.warning(f"👄⚠️ Could not write TTS cache file {path}: {e}")
+            return
+        with self._lock:
+            self._disk_bytes += len(pcm)
+            over_budget = self._disk_bytes > self.disk_max_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        files = sorted(
+            (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+            for entry in os.scandir(self.disk_dir) if entry.name.endswith(".pcm")
+        )
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.disk_max_bytes * 0.9: # Free some headroom, not one file per put
+                break
+            try:
+                os.remove(path) # Open mmaps of the file stay valid
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        with self._lock:
+            self._disk_bytes = total
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return hits / total if total else 0.0
+
+    def summary(self) -> str:
+        """Returns the cache statistics as a one-line string."""
+        summary = (f"{self.hit_rate * 100:.0f}% hit rate ({self.memory_hits} memory, {self.disk_hits} disk, "
+                   f"{self.misses} misses), {len(self._entries)} entries / {self._bytes / 1048576:.1f} of "
+                   f"{self.max_bytes / 1048576:.0f} MiB in memory, {self.evictions} evicted")
+        if self.disk_dir:
+            summary += f", {self._disk_bytes / 1048576:.1f} MiB on disk"
+        return summary
+
+
+_cache_lock = threading.Lock()
+_cache: Optional[TTSAudioCache] = None
+
+
+def configure_tts_cache(max_bytes: int, disk_dir: Optional[str] = None, disk_max_bytes: int = 1024 * 1024 * 1024) -> Optional[TTSAudioCache]:
+    """
+    Creates the process-wide cache used by `AudioProcessor.synthesize`.
+
+    Args:
+        max_bytes: Memory tier budget (see `TTSAudioCache`).
+        disk_dir: Disk tier directory, or None.
+        disk_max_bytes: Disk tier budget.
+
+    Returns:
+        The cache, or None if both tiers are disabled.
+    """
+    global _cache
+    with _cache_lock:
+        _cache = TTSAudioCache(max_bytes, disk_dir, disk_max_bytes) if (max_bytes > 0 or disk_dir) else None
+        return _cache
+
+
+def get_tts_cache() -> Optional[TTSAudioCache]:
+    """Returns the process-wide cache, or None if caching is not configured."""
+    return _cache
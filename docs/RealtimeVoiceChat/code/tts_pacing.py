@@ -0,0 +1,264 @@
+"""
+Per-session TTS stream pacing: chunk size and initial buffer from measured buffer health.
+
+Streaming TTS trades latency against smoothness. Small engine chunks and a
+short initial buffer make the first audio arrive early, but if synthesis falls
+behind playback the client runs dry (an underrun: audible gap). Larger chunks
+synthesize more efficiently and a longer buffer absorbs jitter, at the cost of
+time to first audio (TTFA).
+
+`StreamPacingController` measures, per session:
+
+- the synthesis real-time factor (RTF): wall time between engine chunks divided
+  by their audio duration, as an exponentially weighted mean and variance;
+- the playout lead: audio released by synthesis minus audio the client has
+  played, estimated from what the sender transmitted and when;
+- underruns: reported by the client (`tts_stop` while the answer is still
+  streaming) and estimated from the sender's playout clock;
+- TTFA: synthesis start to the first audio released to the client.
+
+From these it picks the initial buffer so that, under a Gaussian model of
+production time, the probability of running dry during a response stays below
+`underrun_target`; each underrun adds a safety margin that decays again over
+clean responses. The engine chunk size starts small for the first sentence and
+grows with the lead available to hide the larger chunks' latency.
+"""
+import collections
+import logging
+import math
+import statistics
+import threading
+import time
+from typing import Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE: int = 24000 # TTS output: 24 kHz, 16-bit mono
+MIN_STREAM_CHUNK_SIZE: int = 8 # Coqui stream chunk size for the lowest latency
+MAX_STREAM_CHUNK_SIZE: int = 30 # Coqui stream chunk size for the best throughput
+DEFAULT_INITIAL_BUFFER_S: float = 0.5 # Used until enough chunks were measured
+MIN_INITIAL_BUFFER_S: float = 0.05
+MAX_INITIAL_BUFFER_S: float = 2.0
+LEAD_FOR_MAX_CHUNK_S: float = 2.0 # Playout lead at which the largest chunk size is used
+WARMUP_CHUNKS: int = 8 # Chunks measured before the model replaces the defaults
+EWMA_ALPHA: float = 0.1
+MAX_RTF_SAMPLE: float = 5.0 # Caps gaps dominated by waiting for LLM text
+UNDERRUN_MARGIN_STEP_S: float = 0.1
+MAX_UNDERRUN_MARGIN_S: float = 1.0
+MARGIN_DECAY: float = 0.9 # Per clean response
+UNDERRUN_SLACK_S: float = 0.02 # Estimated lead below -slack counts as an underrun
+
+
+def pcm_duration(chunk: bytes) -> float:
+    """Duration in seconds of a 24 kHz 16-bit mono chunk."""
+    return len(chunk) / 2 / SAMPLE_RATE
+
+
+class StreamPacingController:
+    """Thread-safe pacing model for one session (synthesis thread and sender task)."""
+
+    def __init__(
+            self,
+            underrun_target: float = 0.05,
+            min_chunk_size: int = MIN_STREAM_CHUNK_SIZE,
+            max_chunk_size: int = MAX_STREAM_CHUNK_SIZE,
+            max_initial_buffer_s: float = MAX_INITIAL_BUFFER_S,
+            ttfa_history: int = 200,
+        ) -> None:
+        """
+        Initializes the StreamPacingController.
+
+        Args:
+            underrun_target: Accepted probability of an underrun per response;
+                             lower values buffer more (throughput/smoothness),
+                             higher values start sooner (latency).
+            min_chunk_size: Engine chunk size for the first sentence.
+            max_chunk_size: Engine chunk size once the lead is comfortable.
+            max_initial_buffer_s: Upper bound of the initial buffer.
+            ttfa_history: Number of most recent TTFAs kept for percentiles.
+        """
+        self.underrun_target = min(max(underrun_target, 1e-4), 0.5)
+        self._z = statistics.NormalDist().inv_cdf(1.0 - self.underrun_target)
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max(max_chunk_size, min_chunk_size)
+        self.max_initial_buffer_s = max(max_initial_buffer_s, MIN_INITIAL_BUFFER_S)
+        self._lock = threading.Lock()
+
+        # Synthesis model
+        self._rtf_mean: float = 0.0
+        self._rtf_var: float = 0.0
+        self._chunk_s: float = 0.0 # Mean engine chunk duration
+        self._response_s: float = 0.0 # Mean response audio duration
+        self._chunks_measured: int = 0
+        self._margin_s: float = 0.0
+
+        # Current response
+        self._released_s: float = 0.0
+        self._sent_gen: Optional[int] = None
+        self._sent_s: float = 0.0
+        self._playout_started_at: float = 0.0
+        self._underrun_in_response: bool = False
+        self._response_active: bool = False
+
+        # Statistics
+        self.responses: int = 0
+        self.underruns_reported: int = 0
+        self.underruns_estimated: int = 0
+        self._ttfas_ms: Deque[float] = collections.deque(maxlen=ttfa_history)
+        self._buffers_s: Deque[float] = collections.deque(maxlen=ttfa_history)
+        self._chunk_sizes: Dict[int, int] = collections.Counter()
+
+    # --- Synthesis side ---
+
+    def begin_response(self) -> None:
+        """Starts a new response (first synthesis of a generation)."""
+        with self._lock:
+            self._finish_response_locked()
+            self._released_s = 0.0
+            self._underrun_in_response = False
+            self._response_active = True
+            self.responses += 1
+
+    def record_chunk(self, gap_s: float, duration_s: float) -> None:
+        """Records an engine chunk that arrived `gap_s` after the previous one."""
+        if duration_s <= 0:
+            return
+        sample = min(gap_s / duration_s, MAX_RTF_SAMPLE)
+        with self._lock:
+            if self._chunks_measured == 0:
+                self._rtf_mean, self._chunk_s = sample, duration_s
+            else:
+                delta = sample - self._rtf_mean
+                self._rtf_mean += EWMA_ALPHA * delta
+                self._rtf_var = (1 - EWMA_ALPHA) * (self._rtf_var + EWMA_ALPHA * delta * delta)
+                self._chunk_s += EWMA_ALPHA * (duration_s - self._chunk_s)
+            self._chunks_measured += 1
+
+    def record_release(self, duration_s: float) -> None:
+        """Records audio handed to the sender (put into the generation's channel)."""
+        with self._lock:
+            self._released_s += duration_s
+
+    def record_ttfa(self, seconds: float) -> None:
+        """Records the time from synthesis start to the first released audio."""
+        with self._lock:
+            self._ttfas_ms.append(seconds * 1000)
+
+    def initial_buffer_s(self) -> float:
+        """
+        Audio to accumulate before releasing the first chunk of a synthesis.
+
+        With RTF mean μ and standard deviation σ per chunk of duration c, producing
+        x seconds of audio takes about μx ± σ√(xc). Playback needs it by B + x, so
+        B covers the worst x of `(μ - 1)x + zσ√(xc)` up to the expected response
+        length, z being the normal quantile of the underrun target. The current
+        playout lead already counts towards B.
+        """
+        with self._lock:
+            if self._chunks_measured < WARMUP_CHUNKS:
+                needed = DEFAULT_INITIAL_BUFFER_S
+            else:
+                mu = self._rtf_mean
+                spread = self._z * math.sqrt(self._rtf_var * self._chunk_s)
+                horizon = max(self._response_s, self._chunk_s)
+                if mu < 1.0:
+                    worst_x = min((spread / (2 * (1.0 - mu))) ** 2, horizon)
+                else:
+                    worst_x = horizon
+                needed = (mu - 1.0) * worst_x + spread * math.sqrt(worst_x)
+            needed += self._margin_s
+            needed = min(max(needed, MIN_INITIAL_BUFFER_S), self.max_initial_buffer_s)
+            buffer_s = max(0.0, needed - self._lead_locked())
+            self._buffers_s.append(buffer_s)
+            return buffer_s
+
+    def stream_chunk_size(self, first: bool) -> int:
+        """
+        Engine chunk size for the next synthesis.
+
+        Args:
+            first: True for the first sentence of a response (latency-critical).
+        """
+        with self._lock:
+            if first:
+                size = self.min_chunk_size
+            elif self._chunks_measured >= WARMUP_CHUNKS and self._rtf_mean + self._z * math.sqrt(self._rtf_var) >= 1.0:
+                size = self.max_chunk_size # Synthesis barely keeps up: favour throughput
+            else:
+                share = min(max(self._lead_locked() / LEAD_FOR_MAX_CHUNK_S, 0.0), 1.0)
+                size = round(self.min_chunk_size + share * (self.max_chunk_size - self.min_chunk_size))
+            self._chunk_sizes[size] += 1
+            return size
+
+    # --- Sender side ---
+
+    def record_sent(self, gen_id: int, duration_s: float) -> None:
+        """Records audio transmitted to the client; detects estimated underruns."""
+        now = time.perf_counter()
+        with self._lock:
+            if gen_id != self._sent_gen:
+                self._sent_gen = gen_id
+                self._sent_s, self._playout_started_at = 0.0, now
+            elif self._sent_s - (now - self._playout_started_at) < -UNDERRUN_SLACK_S:
+                self.underruns_estimated += 1
+                self._on_underrun_locked()
+                self._sent_s, self._playout_started_at = 0.0, now # Playback restarts with this chunk
+            self._sent_s += duration_s
+
+    def record_client_stop(self) -> None:
+        """The client reported that playback stopped while the response was still streaming."""
+        with self._lock:
+            if not self._response_active:
+                return
+            self.underruns_reported += 1
+            self._on_underrun_locked()
+        logger.warning("👄⚠️ Client playback ran dry mid-answer (underrun)")
+
+    def end_response(self) -> None:
+        """All audio of the response was sent."""
+        with self._lock:
+            self._finish_response_locked()
+
+    # --- Internals ---
+
+    def _lead_locked(self) -> float:
+        """Released audio not yet played by the client."""
+        if self._sent_gen is None or not self._response_active:
+            return self._released_s
+        played = min(self._sent_s, max(0.0, time.perf_counter() - self._playout_started_at))
+        return max(0.0, self._released_s - played)
+
+    def _on_underrun_locked(self) -> None:
+        if not self._underrun_in_response: # One margin step per response
+            self._underrun_in_response = True
+            self._margin_s = min(self._margin_s + UNDERRUN_MARGIN_STEP_S, MAX_UNDERRUN_MARGIN_S)
+
+    def _finish_response_locked(self) -> None:
+        if not self._response_active:
+            return
+        self._response_active = False
+        self._sent_gen = None
+        if self._released_s > 0:
+            if self._response_s == 0.0:
+                self._response_s = self._released_s
+            else:
+                self._response_s += EWMA_ALPHA * (self._released_s - self._response_s)
+        if not self._underrun_in_response:
+            self._margin_s *= MARGIN_DECAY
+
+    def summary(self) -> str:
+        """Returns the pacing statistics as a one-line string."""
+        with self._lock:
+            ttfas = sorted(self._ttfas_ms)
+            if ttfas:
+                p95 = ttfas[min(len(ttfas) - 1, int(len(ttfas) * 0.95))]
+                ttfa_text = f"TTFA avg {sum(ttfas) / len(ttfas):.0f}ms / p95 {p95:.0f}ms"
+            else:
+                ttfa_text = "no TTFA"
+            buffers = self._buffers_s
+            buffer_text = f"initial buffer avg {sum(buffers) / len(buffers) * 1000:.0f}ms" if buffers else "no buffering"
+            sizes = ", ".join(f"{size}×{count}" for size, count in sorted(self._chunk_sizes.items()))
+            return (f"{self.responses} responses, {self.underruns_reported} underruns reported / "
+                    f"{self.underruns_estimated} estimated, {ttfa_text}, {buffer_text}, "
+                    f"RTF {self._rtf_mean:.2f}±{math.sqrt(self._rtf_var):.2f}, margin {self._margin_s * 1000:.0f}ms, "
+                    f"chunk sizes [{sizes or '-'}]")
@@ -0,0 +1,219 @@
+"""
+TTS synthesis service: a fixed pool of engine instances shared by all sessions.
+
+The legacy setup shares one `TextToAudioStream` between every connection. The
+stream is stateful, so two sessions whose turns overlap contend for it or mix
+their audio. `TTSSynthesisService` instead owns `pool_size` independent
+`AudioProcessor` instances (engine + stream each). Every synthesis call is a
+job: it waits in a FIFO queue for a free engine, runs on it with the session's
+audio channel and callbacks, and releases the engine when done or aborted.
+
+Sessions use a `TTSSession`, which offers the `AudioProcessor` methods
+`SpeechPipelineManager` calls (`synthesize`, `synthesize_generator`,
+`tts_inference_time`, `on_first_audio_chunk_synthesize`, `pacing`), so it can
+be passed as the shared audio processor.
+"""
+import collections
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Deque, Generator, List, Optional
+
+from async_bridge import ThreadToAsyncChannel
+from audio_module import AudioProcessor
+from tts_pacing import StreamPacingController
+
+logger = logging.getLogger(__name__)
+
+WAIT_POLL_S: float = 0.05 # How often a queued job re-checks its stop event
+
+
+class TTSSynthesisService:
+    """A pool of TTS engines with a FIFO job queue and load statistics."""
+
+    def __init__(
+            self,
+            engine: str,
+            orpheus_model: str,
+            pool_size: int = 2,
+            wait_history: int = 1000,
+            underrun_target: float = 0.05,
+        ) -> None:
+        """
+        Creates and prewarms the engine instances.
+
+        Args:
+            engine: TTS engine name ("coqui", "kokoro", "orpheus").
+            orpheus_model: Orpheus model path (used only for "orpheus").
+            pool_size: Number of engine instances, i.e. concurrent synthesis jobs.
+            wait_history: Number of most recent queue waits kept for percentiles.
+            underrun_target: Underrun probability target of each session's pacing controller.
+        """
+        self.engine_name = engine
+        self.pool_size = pool_size
+        self.underrun_target = underrun_target
+        logger.info(f"👄🧩 Starting TTS synthesis service: {pool_size} × {engine}")
+        self._processors: List[AudioProcessor] = [
+            AudioProcessor(engine=engine, orpheus_model=orpheus_model, skip_prewarm=False)
+            for _ in range(pool_size)
+        ]
+        self.tts_inference_time: float = self._processors[0].tts_inference_time # TTFA in ms
+
+        self._condition = threading.Condition()
+        self._free: List[int] = list(range(pool_size))
+        self._waiting: Deque[int] = collections.deque() # Tickets of queued jobs, FIFO
+        self._tickets = itertools.count()
+        self._stopped: bool = False
+
+        # Statistics
+        self._started_at = time.perf_counter()
+        self.jobs: int = 0
+        self.aborted_in_queue: int = 0
+        self.busy_s: float = 0.0
+        self.max_queue_depth: int = 0
+        self._waits_ms: Deque[float] = collections.deque(maxlen=wait_history)
+
+    def open_session(self, session_id: str) -> "TTSSession":
+        """Returns the per-session facade to hand to `SpeechPipelineManager`."""
+        return TTSSession(self, session_id)
+
+    def _acquire(self, stop_event: threading.Event) -> Optional[int]:
+        """Waits for a free engine in FIFO order; returns its index, or None if stopped/aborted first."""
+        with self._condition:
+            ticket = next(self._tickets)
+            self._waiting.append(ticket)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._waiting))
+            try:
+                while not (self._free and self._waiting[0] == ticket):
+                    if self._stopped or stop_event.is_set():
+                        self.aborted_in_queue += 1
+                        return None
+                    self._condition.wait(WAIT_POLL_S)
+                return self._free.pop()
+            finally:
+                self._waiting.remove(ticket)
+                self._condition.notify_all() # The next ticket may now be at the head
+
+    def _release(self, index: int) -> None:
+        with self._condition:
+            self._free.append(index)
+            self._condition.notify_all()
+
+    def run(
+            self,
+            job: Callable[[AudioProcessor], bool],
+            stop_event: threading.Event,
+            on_first_audio_chunk: Optional[Callable[[], None]] = None,
+            label: str = "",
+            pacing: Optional[StreamPacingController] = None,
+        ) -> bool:
+        """
+        Runs one synthesis job on the next free engine.
+
+        Args:
+            job: Calls `synthesize`/`synthesize_generator` on the engine's processor.
+            stop_event: The job's stop event; an aborted job leaves the queue.
+            on_first_audio_chunk: The session's first-chunk callback, installed on
+                                  the engine for the duration of the job.
+            label: Session/generation label for logging.
+            pacing: The session's pacing controller, installed on the engine for
+                    the duration of the job.
+
+        Returns:
+            The job's result, or False if it was aborted while queued.
+        """
+        queued_at = time.perf_counter()
+        index = self._acquire(stop_event)
+        if index is None:
+            logger.info(f"👄🛑 {label} TTS job aborted while waiting for an engine")
+            return False
+        started_at = time.perf_counter()
+        wait_ms = (started_at - queued_at) * 1000
+        self._waits_ms.append(wait_ms)
+        if wait_ms > 50:
+            logger.info(f"👄⏳ {label} TTS job waited {wait_ms:.0f}ms for engine {index}")
+        processor = self._processors[index]
+        processor.on_first_audio_chunk_synthesize = on_first_audio_chunk
+        engine_pacing = processor.pacing
+        if pacing is not None:
+            processor.pacing = pacing
+        try:
+            return job(processor)
+        finally:
+            processor.on_first_audio_chunk_synthesize = None
+            processor.pacing = engine_pacing
+            self.busy_s += time.perf_counter() - started_at
+            self.jobs += 1
+            self._release(index)
+
+    def utilization(self) -> float:
+        """Share of engine time spent synthesizing since startup."""
+        elapsed = time.perf_counter() - self._started_at
+        return self.busy_s / (elapsed * self.pool_size) if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        """Returns queue wait and utilization statistics as a one-line string."""
+        waits = sorted(self._waits_ms)
+        if waits:
+            p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))]
+            wait_text = f"wait avg {sum(waits) / len(waits):.1f}ms / p95 {p95:.1f}ms / max {waits[-1]:.1f}ms"
+        else:
+            wait_text = "no waits"
+        return (f"{self.jobs} jobs on {self.pool_size} engines, {self.utilization() * 100:.0f}% utilization, "
+                f"{wait_text}, max queue {self.max_queue_depth}, {self.aborted_in_queue} aborted in queue")
+
+    def shutdown(self) -> None:
+        """Releases queued jobs and stops any running synthesis."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        for processor in self._processors:
+            try:
+                processor.stream.stop()
+            except Exception as e:
+                logger.warning(f"👄⚠️ Error stopping TTS stream: {e}")
+
+
+class TTSSession:
+    """Per-session view of a `TTSSynthesisService` with the `AudioProcessor` synthesis API."""
+
+    def __init__(self, service: TTSSynthesisService, session_id: str) -> None:
+        self.service = service
+        self.session_id = session_id
+        self.engine_name = service.engine_name
+        self.tts_inference_time = service.tts_inference_time
+        self.on_first_audio_chunk_synthesize: Optional[Callable[[], None]] = None
+        self.pacing = StreamPacingController(service.underrun_target)
+
+    def synthesize(
+            self,
+            text: str,
+            audio_chunks: ThreadToAsyncChannel,
+            stop_event: threading.Event,
+            generation_string: str = "",
+        ) -> bool:
+        """Queues `AudioProcessor.synthesize` on the pool; see there for the arguments."""
+        return self.service.run(
+            lambda processor: processor.synthesize(text, audio_chunks, stop_event, generation_string),
+            stop_event,
+            self.on_first_audio_chunk_synthesize,
+            label=f"[{self.session_id}]{generation_string}",
+            pacing=self.pacing,
+        )
+
+    def synthesize_generator(
+            self,
+            generator: Generator[str, None, None],
+            audio_chunks: ThreadToAsyncChannel,
+            stop_event: threading.Event,
+            generation_string: str = "",
+        ) -> bool:
+        """Queues `AudioProcessor.synthesize_generator` on the pool; see there for the arguments."""
+        return self.service.run(
+            lambda processor: processor.synthesize_generator(generator, audio_chunks, stop_event, generation_string),
+            stop_event,
+            self.on_first_audio_chunk_synthesize,
+            label=f"[{self.session_id}]{generation_string}",
+            pacing=self.pacing,
+        )
@@ -0,0 +1,82 @@
+"""
+Precomputed timing profiles for turn detection.
+
+`TurnDetection` maps two things to pause durations: the ending punctuation of
+a transcript and the classifier's P(sentence complete). Both mappings depend
+only on the speed factor chosen by the client, so they are compiled once per
+speed factor into an immutable `TurnTimingProfile` and reused:
+
+- The punctuation pauses are interpolated between the "fast" and "very slow"
+  settings in one vectorized step.
+- The probability-to-pause anchors are NumPy arrays evaluated with `np.interp`,
+  for one probability or a whole batch (e.g. all results of a batched
+  classifier call).
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Union
+
+import numpy as np
+
+# Anchor points for probability-to-pause interpolation
+anchor_points = [
+    (0.0, 1.0), # Probability 0.0 maps to pause 1.0
+    (1.0, 0.0)  # Probability 1.0 maps to pause 0.0
+]
+ANCHOR_PROBABILITIES = np.array([p for p, _ in anchor_points], dtype=np.float64)
+ANCHOR_PAUSES = np.array([v for _, v in anchor_points], dtype=np.float64)
+
+# Base 'fast' settings (speed_factor = 0.0) and target 'very slow' settings (speed_factor = 1.0)
+TIMING_FIELDS = (
+    "detection_speed",
+    "ellipsis_pause",
+    "punctuation_pause",
+    "exclamation_pause",
+    "question_pause",
+    "unknown_sentence_detection_pause",
+)
+FAST_SETTINGS = np.array([0.5, 2.3, 0.39, 0.35, 0.33, 1.25])
+VERY_SLOW_SETTINGS = np.array([1.7, 3.0, 0.9, 0.8, 0.8, 1.9])
+
+
+def interpolate_detections(probabilities: Union[float, np.ndarray]) -> np.ndarray:
+    """
+    Maps completion probabilities to model pauses using the anchor points.
+
+    Args:
+        probabilities: One probability or an array of them; values are clamped to [0, 1].
+
+    Returns:
+        The interpolated pauses, same shape as the input.
+    """
+    clamped = np.clip(probabilities, 0.0, 1.0)
+    return np.interp(clamped, ANCHOR_PROBABILITIES, ANCHOR_PAUSES)
+
+
+@dataclass(frozen=True)
+class TurnTimingProfile:
+    """Pause parameters for one speed factor (see `TurnDetection.update_settings`)."""
+    speed_factor: float
+    detection_speed: float
+    ellipsis_pause: float
+    punctuation_pause: float
+    exclamation_pause: float
+    question_pause: float
+    unknown_sentence_detection_pause: float
+
+    @staticmethod
+    def for_speed(speed_factor: float) -> "TurnTimingProfile":
+        """
+        Returns the (cached) profile for a speed factor.
+
+        Args:
+            speed_factor: 0.0 (fastest) to 1.0 (slowest); clamped, and rounded to
+                          0.01 (the client's slider resolution) for caching.
+        """
+        return _build_profile(round(max(0.0, min(speed_factor, 1.0)), 2))
+
+
+@lru_cache(maxsize=128)
+def _build_profile(speed_factor: float) -> TurnTimingProfile:
+    values = FAST_SETTINGS + speed_factor * (VERY_SLOW_SETTINGS - FAST_SETTINGS)
+    return TurnTimingProfile(speed_factor, **dict(zip(TIMING_FIELDS, values.tolist())))
@@ -1,25 +1,20 @@
 import logging
 logger = logging.getLogger(__name__)
 
-import transformers
 import collections
 import threading
-import queue
-import torch
 import time
 import re
+from typing import Optional
+
+from completion_server import CompletionInferenceServer, get_completion_server
+from turn_timing import TurnTimingProfile, anchor_points, interpolate_detections
 
 # Configuration constants
 model_dir_local = "KoljaB/SentenceFinishedClassification"
 model_dir_cloud = "/root/models/sentenceclassification/"
 sentence_end_marks = ['.', '!', '?', '。'] # Characters considered sentence endings
 
-# Anchor points for probability-to-pause interpolation
-anchor_points = [
-    (0.0, 1.0), # Probability 0.0 maps to pause 1.0
-    (1.0, 0.0)  # Probability 1.0 maps to pause 0.0
-]
-
 def ends_with_string(text: str, s: str) -> bool:
     """
     Checks if a string ends with a specific substring, allowing for one trailing character.
@@ -128,43 +123,63 @@ def find_matching_texts(texts_without_punctuation: collections.deque) -> list[tu
 
 def interpolate_detection(prob: float) -> float:
     """
-    Linearly interpolates a value based on probability using predefined anchor points.
+    Linearly interpolates a pause based on probability using the predefined anchor points.
 
-    Maps an input probability `prob` (clamped between 0.0 and 1.0) to an output
-    value based on the `anchor_points` list. It finds the segment within
-    `anchor_points` where `prob` falls and performs linear interpolation.
+    Maps an input probability `prob` (clamped between 0.0 and 1.0) to a pause
+    via `np.interp` over `anchor_points`. Use `interpolate_detections` to map a
+    whole batch of probabilities at once.
 
     Args:
         prob: The input probability, expected between 0.0 and 1.0.
 
     Returns:
-        The interpolated value. Returns 4.0 as a fallback if interpolation fails
-        (though this shouldn't happen if anchor points cover the [0,1] range).
+        The interpolated pause value.
     """
-    # Clamp probability between 0.0 and 1.0 just in case
-    p = max(0.0, min(prob, 1.0))
-
-    # Check if probability exactly matches an anchor point
-    for ap_p, ap_val in anchor_points:
-        if abs(ap_p - p) < 1e-9: # Use tolerance for float comparison
-            return ap_val
-
-    # Find the segment [p1, p2] where p resides
-    for i in range(len(anchor_points) - 1):
-        p1, v1 = anchor_points[i]
-        p2, v2 = anchor_points[i+1]
-        # Ensure anchor points are sorted by probability for this logic to work
-        if p1 <= p <= p2:
-            # Avoid division by zero if anchor points have the same probability
-            if abs(p2 - p1) < 1e-9:
-                return v1 # or v2, they should be close if p1=p2
-            # Linear interpolation formula
-            ratio = (p - p1) / (p2 - p1)
-            return v1 + ratio * (v2 - v1)
-
-    # Fallback: Should not be reached if anchor_points cover [0,1] properly.
-    logger.warning(f"🎤⚠️ Probability {p} fell outside defined anchor points {anchor_points}. Returning fallback value.")
-    return 4.0
+    return float(interpolate_detections(prob))
+
+class PendingTextQueue:
+    """
+    Thread-safe queue of texts awaiting pause calculation.
+
+    The worker blocks in `take_all` until at least one text is pending and then
+    receives everything queued so far, so it can skip texts that were already
+    superseded by a newer partial. Each entry carries its enqueue time for
+    staleness reporting.
+    """
+
+    def __init__(self) -> None:
+        self._items: list[tuple[float, str]] = []
+        self._condition = threading.Condition()
+        self._closed: bool = False
+
+    def put(self, text: str) -> None:
+        with self._condition:
+            self._items.append((time.monotonic(), text))
+            self._condition.notify()
+
+    def take_all(self) -> Optional[list[tuple[float, str]]]:
+        """Blocks until texts are pending; returns them oldest first, or None once closed."""
+        with self._condition:
+            while not self._items and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                return None
+            items, self._items = self._items, []
+            return items
+
+    def clear(self) -> None:
+        with self._condition:
+            self._items.clear()
+
+    def close(self) -> None:
+        """Wakes the worker and makes `take_all` return None."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
 
 class TurnDetection:
     """
@@ -183,12 +198,16 @@ class TurnDetection:
         local: bool = False,
         pipeline_latency: float = 0.5,
         pipeline_latency_overhead: float = 0.1,
+        inference_server: Optional[CompletionInferenceServer] = None,
+        debounce: Optional[bool] = None,
+        coalesce: bool = True,
     ) -> None:
         """
         Initializes the TurnDetection instance.
 
-        Loads the sentence classification model and tokenizer, sets up internal state
-        (deques, cache), starts the background processing thread, and performs model warmup.
+        Attaches to the shared sentence classification server (loading and warming
+        up the model on first use in this process), sets up internal state
+        (deques, debounce state) and starts the background processing thread.
 
         Args:
             on_new_waiting_time: Callback function invoked when a new waiting time is calculated.
@@ -196,6 +215,17 @@ class TurnDetection:
             local: If True, loads the model from `model_dir_local`, otherwise from `model_dir_cloud`.
             pipeline_latency: Estimated base latency of the STT/processing pipeline in seconds.
             pipeline_latency_overhead: Additional buffer added to the pipeline latency.
+            inference_server: Optional classifier server; defaults to the process-wide
+                              micro-batching server for the selected model, shared by
+                              all sessions.
+            debounce: If True, a partial that differs from the previous one only by
+                      punctuation or whitespace reuses the previous probability
+                      without a cache lookup or model call. Defaults to the
+                      server's `debounce` setting.
+            coalesce: If True (latest value wins), texts superseded by a newer one
+                      before the worker got to them are only added to the history;
+                      the pause is calculated for the newest text only. If False,
+                      every text gets its own calculation in order.
         """
         model_dir = model_dir_local if local else model_dir_cloud
 
@@ -206,94 +236,52 @@ class TurnDetection:
         self.text_time_deque: collections.deque[tuple[float, str]] = collections.deque(maxlen=100)
         self.texts_without_punctuation: collections.deque[tuple[str, str]] = collections.deque(maxlen=20)
 
-        self.text_queue: queue.Queue[str] = queue.Queue() # Queue for incoming text
+        self.inference_server = inference_server or get_completion_server(model_dir)
+        self.max_length: int = self.inference_server.max_length # Max sequence length for the model
+
+        self.coalesce: bool = coalesce
+        # Queue statistics
+        self.texts_queued: int = 0
+        self.texts_superseded: int = 0
+        self.max_queue_depth: int = 0
+        self.staleness_total_s: float = 0.0 # Enqueue-to-suggestion time of calculated texts
+        self.staleness_max_s: float = 0.0
+        self.calculations: int = 0
+
+        self.text_queue = PendingTextQueue() # Queue for incoming text
         self.text_worker = threading.Thread(
             target=self._text_worker,
             daemon=True # Allows program to exit even if this thread is running
         )
         self.text_worker.start()
 
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        logger.info(f"🎤🔌 Using device: {self.device}")
-        self.tokenizer = transformers.DistilBertTokenizerFast.from_pretrained(model_dir)
-        self.classification_model = transformers.DistilBertForSequenceClassification.from_pretrained(model_dir)
-        self.classification_model.to(self.device)
-        self.classification_model.eval() # Set model to evaluation mode
-        self.max_length: int = 128 # Max sequence length for the model
         self.pipeline_latency: float = pipeline_latency
         self.pipeline_latency_overhead: float = pipeline_latency_overhead
 
-        # Initialize completion probability cache with OrderedDict for LRU behavior
-        self._completion_probability_cache: collections.OrderedDict[str, float] = collections.OrderedDict()
-        self._completion_probability_cache_max_size: int = 256 # Max size for the LRU cache
-
-        # Warmup the classification model for faster initial predictions
-        logger.info("🎤🔥 Warming up the classification model...")
-        with torch.no_grad():
-            warmup_text = "This is a warmup sentence."
-            inputs = self.tokenizer(
-                warmup_text,
-                return_tensors="pt",
-                truncation=True,
-                padding="max_length",
-                max_length=self.max_length
-            )
-            inputs = {key: value.to(self.device) for key, value in inputs.items()}
-            _ = self.classification_model(**inputs) # Run one prediction
-        logger.info("🎤✅ Classification model warmed up.")
-
-        # Default dynamic pause settings (initialized for speed_factor=0.0)
-        self.detection_speed: float = 0.5
-        self.ellipsis_pause: float = 2.3
-        self.punctuation_pause: float = 0.39
-        self.exclamation_pause: float = 0.35
-        self.question_pause: float = 0.33
-        self.unknown_sentence_detection_pause: float = 1.25
-        # Apply initial settings (can be called again later)
-        self.update_settings(speed_factor=0.0)
+        # Completion probabilities are cached process-wide by the inference server;
+        # debounce only remembers this session's previous partial
+        self.debounce: bool = self.inference_server.debounce if debounce is None else debounce
+        self._last_debounce_key: Optional[str] = None
+        self._last_probability: float = 0.0
+
+        # Dynamic pause settings (initialized for speed_factor=0.0, can be changed later)
+        self.profile: TurnTimingProfile = TurnTimingProfile.for_speed(0.0)
 
     def update_settings(self, speed_factor: float) -> None:
         """
         Adjusts dynamic pause parameters based on a speed factor.
 
-        Linearly interpolates between 'fast' (speed_factor=0.0) and 'very_slow'
-        (speed_factor=1.0) settings for various pause durations used in calculation.
-        Clamps speed_factor between 0.0 and 1.0.
+        Switches to the precomputed `TurnTimingProfile`, which linearly interpolates
+        between 'fast' (speed_factor=0.0) and 'very_slow' (speed_factor=1.0) settings
+        for the pause durations used in calculation. Clamps speed_factor between
+        0.0 and 1.0.
 
         Args:
             speed_factor: A float between 0.0 (fastest) and 1.0 (slowest) controlling
                           the interpolation between predefined settings.
         """
-        speed_factor = max(0.0, min(speed_factor, 1.0)) # Clamp factor
-
-        # Base 'fast' settings (speed_factor = 0.0)
-        fast = {
-            'detection_speed': 0.5,
-            'ellipsis_pause': 2.3,
-            'punctuation_pause': 0.39,
-            'exclamation_pause': 0.35,
-            'question_pause': 0.33,
-            'unknown_sentence_detection_pause': 1.25
-        }
-
-        # Target 'very slow' settings (speed_factor = 1.0)
-        very_slow = {
-            'detection_speed': 1.7,
-            'ellipsis_pause': 3.0,
-            'punctuation_pause': 0.9,
-            'exclamation_pause': 0.8,
-            'question_pause': 0.8,
-            'unknown_sentence_detection_pause': 1.9
-        }
-
-        # Linear interpolation for each parameter
-        self.detection_speed = fast['detection_speed'] + speed_factor * (very_slow['detection_speed'] - fast['detection_speed'])
-        self.ellipsis_pause = fast['ellipsis_pause'] + speed_factor * (very_slow['ellipsis_pause'] - fast['ellipsis_pause'])
-        self.punctuation_pause = fast['punctuation_pause'] + speed_factor * (very_slow['punctuation_pause'] - fast['punctuation_pause'])
-        self.exclamation_pause = fast['exclamation_pause'] + speed_factor * (very_slow['exclamation_pause'] - fast['exclamation_pause'])
-        self.question_pause = fast['question_pause'] + speed_factor * (very_slow['question_pause'] - fast['question_pause'])
-        self.unknown_sentence_detection_pause = fast['unknown_sentence_detection_pause'] + speed_factor * (very_slow['unknown_sentence_detection_pause'] - fast['unknown_sentence_detection_pause'])
-        logger.info(f"🎤⚙️ Updated turn detection settings with speed_factor={speed_factor:.2f}")
+        self.profile = TurnTimingProfile.for_speed(speed_factor) # Precomputed and cached per factor
+        logger.info(f"🎤⚙️ Updated turn detection settings with speed_factor={self.profile.speed_factor:.2f}")
 
 
     def suggest_time(
@@ -326,8 +314,9 @@ class TurnDetection:
         """
         Calculates the probability that the given sentence is complete using the ML model.
 
-        Uses an internal LRU cache (`_completion_probability_cache`) to store and
-        retrieve results for previously seen sentences, improving performance.
+        Results are cached process-wide (shared across sessions) by the inference
+        server. With `debounce` enabled, a sentence that differs from the previous
+        one only by punctuation or whitespace reuses the previous result.
 
         Args:
             sentence: The input sentence string to analyze.
@@ -336,41 +325,20 @@ class TurnDetection:
             A float representing the probability (between 0.0 and 1.0) that the
             sentence is considered complete by the model.
         """
-        # Check cache first
-        if sentence in self._completion_probability_cache:
-            self._completion_probability_cache.move_to_end(sentence) # Mark as recently used
-            return self._completion_probability_cache[sentence]
-
-        # If not in cache, run model prediction
-        import torch
-        import torch.nn.functional as F
-
-        inputs = self.tokenizer(
-            sentence,
-            return_tensors="pt",
-            truncation=True,
-            padding="max_length",
-            max_length=self.max_length
-        )
-        # Move input tensors to the correct device (CPU or GPU)
-        inputs = {key: value.to(self.device) for key, value in inputs.items()}
-
-        with torch.no_grad(): # Disable gradient calculation for inference
-            outputs = self.classification_model(**inputs)
-
-        logits = outputs.logits
-        # Apply softmax to get probabilities [prob_incomplete, prob_complete]
-        probabilities = F.softmax(logits, dim=1).squeeze().tolist()
-        prob_complete = probabilities[1] # Index 1 corresponds to 'complete' label
-
-        # Store the result in the cache
-        self._completion_probability_cache[sentence] = prob_complete
-        self._completion_probability_cache.move_to_end(sentence) # Mark as recently used
-
-        # Maintain cache size (LRU eviction)
-        if len(self._completion_probability_cache) > self._completion_probability_cache_max_size:
-            self._completion_probability_cache.popitem(last=False) # Remove the least recently used item
-
+        if self.debounce:
+            # Punctuation-only changes are debounced; word boundaries ("no thing" vs "nothing") are kept
+            stripped = "".join(ch if ch.isalnum() or ch.isspace() else " " for ch in self.inference_server.normalize(sentence))
+            debounce_key = " ".join(stripped.split())
+            if debounce_key == self._last_debounce_key:
+                self.inference_server.cache.record_debounced()
+                return self._last_probability
+
+        # Shared cache first, otherwise batched with other sessions' requests
+        prob_complete = self.inference_server.predict(sentence)
+
+        if self.debounce:
+            self._last_debounce_key = debounce_key
+            self._last_probability = prob_complete
         return prob_complete
 
     def get_suggested_whisper_pause(self, text: str) -> float:
@@ -379,7 +347,7 @@ class TurnDetection:
 
         Checks for specific ending patterns ('...', '.', '!', '?') and returns
         a corresponding pause duration defined by the instance's settings
-        (e.g., `self.ellipsis_pause`). Returns `self.unknown_sentence_detection_pause`
+        (e.g., `self.profile.ellipsis_pause`). Returns `self.profile.unknown_sentence_detection_pause`
         if no specific punctuation is matched.
 
         Args:
@@ -389,16 +357,16 @@ class TurnDetection:
             The suggested pause duration in seconds based on ending punctuation.
         """
         if ends_with_string(text, "..."):
-            return self.ellipsis_pause
+            return self.profile.ellipsis_pause
         elif ends_with_string(text, "."):
-            return self.punctuation_pause
+            return self.profile.punctuation_pause
         elif ends_with_string(text, "!"):
-            return self.exclamation_pause
+            return self.profile.exclamation_pause
         elif ends_with_string(text, "?"):
-            return self.question_pause
+            return self.profile.question_pause
         else:
             # No specific ending detected, use the general pause for unknown endings
-            return self.unknown_sentence_detection_pause
+            return self.profile.unknown_sentence_detection_pause
 
     def _text_worker(
         self
@@ -406,7 +374,52 @@ class TurnDetection:
         """
         Background worker thread that processes text from the queue for turn detection.
 
-        Continuously retrieves text items from `self.text_queue`. For each item, it:
+        Blocks until texts are queued and takes all of them at once. In coalescing
+        mode every text but the newest is only recorded in the history (so the
+        punctuation averaging still sees it) and the pause is calculated for the
+        newest one; otherwise each text is calculated in order. Exits when the
+        queue is closed by `shutdown`.
+        """
+        while True:
+            items = self.text_queue.take_all()
+            if items is None:
+                break
+            self.max_queue_depth = max(self.max_queue_depth, len(items))
+
+            if self.coalesce and len(items) > 1:
+                for _, superseded_text in items[:-1]:
+                    self._record_text(superseded_text)
+                self.texts_superseded += len(items) - 1
+                logger.info(f"🎤⏭️ Skipped {len(items) - 1} superseded text(s), calculating the newest only.")
+                items = items[-1:]
+
+            for queued_at, text in items:
+                try:
+                    self._calculate_pause(text)
+                except Exception as e:
+                    logger.error(f"🎤💥 Pause calculation failed for \"{text}\": {e}", exc_info=True)
+                    continue
+                staleness = time.monotonic() - queued_at
+                self.calculations += 1
+                self.staleness_total_s += staleness
+                self.staleness_max_s = max(self.staleness_max_s, staleness)
+
+    def _record_text(self, text: str) -> str:
+        """Preprocesses a text, adds it to the history deques and returns the processed text."""
+        processed_text = preprocess_text(text) # Apply initial cleaning
+
+        # Update history deques
+        current_time = time.time()
+        self.text_time_deque.append((current_time, processed_text))
+        text_without_punctuation = strip_ending_punctuation(processed_text)
+        self.texts_without_punctuation.append((processed_text, text_without_punctuation))
+        return processed_text
+
+    def _calculate_pause(self, text: str) -> None:
+        """
+        Calculates the suggested pause for one text and reports it via `suggest_time`.
+
+        For the text, it:
         1. Preprocesses the text.
         2. Updates text history deques.
         3. Finds recent matching text segments to analyze punctuation consistency.
@@ -418,88 +431,71 @@ class TurnDetection:
         9. Applies a speed factor and adjustments (e.g., for ellipses).
         10. Ensures the final pause meets minimum pipeline latency requirements.
         11. Calls `suggest_time` with the final calculated pause duration.
-        Handles queue timeouts gracefully to allow for potential shutdown.
+
+        Args:
+            text: The queued text segment.
         """
-        while True:
-            try:
-                # Wait for text from the queue, with a timeout to avoid blocking forever
-                text = self.text_queue.get(block=True, timeout=0.1)
-            except queue.Empty:
-                # No text received within the timeout, loop again
-                time.sleep(0.01) # Small sleep to yield CPU when idle
-                continue
-
-            # --- Processing starts when text is received ---
-            logger.info(f"🎤⚙️ Starting pause calculation for: \"{text}\"")
-            
-            processed_text = preprocess_text(text) # Apply initial cleaning
-
-            # Update history deques
-            current_time = time.time()
-            self.text_time_deque.append((current_time, processed_text))
-            text_without_punctuation = strip_ending_punctuation(processed_text)
-            self.texts_without_punctuation.append((processed_text, text_without_punctuation))
-
-            # Analyze recent matching texts for consistent punctuation pauses
-            matches = find_matching_texts(self.texts_without_punctuation)
-
-            added_pauses = 0
-            contains_ellipses = False
-            if matches: # Avoid division by zero if matches is empty
-                for i, match in enumerate(matches):
-                    same_text, _ = match # We only need the original text here
-                    whisper_suggested_pause_match = self.get_suggested_whisper_pause(same_text)
-                    added_pauses += whisper_suggested_pause_match
-                    if ends_with_string(same_text, "..."):
-                        contains_ellipses = True
-                # Calculate average pause based on recent consistent segments
-                avg_pause = added_pauses / len(matches)
-            else:
-                # If no matches, use the pause suggested by the current text directly
-                 avg_pause = self.get_suggested_whisper_pause(processed_text)
-                 if ends_with_string(processed_text, "..."):
+        logger.info(f"🎤⚙️ Starting pause calculation for: \"{text}\"")
+        
+        processed_text = self._record_text(text)
+
+        # Analyze recent matching texts for consistent punctuation pauses
+        matches = find_matching_texts(self.texts_without_punctuation)
+
+        added_pauses = 0
+        contains_ellipses = False
+        if matches: # Avoid division by zero if matches is empty
+            for i, match in enumerate(matches):
+                same_text, _ = match # We only need the original text here
+                whisper_suggested_pause_match = self.get_suggested_whisper_pause(same_text)
+                added_pauses += whisper_suggested_pause_match
+                if ends_with_string(same_text, "..."):
                     contains_ellipses = True
+            # Calculate average pause based on recent consistent segments
+            avg_pause = added_pauses / len(matches)
+        else:
+            # If no matches, use the pause suggested by the current text directly
+             avg_pause = self.get_suggested_whisper_pause(processed_text)
+             if ends_with_string(processed_text, "..."):
+                contains_ellipses = True
 
-            whisper_suggested_pause = avg_pause # Use the averaged pause
-
-            # Prepare text for the sentence completion model (remove all punctuation)
-            import string
-            transtext = processed_text.translate(str.maketrans('', '', string.punctuation))
-            # Further clean potentially remaining non-alphanumeric chars at the end
-            cleaned_for_model = re.sub(r'[^a-zA-Z\s]+$', '', transtext).rstrip() # Also remove trailing spaces
+        whisper_suggested_pause = avg_pause # Use the averaged pause
 
-            # Get sentence completion probability
-            prob_complete = self.get_completion_probability(cleaned_for_model)
+        # Prepare text for the sentence completion model (remove all punctuation)
+        import string
+        transtext = processed_text.translate(str.maketrans('', '', string.punctuation))
+        # Further clean potentially remaining non-alphanumeric chars at the end
+        cleaned_for_model = re.sub(r'[^a-zA-Z\s]+$', '', transtext).rstrip() # Also remove trailing spaces
 
-            # Interpolate probability to a pause duration
-            sentence_finished_model_pause = interpolate_detection(prob_complete)
+        # Get sentence completion probability
+        prob_complete = self.get_completion_probability(cleaned_for_model)
 
-            # Combine pauses: weighted average giving more importance to punctuation pause
-            weight_towards_whisper = 0.65
-            weighted_pause = (weight_towards_whisper * whisper_suggested_pause +
-                             (1 - weight_towards_whisper) * sentence_finished_model_pause)
+        # Interpolate probability to a pause duration
+        sentence_finished_model_pause = interpolate_detection(prob_complete)
 
-            # Apply overall speed factor
-            final_pause = weighted_pause * self.detection_speed
+        # Combine pauses: weighted average giving more importance to punctuation pause
+        weight_towards_whisper = 0.65
+        weighted_pause = (weight_towards_whisper * whisper_suggested_pause +
+                         (1 - weight_towards_whisper) * sentence_finished_model_pause)
 
-            # Add slight extra pause if ellipses were detected recently
-            if contains_ellipses:
-                final_pause += 0.2
+        # Apply overall speed factor
+        final_pause = weighted_pause * self.profile.detection_speed
 
-            logger.info(f"🎤📊 Calculated pauses: Punct={whisper_suggested_pause:.2f}, Model={sentence_finished_model_pause:.2f}, Weighted={weighted_pause:.2f}, Final={final_pause:.2f} for \"{processed_text}\" (Prob={prob_complete:.2f})")
+        # Add slight extra pause if ellipses were detected recently
+        if contains_ellipses:
+            final_pause += 0.2
 
+        logger.info(f"🎤📊 Calculated pauses: Punct={whisper_suggested_pause:.2f}, Model={sentence_finished_model_pause:.2f}, Weighted={weighted_pause:.2f}, Final={final_pause:.2f} for \"{processed_text}\" (Prob={prob_complete:.2f})")
 
-            # Ensure final pause is not less than the pipeline latency overhead
-            min_pause = self.pipeline_latency + self.pipeline_latency_overhead
-            if final_pause < min_pause:
-                logger.info(f"🎤⚠️ Final pause ({final_pause:.2f}s) is less than minimum ({min_pause:.2f}s). Using minimum.")
-                final_pause = min_pause
-            
-            # Suggest the calculated time via callback
-            self.suggest_time(final_pause, processed_text) # Use processed_text for context
 
-            # Mark task as done for the queue (important if using queue.join())
-            self.text_queue.task_done()
+        # Ensure final pause is not less than the pipeline latency overhead
+        min_pause = self.pipeline_latency + self.pipeline_latency_overhead
+        if final_pause < min_pause:
+            logger.info(f"🎤⚠️ Final pause ({final_pause:.2f}s) is less than minimum ({min_pause:.2f}s). Using minimum.")
+            final_pause = min_pause
+        
+        # Suggest the calculated time via callback
+        self.suggest_time(final_pause, processed_text) # Use processed_text for context
 
     def calculate_waiting_time(
             self,
@@ -514,15 +510,29 @@ class TurnDetection:
             text: The text segment (e.g., from STT) to be processed.
         """
         logger.info(f"🎤📥 Queuing text for pause calculation: \"{text}\"")
+        self.texts_queued += 1
         self.text_queue.put(text)
 
+    def queue_summary(self) -> str:
+        """Returns queue depth, coalescing and staleness statistics as a one-line string."""
+        avg_ms = self.staleness_total_s / self.calculations * 1000 if self.calculations else 0.0
+        return (f"{self.texts_queued} texts queued, {self.calculations} calculated, "
+                f"{self.texts_superseded} superseded, max depth {self.max_queue_depth}, "
+                f"staleness avg {avg_ms:.0f}ms / max {self.staleness_max_s * 1000:.0f}ms")
+
+    def shutdown(self) -> None:
+        """Stops the background worker thread and logs the queue statistics."""
+        self.text_queue.close()
+        self.text_worker.join(timeout=2.0)
+        logger.info(f"🎤📊 Turn detection queue: {self.queue_summary()}")
+
     def reset(self) -> None:
         """
         Resets the internal state of the TurnDetection instance.
 
-        Clears the text history deques, the model prediction cache, and resets the
-        current waiting time tracker. Useful for starting a new conversation or
-        interaction context.
+        Clears the text history deques and the debounce state, and resets the
+        current waiting time tracker. The shared prediction cache is kept.
+        Useful for starting a new conversation or interaction context.
         """
         logger.info("🎤🔄 Resetting TurnDetection state.")
         # Clear the history deques
@@ -530,13 +540,7 @@ class TurnDetection:
         self.texts_without_punctuation.clear()
         # Reset the last suggested time
         self.current_waiting_time = -1
-        # Clear the prediction cache
-        if hasattr(self, "_completion_probability_cache"):
-            self._completion_probability_cache.clear()
+        # Forget the previous partial so the next utterance is never debounced against it
+        self._last_debounce_key = None
         # Clear the processing queue (optional, might discard unprocessed items)
-        # while not self.text_queue.empty():
-        #     try:
-        #         self.text_queue.get_nowait()
-        #         self.text_queue.task_done()
-        #     except queue.Empty:
-        #         break
\ No newline at end of file
+        # self.text_queue.clear()
\ No newline at end of file
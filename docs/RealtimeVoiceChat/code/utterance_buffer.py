@@ -0,0 +1,111 @@
+"""
+Preallocated, growable buffer for the audio of the utterance being recorded.
+
+`TranscriptionProcessor` needs the current utterance as normalized float32
+(e.g. for `before_final_sentence`). Rebuilding it from the recorder's frame
+list joins and converts the whole utterance on every call. This buffer keeps
+int16 samples and their float32 conversion side by side, converting each
+sample exactly once when it is appended, so fetching the utterance costs
+O(new samples) instead of O(utterance length).
+
+Samples are stored linearly from index 0, so the utterance is always one
+contiguous slice and can be returned as a view. The buffer never drops audio:
+when an append does not fit, the capacity is doubled (amortized O(1) per
+sample) and the utterance is moved once into the larger arrays.
+"""
+import logging
+from typing import Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INT16_MAX_ABS_VALUE: float = 32768.0
+
+
+class UtteranceBuffer:
+    """
+    Append-only int16/float32 buffer with a running write index.
+
+    Single writer; returned arrays are views into the buffer and stay valid
+    until the buffer is `reset` (a view taken before the buffer grew keeps
+    showing the samples it covered). Copy them if they must outlive the utterance.
+    """
+
+    def __init__(self, initial_seconds: float = 30.0, sample_rate: int = 16000) -> None:
+        """
+        Initializes the UtteranceBuffer.
+
+        Args:
+            initial_seconds: Audio preallocated up front; longer utterances grow the buffer.
+            sample_rate: Sample rate of the appended audio.
+        """
+        self.sample_rate = sample_rate
+        self.capacity = max(1, int(initial_seconds * sample_rate))
+        self._int16 = np.zeros(self.capacity, dtype=np.int16)
+        self._float32 = np.zeros(self.capacity, dtype=np.float32)
+        self._written: int = 0 # Running write index: samples appended since the last reset
+        self._scale = np.float32(1.0 / INT16_MAX_ABS_VALUE)
+
+    @property
+    def written(self) -> int:
+        """Total number of samples appended since the last reset."""
+        return self._written
+
+    def __len__(self) -> int:
+        """Number of samples in the current utterance."""
+        return self._written
+
+    def reset(self) -> None:
+        """Starts a new utterance. Keeps the (possibly grown) memory."""
+        self._written = 0
+
+    def append(self, pcm: Union[bytes, memoryview, np.ndarray]) -> int:
+        """
+        Appends int16 samples and converts them to float32.
+
+        Args:
+            pcm: Raw little-endian int16 bytes or an int16 array.
+
+        Returns:
+            The number of samples appended.
+        """
+        samples = pcm if isinstance(pcm, np.ndarray) else np.frombuffer(pcm, dtype=np.int16)
+        count = samples.size
+        if count == 0:
+            return 0
+        end = self._written + count
+        if end > self.capacity:
+            self._grow(end)
+        self._int16[self._written:end] = samples
+        np.multiply(samples, self._scale, out=self._float32[self._written:end])
+        self._written = end
+        return count
+
+    def _grow(self, needed: int) -> None:
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        int16 = np.zeros(capacity, dtype=np.int16)
+        float32 = np.zeros(capacity, dtype=np.float32)
+        int16[:self._written] = self._int16[:self._written]
+        float32[:self._written] = self._float32[:self._written]
+        self._int16, self._float32, self.capacity = int16, float32, capacity
+        logger.info(f"👂💾 Utterance buffer grown to {capacity / self.sample_rate:.0f}s")
+
+    def _window(self, since: int) -> slice:
+        return slice(min(max(since, 0), self._written), self._written)
+
+    def float32(self, since: int = 0) -> np.ndarray:
+        """
+        Returns the utterance as normalized float32 in [-1.0, 1.0) (a view).
+
+        Args:
+            since: Running write index to start from; pass a previous `written`
+                   value to get only the samples appended after it.
+        """
+        return self._float32[self._window(since)]
+
+    def int16(self, since: int = 0) -> np.ndarray:
+        """Returns the utterance as int16 samples (a view); see `float32`."""
+        return self._int16[self._window(since)]
@@ -0,0 +1,158 @@
+"""
+WebSocket wire format for outgoing TTS audio.
+
+Two transports are supported per connection:
+
+- ``base64`` (legacy, default): every chunk is a JSON text message
+  ``{"type": "tts_chunk", "content": "<base64 PCM>"}``.
+- ``binary``: every chunk is one binary WebSocket message consisting of a fixed
+  12-byte big-endian header followed by the raw payload. JSON text messages are
+  then only used for control traffic (transcripts, status, interruptions).
+
+A client opts into the binary transport by sending
+``{"type": "set_tts_transport", "transport": "binary", "codec": "opus"}`` (codec
+optional, default ``pcm``); the server answers with ``{"type": "tts_transport", ...}``
+describing the accepted transport, codec and header.
+
+Binary header layout (network byte order)::
+
+    offset  size  field
+    0       1     version        (TTS_FRAME_VERSION)
+    1       1     codec          (CODEC_PCM16 = raw 16-bit mono PCM,
+                                  CODEC_OPUS = uint16-length-prefixed Opus packets)
+    2       2     flags          (FLAG_GENERATION_START / FLAG_GENERATION_END)
+    4       4     generation id  (SpeechPipelineManager generation counter)
+    8       4     sequence       (chunk index within the generation, from 0)
+"""
+import struct
+from typing import Any, Dict, Optional
+
+TTS_FRAME_VERSION = 1
+TTS_FRAME_HEADER = struct.Struct("!BBHII")
+TTS_FRAME_HEADER_SIZE = TTS_FRAME_HEADER.size
+
+CODEC_PCM16 = 0
+CODEC_OPUS = 1
+
+FLAG_GENERATION_START = 0x0001 # First chunk of a generation
+FLAG_GENERATION_END = 0x0002 # Generation finished; the frame carries no payload
+
+TRANSPORT_BASE64 = "base64"
+TRANSPORT_BINARY = "binary"
+TTS_TRANSPORTS = (TRANSPORT_BASE64, TRANSPORT_BINARY)
+
+
+def pack_tts_frame(codec: int, flags: int, generation_id: int, sequence: int, payload: bytes = b"") -> bytes:
+    """
+    Builds one binary TTS frame.
+
+    Args:
+        codec: Payload codec id (e.g. `CODEC_PCM16`).
+        flags: Bitwise OR of the `FLAG_*` constants.
+        generation_id: Id of the generation the chunk belongs to.
+        sequence: Chunk index within the generation.
+        payload: Encoded audio bytes.
+
+    Returns:
+        Header and payload as a single bytes object, ready for `ws.send_bytes`.
+    """
+    header = TTS_FRAME_HEADER.pack(TTS_FRAME_VERSION, codec, flags, generation_id & 0xFFFFFFFF, sequence & 0xFFFFFFFF)
+    return header + payload
+
+
+def unpack_tts_frame_header(frame: bytes) -> Dict[str, int]:
+    """
+    Parses the header of a binary TTS frame (the inverse of `pack_tts_frame`).
+
+    Args:
+        frame: A complete frame of at least `TTS_FRAME_HEADER_SIZE` bytes.
+
+    Returns:
+        A dictionary with version, codec, flags, generation_id and sequence.
+    """
+    version, codec, flags, generation_id, sequence = TTS_FRAME_HEADER.unpack_from(frame)
+    return {
+        "version": version,
+        "codec": codec,
+        "flags": flags,
+        "generation_id": generation_id,
+        "sequence": sequence,
+    }
+
+
+class TTSFramer:
+    """
+    Per-connection TTS transport state.
+
+    Holds the negotiated transport and numbers the binary frames of each
+    generation. The sequence restarts at 0 whenever the generation id changes.
+    """
+
+    def __init__(self, transport: str = TRANSPORT_BASE64, codec: int = CODEC_PCM16) -> None:
+        """
+        Initializes the TTSFramer.
+
+        Args:
+            transport: Initial transport, one of `TTS_TRANSPORTS`.
+            codec: Codec id written into binary frame headers.
+        """
+        self.transport = transport
+        self.codec = codec
+        self._generation_id: Optional[int] = None
+        self._sequence: int = 0
+
+    @property
+    def binary(self) -> bool:
+        """True if audio is sent as binary frames."""
+        return self.transport == TRANSPORT_BINARY
+
+    def negotiate(self, requested: Any, codec: int = CODEC_PCM16) -> Dict[str, Any]:
+        """
+        Applies a client's transport request and builds the server's answer.
+
+        Unknown transports leave the current one in place; the answer always
+        reports the transport actually in effect.
+
+        Args:
+            requested: The `transport` value sent by the client.
+            codec: Codec id of the encoder chosen for the binary transport.
+
+        Returns:
+            The control message to send back to the client.
+        """
+        if requested in TTS_TRANSPORTS:
+            self.transport = requested
+        self.codec = codec if self.binary else CODEC_PCM16
+        answer: Dict[str, Any] = {"type": "tts_transport", "transport": self.transport}
+        if self.binary:
+            answer.update({
+                "version": TTS_FRAME_VERSION,
+                "codec": self.codec,
+                "header_bytes": TTS_FRAME_HEADER_SIZE,
+            })
+        return answer
+
+    def frame(self, generation_id: int, payload: bytes) -> bytes:
+        """
+        Wraps one audio chunk of a generation into a binary frame.
+
+        Args:
+            generation_id: Id of the generation producing the chunk.
+            payload: Encoded audio bytes.
+        """
+        flags = 0
+        if generation_id != self._generation_id:
+            self._generation_id = generation_id
+            self._sequence = 0
+            flags |= FLAG_GENERATION_START
+        frame = pack_tts_frame(self.codec, flags, generation_id, self._sequence, payload)
+        self._sequence += 1
+        return frame
+
+    def end_frame(self, generation_id: int) -> bytes:
+        """Builds the empty frame that marks the end of a generation's audio."""
+        sequence = self._sequence if generation_id == self._generation_id else 0
+        frame = pack_tts_frame(self.codec, FLAG_GENERATION_END, generation_id, sequence)
+        self._generation_id = None
+        self._sequence = 0
+        return frame